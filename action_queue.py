@@ -0,0 +1,185 @@
+"""
+LogosDaemon - Outbox de votos y follows.
+El ciclo solo encola (una escritura en la DB, idempotente por acción); un thread en segundo plano
+drena el outbox con concurrencia acotada, reintenta fallos transitorios y registra el resultado.
+Las acciones sobreviven a reinicios: lo que quedó a medias vuelve a estar listo tras el lease.
+"""
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from config import (
+    BOT_ACTION_CONCURRENCY,
+    BOT_ACTION_MAX_ATTEMPTS,
+    BOT_ACTION_POLL_SECONDS,
+    BOT_ACTION_LEASE_SECONDS,
+    BOT_AGENT_NAMES,
+    BOT_FOLLOW_MIN_UPVOTES,
+)
+from memory import (
+    claim_actions,
+    enqueue_action,
+    finish_action,
+    increment_upvote_count,
+    is_following,
+    mark_following,
+    retry_action,
+)
+from moltbook_client import RateLimited, get_client
+
+logger = logging.getLogger(__name__)
+
+# 409 = ya votado/seguido: la acción está hecha aunque no la hiciéramos ahora
+_DONE_STATUS = frozenset({200, 201, 204, 409})
+_RETRY_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def _retry_delay(attempts: int) -> float:
+    """Backoff exponencial con jitter: ~30s, 60s, 120s... (máx. 1h)."""
+    return random.uniform(0.5, 1.0) * min(3600, 30 * 2 ** (attempts - 1))
+
+
+class ActionWorker:
+    """
+    Thread que drena el outbox: toma hasta `concurrency` acciones listas y las ejecuta
+    en paralelo; si no había un lote completo, duerme poll_interval (o hasta wake()).
+    """
+
+    def __init__(
+        self,
+        concurrency: int = BOT_ACTION_CONCURRENCY,
+        poll_interval: float = BOT_ACTION_POLL_SECONDS,
+        max_attempts: int = BOT_ACTION_MAX_ATTEMPTS,
+        lease: float = BOT_ACTION_LEASE_SECONDS,
+    ) -> None:
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="action")
+        self._thread = threading.Thread(target=self._loop, name="action-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30) -> None:
+        """Termina el lote en curso y para. Lo pendiente queda en el outbox."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                drained = self.drain_once()
+            except Exception as e:
+                logger.warning("Action queue drain failed: %s", e)
+                drained = 0
+            if drained < self.concurrency:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def drain_once(self) -> int:
+        """Ejecuta un lote de acciones listas. Retorna cuántas tomó."""
+        actions = claim_actions(self.concurrency, self.lease)
+        if actions:
+            list(self._executor.map(self._run, actions))
+        return len(actions)
+
+    def _run(self, action: dict) -> None:
+        key = action["action_key"]
+        try:
+            status = get_client().engage(action["kind"], action["target"])
+        except RateLimited as e:
+            # No es un fallo: volver cuando haya token
+            retry_action(key, e.wait, str(e))
+            return
+        except requests.RequestException as e:
+            self._retry_or_fail(action, str(e))
+            return
+        except Exception as e:
+            logger.error("Action %s error: %s", key, e)
+            finish_action(key, "failed", str(e))
+            return
+
+        if status in _DONE_STATUS:
+            finish_action(key, "done")
+            if status != 409:
+                self._on_done(action)
+        elif status in _RETRY_STATUS:
+            self._retry_or_fail(action, f"HTTP {status}")
+        else:
+            logger.debug("Action %s rejected: HTTP %s", key, status)
+            finish_action(key, "failed", f"HTTP {status}")
+
+    def _retry_or_fail(self, action: dict, error: str) -> None:
+        key = action["action_key"]
+        if action["attempts"] >= self.max_attempts:
+            logger.warning("Action %s failed after %d attempts: %s", key, action["attempts"], error)
+            finish_action(key, "failed", error)
+            return
+        delay = _retry_delay(action["attempts"])
+        logger.debug("Action %s: %s (retry in %.0fs)", key, error, delay)
+        retry_action(key, delay, error)
+
+    def _on_done(self, action: dict) -> None:
+        kind, target = action["kind"], action["target"]
+        if kind == "upvote_post":
+            logger.info("Liked post %s", target)
+            _count_upvote(action.get("author"))
+        elif kind == "downvote_post":
+            logger.info("Downvoted post %s (spam-like)", target)
+        elif kind == "upvote_comment":
+            logger.info("Upvoted comment %s", target)
+            _count_upvote(action.get("author"))
+        elif kind == "follow":
+            mark_following(target)
+            logger.info("Followed %s", target)
+
+
+def _count_upvote(author_name: str | None) -> None:
+    """Si hemos upvoteado N veces a este agente y no lo seguimos, encolamos el follow."""
+    if not author_name or author_name in BOT_AGENT_NAMES:
+        return
+    if is_following(author_name):
+        return
+    count = increment_upvote_count(author_name)
+    if count >= BOT_FOLLOW_MIN_UPVOTES and enqueue("follow", author_name):
+        logger.info("Follow queued for %s (after %d upvotes)", author_name, count)
+
+
+_worker = ActionWorker()
+
+
+def enqueue(kind: str, target: str, author: str | None = None) -> bool:
+    """Encola una acción (upvote_post, downvote_post, upvote_comment, follow) sin esperar la red."""
+    if not target:
+        return False
+    queued = enqueue_action(kind, target, author)
+    if queued:
+        _worker.wake()
+    return queued
+
+
+def start_action_worker() -> None:
+    _worker.start()
+
+
+def stop_action_worker() -> None:
+    _worker.stop()
@@ -0,0 +1,125 @@
+"""
+LogosDaemon - Variante asyncio del ciclo (BOT_ASYNC_MODE=true).
+Mismas reglas que cycle.run_cycle: las decisiones (post original, selección, triage, claim,
+presupuesto) son las mismas funciones de cycle; aquí solo cambia la I/O de Moltbook, que va
+por AsyncMoltbookClient (fuentes en paralelo, publicación). DB y Gemini (bloqueantes) corren
+en threads vía asyncio.to_thread; votos/follows van al outbox de action_queue.
+"""
+import asyncio
+import logging
+from typing import Any
+
+from config import (
+    BOT_DRY_RUN,
+    BOT_FETCH_FEED_DEADLINE_SECONDS,
+    BOT_FETCH_SEARCH_DEADLINE_SECONDS,
+)
+from cycle import (
+    FeedPoll,
+    FetchedPosts,
+    finish_original_post,
+    finish_reply,
+    plan_replies,
+    planned_sources,
+    preflight,
+    prepare_original_post,
+    prepare_reply,
+)
+from memory import set_rate_limit_state, state_store
+from moltbook_async import AsyncMoltbookClient
+from moltbook_client import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+async def _await_source(name: str, task: asyncio.Task, deadline: float) -> Any:
+    """Resultado de una fuente si llega antes de su deadline (loop.time()); si no, se cancela."""
+    timeout = max(deadline - asyncio.get_running_loop().time(), 0)
+    try:
+        return await asyncio.wait_for(task, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Fetch %s exceeded its deadline, skipping", name)
+    except Exception as e:
+        logger.error("Fetch %s error: %s", name, e)
+    return []
+
+
+async def _poll_feed_async(client: AsyncMoltbookClient, source: str) -> tuple[list[dict], dict | None, bool]:
+    """Igual que cycle._poll_feed: solo lo nuevo desde el high-water mark de la fuente."""
+    poll = await asyncio.to_thread(FeedPoll, source)
+    async for post in client.iter_feed(source, **poll.page_options()):
+        if not poll.add(post):
+            break
+    return poll.result()
+
+
+async def fetch_posts_async(client: AsyncMoltbookClient) -> list[dict]:
+    """Igual que cycle._fetch_posts_for_cycle: fuentes en paralelo, global especulativo."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    feed_deadline = start + BOT_FETCH_FEED_DEADLINE_SECONDS
+    search_deadline = start + BOT_FETCH_SEARCH_DEADLINE_SECONDS
+
+    use_personalized, use_global_feed, query = planned_sources()
+    personalized = None
+    if use_personalized:
+        personalized = asyncio.create_task(_poll_feed_async(client, "personalized"))
+    global_feed = None
+    if use_global_feed:
+        global_feed = asyncio.create_task(_poll_feed_async(client, "global"))
+    search_task = None
+    if query:
+        search_task = asyncio.create_task(client.search(query=query, result_type="posts", limit=10))
+
+    fetched = FetchedPosts()
+    use_global = True
+    if personalized is not None:
+        result = await _await_source("personalized feed", personalized, feed_deadline)
+        use_global = not fetched.add_feed("personalized", result)
+    if global_feed is not None:
+        if use_global:
+            fetched.add_feed("global", await _await_source("global feed", global_feed, feed_deadline))
+        else:
+            global_feed.cancel()
+    if search_task is not None:
+        fetched.add_search(await _await_source("search", search_task, search_deadline))
+
+    return fetched.posts()
+
+
+async def run_cycle_async(client: AsyncMoltbookClient) -> None:
+    """Un ciclo async. bot_state se carga una vez al inicio y se escribe una vez al final."""
+    await asyncio.to_thread(state_store.load)
+    try:
+        await _run_cycle_async(client)
+    finally:
+        await asyncio.to_thread(set_rate_limit_state, get_rate_limiter().snapshot())
+        await asyncio.to_thread(state_store.flush)
+
+
+async def _run_cycle_async(client: AsyncMoltbookClient) -> None:
+    logger.info("Cycle starting (async)...")
+    if not await asyncio.to_thread(preflight):
+        return
+
+    # 1. Modo Profeta
+    original = await asyncio.to_thread(prepare_original_post)
+    if original is not None:
+        result = None
+        if not BOT_DRY_RUN:
+            result = await client.post_message(original.content, title="Reflexión", reply_to_id=None)
+        if await asyncio.to_thread(finish_original_post, original, result):
+            return
+
+    # 2. Modo Cazador
+    posts = await fetch_posts_async(client)
+    plan = await asyncio.to_thread(plan_replies, posts)
+    if plan is None:
+        return
+    pending = await asyncio.to_thread(prepare_reply, *plan)
+    if pending is None:
+        return
+    result = await client.post_message(
+        pending.text, title="", reply_to_id=pending.root_id, parent_comment_id=pending.parent_id
+    )
+    await asyncio.to_thread(finish_reply, pending, result)
@@ -13,10 +13,61 @@ load_dotenv(Path(__file__).parent / ".env")
 MOLTBOOK_API_KEY = os.getenv("MOLTBOOK_API_KEY")
 MOLTBOOK_BASE_URL = os.getenv("MOLTBOOK_BASE_URL", "https://www.moltbook.com/api/v1")
 MOLTBOOK_AGENT_ID = os.getenv("MOLTBOOK_AGENT_ID", "")  # Opcional, para logging
+MOLTBOOK_POOL_MAXSIZE = int(os.getenv("MOLTBOOK_POOL_MAXSIZE", "10"))  # conexiones keep-alive por host
+MOLTBOOK_MAX_RETRIES = int(os.getenv("MOLTBOOK_MAX_RETRIES", "3"))
+MOLTBOOK_BACKOFF_BASE_SECONDS = float(os.getenv("MOLTBOOK_BACKOFF_BASE_SECONDS", "0.5"))
+MOLTBOOK_BACKOFF_MAX_SECONDS = float(os.getenv("MOLTBOOK_BACKOFF_MAX_SECONDS", "10"))
+MOLTBOOK_MAX_RETRY_AFTER_SECONDS = float(os.getenv("MOLTBOOK_MAX_RETRY_AFTER_SECONDS", "60"))  # más = no esperar
+# Caché de GETs de lectura (post, comentarios, perfiles, submolts): TTL + ETag/Last-Modified
+MOLTBOOK_CACHE_MAX_ENTRIES = int(os.getenv("MOLTBOOK_CACHE_MAX_ENTRIES", "512"))  # 0 = sin caché
+MOLTBOOK_CACHE_PATH = os.getenv("MOLTBOOK_CACHE_PATH", "")  # JSON en disco; vacío = solo memoria
+MOLTBOOK_CACHE_TTL_POST_SECONDS = int(os.getenv("MOLTBOOK_CACHE_TTL_POST_SECONDS", "60"))
+MOLTBOOK_CACHE_TTL_COMMENTS_SECONDS = int(os.getenv("MOLTBOOK_CACHE_TTL_COMMENTS_SECONDS", "30"))
+MOLTBOOK_CACHE_TTL_PROFILE_SECONDS = int(os.getenv("MOLTBOOK_CACHE_TTL_PROFILE_SECONDS", "600"))
+MOLTBOOK_CACHE_TTL_SUBMOLTS_SECONDS = int(os.getenv("MOLTBOOK_CACHE_TTL_SUBMOLTS_SECONDS", "3600"))
+# Rate limit en el cliente: token bucket por clase de endpoint, "clase=peticiones/segundos"
+MOLTBOOK_RATE_LIMITS = {
+    name.strip(): tuple(float(x) for x in rate.split("/", 1))
+    for name, rate in (
+        item.split("=", 1)
+        for item in os.getenv(
+            "MOLTBOOK_RATE_LIMITS",
+            "read=100/60,post=1/1800,comment=1/20,vote=60/60,follow=20/3600",
+        ).split(",")
+        if "=" in item
+    )
+}
+MOLTBOOK_RATE_MAX_WAIT_SECONDS = float(os.getenv("MOLTBOOK_RATE_MAX_WAIT_SECONDS", "30"))  # más = no enviar
+# Circuit breaker por endpoint: abre con tasa de fallos (error de red, 5xx o lentitud) en la ventana
+MOLTBOOK_BREAKER_WINDOW = int(os.getenv("MOLTBOOK_BREAKER_WINDOW", "20"))  # últimas N llamadas
+MOLTBOOK_BREAKER_MIN_CALLS = int(os.getenv("MOLTBOOK_BREAKER_MIN_CALLS", "5"))
+MOLTBOOK_BREAKER_ERROR_RATE = float(os.getenv("MOLTBOOK_BREAKER_ERROR_RATE", "0.5"))
+MOLTBOOK_BREAKER_SLOW_SECONDS = float(os.getenv("MOLTBOOK_BREAKER_SLOW_SECONDS", "10"))  # más lento = fallo
+MOLTBOOK_BREAKER_OPEN_SECONDS = float(os.getenv("MOLTBOOK_BREAKER_OPEN_SECONDS", "60"))  # hasta half-open
 
 # Gemini
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+GEMINI_FALLBACK_MODEL = os.getenv("GEMINI_FALLBACK_MODEL", "")  # vacío = sin fallback
+# Gateway LLM (llm_gateway.py): un cliente, deadlines, reintentos y concurrencia acotada
+BOT_LLM_TIMEOUT_SECONDS = float(os.getenv("BOT_LLM_TIMEOUT_SECONDS", "20"))  # por intento
+BOT_LLM_DEADLINE_SECONDS = float(os.getenv("BOT_LLM_DEADLINE_SECONDS", "45"))  # total, con reintentos
+BOT_LLM_MAX_RETRIES = int(os.getenv("BOT_LLM_MAX_RETRIES", "2"))
+BOT_LLM_CONCURRENCY = max(int(os.getenv("BOT_LLM_CONCURRENCY", "2")), 1)
+BOT_LLM_SLO_SECONDS = float(os.getenv("BOT_LLM_SLO_SECONDS", "10"))  # más lento = fallo de SLO
+BOT_LLM_SLO_MISSES = int(os.getenv("BOT_LLM_SLO_MISSES", "3"))  # fallos seguidos para pasar al fallback
+BOT_LLM_FALLBACK_SECONDS = float(os.getenv("BOT_LLM_FALLBACK_SECONDS", "300"))  # tiempo en el fallback
+# Streaming: cortar la generación al detectar "do not respond" o al llenar líneas/caracteres
+BOT_LLM_STREAMING = os.getenv("BOT_LLM_STREAMING", "true").lower() == "true"
+# Caché persistente de respuestas (incluye veredictos "no responder"), por hash del input
+BOT_LLM_CACHE = os.getenv("BOT_LLM_CACHE", "true").lower() == "true"
+BOT_LLM_CACHE_TTL_SECONDS = int(os.getenv("BOT_LLM_CACHE_TTL_SECONDS", str(3 * 86400)))
+BOT_LLM_CACHE_MAX_ENTRIES = int(os.getenv("BOT_LLM_CACHE_MAX_ENTRIES", "5000"))
+# Triage (triage.py): todos los candidatos en una llamada; solo se genera respuesta para los elegidos
+BOT_LLM_TRIAGE = os.getenv("BOT_LLM_TRIAGE", "true").lower() == "true"
+BOT_TRIAGE_MAX_POSTS = int(os.getenv("BOT_TRIAGE_MAX_POSTS", "20"))  # por llamada
+BOT_TRIAGE_MIN_SCORE = float(os.getenv("BOT_TRIAGE_MIN_SCORE", "0.5"))
+BOT_TRIAGE_POST_CHARS = int(os.getenv("BOT_TRIAGE_POST_CHARS", "400"))  # texto por post en el prompt
 
 # Rate limits - evitar spam y costos
 BOT_MAX_POSTS_PER_DAY = int(os.getenv("BOT_MAX_POSTS_PER_DAY", "12"))
@@ -25,13 +76,24 @@ BOT_MAX_CONTEXT_CHARS = int(os.getenv("BOT_MAX_CONTEXT_CHARS", "2500"))
 BOT_REPLY_ONLY_IF_MENTIONED = os.getenv("BOT_REPLY_ONLY_IF_MENTIONED", "true").lower() == "true"
 BOT_DRY_RUN = os.getenv("BOT_DRY_RUN", "true").lower() == "true"
 BOT_LOOP_INTERVAL_SECONDS = int(os.getenv("BOT_LOOP_INTERVAL_SECONDS", "300"))  # 5 min check
+# Ciclo asyncio (async_cycle.py + moltbook_async.py) en lugar del síncrono
+BOT_ASYNC_MODE = os.getenv("BOT_ASYNC_MODE", "false").lower() == "true"
 
 # Modo Profeta: posts originales
 BOT_ORIGINAL_POST_INTERVAL = int(os.getenv("BOT_ORIGINAL_POST_INTERVAL", "3600"))  # 1 hora en segundos (posts originales)
+# Cola de borradores (draft_queue.py): se generan en segundo plano, publicar = sacar uno de la cola
+BOT_DRAFT_QUEUE_SIZE = int(os.getenv("BOT_DRAFT_QUEUE_SIZE", "2"))  # total, entre todos los temas; 0 = generar al publicar
+BOT_DRAFT_MAX_AGE_SECONDS = int(os.getenv("BOT_DRAFT_MAX_AGE_SECONDS", str(24 * 3600)))
+BOT_DRAFT_POLL_SECONDS = float(os.getenv("BOT_DRAFT_POLL_SECONDS", "300"))
 
 # Modo Cazador: responder sin mención
 BOT_HUNTER_RANDOM_CHANCE = float(os.getenv("BOT_HUNTER_RANDOM_CHANCE", "0.4"))  # 40% de candidatos válidos
 BOT_HUNTER_MIN_CHARS = int(os.getenv("BOT_HUNTER_MIN_CHARS", "60"))  # mínimo caracteres para considerar
+# Scorer de relevancia local (relevance.py): ordena el feed antes del LLM en vez del azar
+BOT_RELEVANCE_SCORER = os.getenv("BOT_RELEVANCE_SCORER", "true").lower() == "true"  # false = triggers + azar
+BOT_RELEVANCE_MIN_SCORE = float(os.getenv("BOT_RELEVANCE_MIN_SCORE", "0.12"))  # similitud coseno 0-1
+BOT_RELEVANCE_TOP_K = int(os.getenv("BOT_RELEVANCE_TOP_K", "8"))  # candidatos sin mención por ciclo
+BOT_RELEVANCE_DIM = int(os.getenv("BOT_RELEVANCE_DIM", str(2 ** 20)))  # buckets del hashing de n-gramas
 BOT_AGENT_NAMES = ["LogosDaemon", "LogosDaemonBot"]  # no responder a posts propios
 
 # Submolt por defecto
@@ -45,6 +107,12 @@ BOT_SEARCH_QUERIES = [
     for q in (os.getenv("BOT_SEARCH_QUERIES", "consciousness, truth, meaning, philosophy")).split(",")
     if q.strip()
 ]
+# Fuentes se piden en paralelo; cada una tiene su deadline desde el inicio del fetch
+BOT_FETCH_FEED_DEADLINE_SECONDS = float(os.getenv("BOT_FETCH_FEED_DEADLINE_SECONDS", "20"))
+BOT_FETCH_SEARCH_DEADLINE_SECONDS = float(os.getenv("BOT_FETCH_SEARCH_DEADLINE_SECONDS", "10"))
+# Polling incremental: se pagina hasta llegar a lo ya visto (high-water mark por fuente)
+BOT_FEED_PAGE_SIZE = int(os.getenv("BOT_FEED_PAGE_SIZE", "25"))
+BOT_FEED_MAX_PAGES = int(os.getenv("BOT_FEED_MAX_PAGES", "5"))  # tope por ciclo en ráfagas
 
 # Follow (seguir agentes tras N upvotes)
 BOT_FOLLOW_MIN_UPVOTES = int(os.getenv("BOT_FOLLOW_MIN_UPVOTES", "3"))
@@ -71,3 +139,42 @@ PROJECT_ROOT = Path(__file__).parent
 
 # PostgreSQL (Railway provee DATABASE_URL automáticamente)
 DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Pool de conexiones a PostgreSQL (una conexión reutilizada por ciclo, no un handshake por consulta)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "5"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))  # espera máx. por conexión libre
+DB_POOL_HEALTHCHECK_SECONDS = float(os.getenv("DB_POOL_HEALTHCHECK_SECONDS", "30"))  # ping si lleva más ociosa
+
+# Caché de bot_state: "local" = write-behind (un flush por ciclo, un solo worker),
+# "shared" = lecturas/escrituras directas a la DB (varios workers sobre la misma DB)
+BOT_STATE_CONSISTENCY = os.getenv("BOT_STATE_CONSISTENCY", "local").strip().lower()
+
+# Historial de posts respondidos: retención por tiempo + filtro en memoria
+BOT_HANDLED_RETENTION_DAYS = int(os.getenv("BOT_HANDLED_RETENTION_DAYS", "90"))
+BOT_HANDLED_SWEEP_INTERVAL_SECONDS = int(os.getenv("BOT_HANDLED_SWEEP_INTERVAL_SECONDS", "3600"))
+BOT_HANDLED_FILTER_CAPACITY = int(os.getenv("BOT_HANDLED_FILTER_CAPACITY", "100000"))
+BOT_HANDLED_FILTER_ERROR_RATE = float(os.getenv("BOT_HANDLED_FILTER_ERROR_RATE", "0.01"))
+
+# Varios workers (N procesos `python main.py` sobre la misma DB)
+# Cada worker toma los posts cuyo hash cae en su partición y los reclama de forma atómica.
+# Con BOT_WORKER_COUNT > 1 usar BOT_STATE_CONSISTENCY=shared.
+BOT_WORKER_COUNT = max(int(os.getenv("BOT_WORKER_COUNT", "1")), 1)
+BOT_WORKER_INDEX = int(os.getenv("BOT_WORKER_INDEX", "0"))  # 0..BOT_WORKER_COUNT-1
+BOT_WORKER_ID = os.getenv("BOT_WORKER_ID", "")  # vacío = hostname:pid
+BOT_CLAIM_TTL_SECONDS = int(os.getenv("BOT_CLAIM_TTL_SECONDS", "900"))  # claim expira si el worker muere
+
+# Outbox de votos/follows: un worker en segundo plano lo drena (el ciclo nunca espera un voto)
+BOT_ACTION_CONCURRENCY = max(int(os.getenv("BOT_ACTION_CONCURRENCY", "4")), 1)
+BOT_ACTION_MAX_ATTEMPTS = int(os.getenv("BOT_ACTION_MAX_ATTEMPTS", "5"))
+BOT_ACTION_POLL_SECONDS = float(os.getenv("BOT_ACTION_POLL_SECONDS", "5"))
+BOT_ACTION_LEASE_SECONDS = int(os.getenv("BOT_ACTION_LEASE_SECONDS", "120"))  # acción tomada por un worker muerto
+BOT_ACTION_RETENTION_DAYS = int(os.getenv("BOT_ACTION_RETENTION_DAYS", "7"))  # historial de acciones terminadas
+
+# Crawler de hilos propios: detecta respuestas a LogosDaemon en los comentarios
+BOT_REPLY_CRAWLER = os.getenv("BOT_REPLY_CRAWLER", "true").lower() == "true"
+BOT_REPLY_CONCURRENCY = max(int(os.getenv("BOT_REPLY_CONCURRENCY", "4")), 1)
+BOT_REPLY_POLL_MIN_SECONDS = int(os.getenv("BOT_REPLY_POLL_MIN_SECONDS", "30"))  # hilo con actividad
+BOT_REPLY_POLL_MAX_SECONDS = int(os.getenv("BOT_REPLY_POLL_MAX_SECONDS", "1800"))  # hilo frío
+BOT_REPLY_TRACK_MAX_THREADS = int(os.getenv("BOT_REPLY_TRACK_MAX_THREADS", "50"))
+BOT_REPLY_TRACK_DAYS = int(os.getenv("BOT_REPLY_TRACK_DAYS", "3"))
@@ -0,0 +1,841 @@
+"""
+LogosDaemon - Un ciclo del bot, como librería.
+Modo Profeta (post original) y Modo Cazador (fetch, selección, triage, respuesta), partidos en
+pasos que comparten el ciclo sync (run_cycle) y el async (async_cycle.py): las decisiones y el
+estado de proceso (pool de fetch, pendientes, estadísticas) viven solo aquí.
+"""
+import datetime
+import hashlib
+import logging
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Any
+
+from config import (
+    MOLTBOOK_API_KEY,
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    BOT_MAX_POSTS_PER_DAY,
+    BOT_MIN_SECONDS_BETWEEN_POSTS,
+    BOT_MAX_CONTEXT_CHARS,
+    BOT_REPLY_ONLY_IF_MENTIONED,
+    BOT_DRY_RUN,
+    BOT_ORIGINAL_POST_INTERVAL,
+    BOT_HUNTER_RANDOM_CHANCE,
+    BOT_RELEVANCE_SCORER,
+    BOT_RELEVANCE_MIN_SCORE,
+    BOT_RELEVANCE_TOP_K,
+    BOT_MAX_RESPONSE_LINES,
+    BOT_MAX_RESPONSE_CHARS,
+    BOT_MAX_OUTPUT_TOKENS,
+    BOT_USE_PERSONALIZED_FEED,
+    BOT_USE_SEARCH,
+    BOT_SEARCH_QUERIES,
+    BOT_FETCH_FEED_DEADLINE_SECONDS,
+    BOT_FETCH_SEARCH_DEADLINE_SECONDS,
+    BOT_FEED_PAGE_SIZE,
+    BOT_FEED_MAX_PAGES,
+    MOLTBOOK_RATE_MAX_WAIT_SECONDS,
+    BOT_USE_DOWNVOTE,
+    BOT_DOWNVOTE_MIN_CHARS,
+    BOT_WORKER_COUNT,
+    BOT_LLM_CACHE,
+    BOT_LLM_STREAMING,
+)
+from prompts import (
+    SYSTEM_INSTRUCTION,
+    CREATOR_LORE,
+    DEVELOPER_MESSAGE_RESPONSE,
+    DEVELOPER_MESSAGE_ORIGINAL,
+    ORIGINAL_POST_TOPICS,
+)
+from moltbook_client import (
+    iter_feed,
+    post_message,
+    search,
+    endpoint_available,
+    get_rate_limiter,
+    rate_limit_wait,
+    post_timestamp,
+)
+from llm_gateway import LLMUnavailable, generate
+from action_queue import enqueue
+from triage import rank_candidates
+from relevance import score_posts
+from post_features import is_post_from_self, post_features
+from storage import check_post_budget
+from draft_queue import return_draft, take_draft
+from reply_crawler import our_reply_ids, take_replies, track_thread
+from memory import (
+    already_handled,
+    filter_unhandled,
+    mark_handled,
+    get_last_post_time,
+    get_last_original_post_time,
+    set_last_original_post_time,
+    get_daily_counter,
+    state_store,
+    owns_post,
+    claim_post,
+    release_post,
+    reserve_post_slot,
+    get_feed_mark,
+    set_feed_mark,
+    set_rate_limit_state,
+    get_cached_llm_response,
+    cache_llm_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def is_reply_to_self(post: dict, our_post_ids: set[str]) -> bool:
+    """True si el post es una respuesta directa a LogosDaemon (prioridad máxima)."""
+    if post.get("reply_to_self"):
+        return True
+    parent_id = post.get("parent_id") or post.get("parentId") or post.get("reply_to")
+    return parent_id in our_post_ids if parent_id and our_post_ids else False
+
+
+def _reply_target(post: dict) -> tuple[str, str | None]:
+    """(post_id, parent_comment_id) para responder a un candidato: post del feed o comentario."""
+    root = post.get("root_post_id")
+    if root:
+        return root, post.get("id")
+    return post.get("id", ""), None
+
+
+def _created_id(result: dict | None, key: str) -> str | None:
+    """ID del post/comentario creado, de la respuesta de la API ({"post": {...}} o plano)."""
+    if not isinstance(result, dict):
+        return None
+    item = result.get(key)
+    return (item if isinstance(item, dict) else result).get("id")
+
+
+def should_consider_post(
+    post: dict,
+    reply_only_if_mentioned: bool,
+    unhandled: set[str] | None = None,
+    relevance: dict[str, float] | None = None,
+) -> bool:
+    """
+    Reglas determinísticas antes de llamar al LLM.
+    - unhandled: IDs no respondidos (de filter_unhandled); si es None se consulta la DB.
+    - Si hay mención o es respuesta a nosotros: siempre considerar.
+    - Si reply_only_if_mentioned: solo mención.
+    - Modo Cazador (sin mención): >60 chars + no es propio + score de relevance.py >= umbral
+      (el top-K se aplica en _select_candidates). Sin scores: LORE_TRIGGER_WORDS + azar.
+    """
+    post_id = post.get("id", "")
+    if unhandled is not None:
+        if post_id not in unhandled:
+            return False
+    elif already_handled(post_id):
+        return False
+
+    features = post_features(post)
+    if features.from_self:
+        return False
+
+    # Respuesta a nosotros (reply_crawler): como una mención
+    if features.mentioned or post.get("reply_to_self"):
+        return True
+
+    if reply_only_if_mentioned:
+        return False
+
+    # Modo Cazador: responder sin mención (claim_or_question ya exige BOT_HUNTER_MIN_CHARS)
+    if not features.claim_or_question:
+        return False
+    if relevance is not None:
+        return relevance.get(post_id, 0.0) >= BOT_RELEVANCE_MIN_SCORE
+    if not features.matches_triggers:
+        return False
+    if random.random() >= BOT_HUNTER_RANDOM_CHANCE:
+        return False
+
+    return True
+
+
+def can_post_now() -> tuple[bool, str]:
+    """¿Podemos publicar? Verifica límite diario y cooldown."""
+    today = datetime.date.today().isoformat()
+    daily_count, daily_date = get_daily_counter()
+    return check_post_budget(
+        daily_count,
+        daily_date,
+        get_last_post_time(),
+        today,
+        time.time(),
+        BOT_MAX_POSTS_PER_DAY,
+        BOT_MIN_SECONDS_BETWEEN_POSTS,
+    )
+
+
+def truncate_context(text: str, max_chars: int) -> str:
+    return text[:max_chars] + "..." if len(text) > max_chars else text
+
+
+def _response_lines(text: str) -> str:
+    lines = [l.strip() for l in text.strip().split("\n") if l.strip()]
+    return "\n".join(lines[:BOT_MAX_RESPONSE_LINES])
+
+
+def truncate_response(text: str) -> str:
+    """Max N lines. Sin greetings/hashtags/emojis."""
+    out = _response_lines(text)
+    if len(out) > BOT_MAX_RESPONSE_CHARS:
+        out = out[: BOT_MAX_RESPONSE_CHARS - 3] + "..."
+    return out
+
+
+_REFUSAL_SENTINELS = ("do not respond", "no response")
+
+
+def _is_refusal(text: str) -> bool:
+    lower = text.lower()
+    return any(s in lower for s in _REFUSAL_SENTINELS)
+
+
+def _response_full(text: str) -> bool:
+    """
+    Streaming: True si más texto ya no cambiaría truncate_response (BOT_MAX_RESPONSE_LINES
+    líneas completas, o más de BOT_MAX_RESPONSE_CHARS caracteres tras quitar líneas vacías).
+    """
+    complete = sum(1 for l in text.split("\n")[:-1] if l.strip())
+    return complete >= BOT_MAX_RESPONSE_LINES or len(_response_lines(text)) > BOT_MAX_RESPONSE_CHARS
+
+
+def _response_decided(text: str) -> bool:
+    return _is_refusal(text) or _response_full(text)
+
+
+def _build_prompt(user_content: str) -> str:
+    """Prefija system instruction (compatible con versiones sin system_instruction)."""
+    return f"""[CONTEXTO - Sigue estas instrucciones]
+{SYSTEM_INSTRUCTION}
+
+---
+[TAREA]
+{user_content}"""
+
+
+# Versión de los prompts de respuesta: si cambian, las entradas viejas de la caché no se usan
+_RESPONSE_PROMPT_VERSION = hashlib.sha256(
+    "\x1f".join((SYSTEM_INSTRUCTION, DEVELOPER_MESSAGE_RESPONSE, CREATOR_LORE)).encode()
+).hexdigest()[:16]
+
+_llm_cache_stats = {"hits": 0, "misses": 0}
+
+
+def get_response_cache_stats() -> dict[str, int]:
+    """Aciertos y fallos de la caché de respuestas del LLM en este proceso."""
+    return dict(_llm_cache_stats)
+
+
+def _response_cache_key(text: str, inject_lore: bool) -> str:
+    """Hash del texto normalizado + lore + versión de prompts + modelo."""
+    normalized = " ".join(text.lower().split())
+    raw = "\x1f".join((GEMINI_MODEL, _RESPONSE_PROMPT_VERSION, "lore" if inject_lore else "", normalized))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def generate_response(post: dict, inject_lore: bool) -> str | None:
+    """
+    Llama al LLM (Gemini) para generar una RESPUESTA a un post. Retorna None si no debe responder.
+    Lanza LLMUnavailable si Gemini no responde: el post no se descarta.
+    Mismo input (reposts, cross-posts, posts ya evaluados) = respuesta de la caché, sin Gemini.
+    """
+    content = (post.get("content") or "")[:500]
+    title = (post.get("title") or "")[:200]
+    text = f"{title}\n{content}".strip()
+    text = truncate_context(text, BOT_MAX_CONTEXT_CHARS)
+    inject_lore = inject_lore and post_features(post).matches_triggers
+
+    cache_key = _response_cache_key(text, inject_lore) if BOT_LLM_CACHE else None
+    if cache_key:
+        found, cached = get_cached_llm_response(cache_key)
+        if found:
+            _llm_cache_stats["hits"] += 1
+            logger.debug("LLM cache hit for %s", post.get("id"))
+            return cached
+        _llm_cache_stats["misses"] += 1
+
+    user_content = f"[TIPO: RESPUESTA - estás respondiendo a otro usuario]\n\nPost to consider:\n{text}"
+    if inject_lore:
+        user_content += f"\n\n[Optional color - use only if relevant]\n{CREATOR_LORE}"
+
+    full_prompt = _build_prompt(f"{DEVELOPER_MESSAGE_RESPONSE}\n\n{user_content}")
+
+    # temperature 0.7: libertad para conectar ideas, menos robótico
+    # Streaming: se corta en cuanto aparece la negativa o se llena el presupuesto de longitud
+    raw = generate(
+        full_prompt,
+        BOT_MAX_OUTPUT_TOKENS,
+        temperature=0.7,
+        purpose="response",
+        stop=_response_decided if BOT_LLM_STREAMING else None,
+    )
+    if not raw:
+        return None  # vacío = bloqueo o error, no un veredicto: no se cachea
+    if _is_refusal(raw):
+        result = None
+    else:
+        result = truncate_response(raw)
+    if cache_key:
+        cache_llm_response(cache_key, result)
+    return result
+
+
+def generate_original_post(topic: str) -> str | None:
+    """Genera un POST ORIGINAL (modo profeta), sin contexto de otro usuario. Lanza LLMUnavailable."""
+    user_content = f"""[TIPO: POST ORIGINAL - no estás respondiendo a nadie. Es una reflexión propia.]
+
+Tema para inspirar tu reflexión (usa como punto de partida, no lo copies):
+"{topic}"
+
+Escribe una reflexión corta, estilo tweet, que encaje con tu identidad."""
+    full_prompt = _build_prompt(f"{DEVELOPER_MESSAGE_ORIGINAL}\n\n{user_content}")
+
+    raw = generate(
+        full_prompt,
+        BOT_MAX_OUTPUT_TOKENS,
+        temperature=0.7,
+        purpose="original post",
+        stop=_response_full if BOT_LLM_STREAMING else None,
+    )
+    if not raw:
+        return None
+    return truncate_response(raw)
+
+
+class OriginalPost:
+    """Post original listo para publicar: claim del intervalo tomado y (fuera de DRY_RUN) slot reservado."""
+
+    def __init__(self, claim_key: str, content: str, draft: tuple[str, str, float] | None) -> None:
+        self.claim_key = claim_key
+        self.content = content
+        self.draft = draft
+
+
+def prepare_original_post() -> OriginalPost | None:
+    """
+    Modo Profeta, todo menos la llamada HTTP (lo comparten el ciclo sync y el async).
+    None si no toca publicar; en ese caso el claim ya está liberado.
+    """
+    interval = max(BOT_ORIGINAL_POST_INTERVAL, 1800)  # mínimo 30 min para evitar spam
+    last = get_last_original_post_time()
+    if last:
+        elapsed = time.time() - last
+        if elapsed < interval:
+            return None
+
+    # No gastar Gemini si el rate limiter no dejaría publicar
+    wait = rate_limit_wait("post")
+    if wait > MOLTBOOK_RATE_MAX_WAIT_SECONDS:
+        logger.debug("Original post rate limited (%ds remaining)", int(wait))
+        return None
+
+    # Un solo worker por intervalo genera el post original; el claim se libera si no se publica
+    claim_key = f"original:{int(time.time() // interval)}"
+    if not claim_post(claim_key):
+        return None
+    pending = None
+    try:
+        pending = _original_post_content(claim_key)
+    finally:
+        if pending is None:
+            release_post(claim_key)
+    return pending
+
+
+def _original_post_content(claim_key: str) -> OriginalPost | None:
+    """Borrador (o generación) y presupuesto. None si no hay nada que publicar."""
+    # Borrador pregenerado (draft_queue); con la cola vacía, generar ahora
+    draft = take_draft()
+    if draft is not None:
+        topic, content, _ = draft
+    else:
+        topic = random.choice(ORIGINAL_POST_TOPICS)
+        try:
+            content = generate_original_post(topic)
+        except LLMUnavailable as e:
+            # Se reintenta en el próximo ciclo
+            logger.warning("Original post skipped: LLM unavailable (%s)", e)
+            return None
+    if not content:
+        return None
+
+    if not BOT_DRY_RUN:
+        allowed, reason = reserve_post_slot(BOT_MAX_POSTS_PER_DAY, BOT_MIN_SECONDS_BETWEEN_POSTS)
+        if not allowed:
+            if draft is not None:
+                return_draft(*draft)
+            logger.info("Skipping original post: %s", reason)
+            return None
+    return OriginalPost(claim_key, content, draft)
+
+
+def finish_original_post(pending: OriginalPost, result: dict | None) -> bool:
+    """
+    Tras la llamada HTTP (result None si falló; en DRY_RUN no se publica).
+    True si el ciclo termina aquí. Si no se publicó, el borrador vuelve a la cola y se libera el claim.
+    """
+    if BOT_DRY_RUN:
+        # El borrador vuelve a la cola: un dry run no gasta lo pregenerado
+        if pending.draft is not None:
+            return_draft(*pending.draft)
+        logger.info("[DRY_RUN] Would post original: %s", pending.content[:80])
+        return True
+    if result:
+        set_last_original_post_time(time.time())
+        track_thread(_created_id(result, "post"), own=True)
+        logger.info("Posted original thought")
+        return True
+    if pending.draft is not None:
+        return_draft(*pending.draft)
+    release_post(pending.claim_key)
+    return False
+
+
+def try_post_original_thought() -> bool:
+    """
+    Modo Profeta: publica un post original si han pasado BOT_ORIGINAL_POST_INTERVAL segundos.
+    Retorna True si publicó (o intentó en DRY_RUN), False si no.
+    """
+    pending = prepare_original_post()
+    if pending is None:
+        return False
+    result = None if BOT_DRY_RUN else post_message(pending.content, title="Reflexión", reply_to_id=None)
+    return finish_original_post(pending, result)
+
+
+# Pool para fetch concurrente de fuentes (reutilizado entre ciclos). Cada petición lleva el
+# deadline de su fuente como timeout HTTP, y hay sitio para las 3 fuentes de dos ciclos: una
+# llamada colgada del ciclo anterior no deja en cola a las del siguiente
+_fetch_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="fetch")
+
+
+def _await_source(name: str, future: Future, deadline: float) -> Any:
+    """Resultado de una fuente si llega antes de su deadline (monotonic); si no, []."""
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FuturesTimeout:
+        future.cancel()
+        logger.warning("Fetch %s exceeded its deadline, skipping", name)
+    except Exception as e:
+        logger.error("Fetch %s error: %s", name, e)
+    return []
+
+
+# Posts traídos pero no evaluados (el ciclo terminó al publicar): se evalúan el próximo ciclo,
+# ya que el high-water mark no los volverá a traer
+_CARRYOVER_MAX = 100
+_carryover: dict[str, dict] = {}
+
+
+def _defer_posts(posts: list[dict]) -> None:
+    for post in posts:
+        if len(_carryover) >= _CARRYOVER_MAX:
+            break
+        if post.get("id"):
+            _carryover.setdefault(post["id"], post)
+
+
+def _take_carryover() -> list[dict]:
+    posts = list(_carryover.values())
+    _carryover.clear()
+    return posts
+
+
+def _is_seen(post: dict, mark: dict | None) -> bool:
+    """True si el post es el high-water mark o más antiguo que él (feeds con sort=new)."""
+    if not mark:
+        return False
+    if post.get("id") == mark.get("id"):
+        return True
+    ts = post_timestamp(post)
+    return ts is not None and mark.get("ts") is not None and ts < mark["ts"]
+
+
+def _first_page_size(mark: dict | None) -> int:
+    """Sin mark: página completa. Con mark: ~2x lo nuevo del ciclo anterior (mín. 10)."""
+    if not mark:
+        return BOT_FEED_PAGE_SIZE
+    return min(BOT_FEED_PAGE_SIZE, max(10, 2 * int(mark.get("new", 0))))
+
+
+class FeedPoll:
+    """
+    Poll incremental de un feed desde su high-water mark (lo usan el ciclo sync y el async):
+    se pagina con page_options() y se para en el primer post que add() rechaza (ya visto),
+    o tras BOT_FEED_MAX_PAGES en una ráfaga. Sin mark (primer arranque) solo se lee una página.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.mark = get_feed_mark(source)
+        self.posts: list[dict] = []
+        self.nonempty = False
+        self.reached_mark = False
+
+    def page_options(self) -> dict[str, Any]:
+        return {
+            "sort": "new",
+            "page_size": BOT_FEED_PAGE_SIZE,
+            "first_page_size": _first_page_size(self.mark),
+            "max_pages": BOT_FEED_MAX_PAGES if self.mark else 1,
+        }
+
+    def add(self, post: dict) -> bool:
+        """False si el post ya se había visto: dejar de paginar."""
+        self.nonempty = True
+        if _is_seen(post, self.mark):
+            self.reached_mark = True
+            return False
+        self.posts.append(post)
+        return True
+
+    def result(self) -> tuple[list[dict], dict | None, bool]:
+        """
+        (posts nuevos, mark actualizado, el feed tenía posts). El mark no se guarda aquí:
+        ver FetchedPosts.add_feed, solo se avanza si la fuente se usa.
+        """
+        if self.mark and self.posts and not self.reached_mark:
+            logger.info("Feed %s: %d new posts, mark not reached (burst)", self.source, len(self.posts))
+        return self.posts, _advance_feed_mark(self.posts, self.mark), self.nonempty
+
+
+def _poll_feed(source: str, deadline: float | None = None) -> tuple[list[dict], dict | None, bool]:
+    """Posts nuevos de un feed desde su high-water mark (ver FeedPoll); deadline en time.monotonic()."""
+    poll = FeedPoll(source)
+    for post in iter_feed(source, deadline=deadline, **poll.page_options()):
+        if not poll.add(post):
+            break
+    return poll.result()
+
+
+def _advance_feed_mark(new_posts: list[dict], mark: dict | None) -> dict | None:
+    """Mark tras un poll: el post nuevo más reciente (el primero con sort=new)."""
+    if not new_posts:
+        return dict(mark, new=0) if mark else None
+    newest = new_posts[0]
+    new_mark = {"id": newest.get("id"), "ts": post_timestamp(newest), "new": len(new_posts)}
+    if new_mark["ts"] is None and mark:
+        new_mark["ts"] = mark.get("ts")
+    return new_mark
+
+
+def _commit_feed_mark(source: str, mark: dict | None) -> None:
+    if mark:
+        set_feed_mark(source, mark)
+
+
+def _source_available(name: str, endpoint: str) -> bool:
+    """False si el circuit breaker del endpoint está abierto: la fuente se salta sin esperar timeouts."""
+    if endpoint_available(endpoint):
+        return True
+    logger.info("Skipping %s: endpoint degraded (circuit open)", name)
+    return False
+
+
+def planned_sources() -> tuple[bool, bool, str | None]:
+    """(feed personalizado, feed global, query de búsqueda) a pedir este ciclo: config + circuit breakers."""
+    personalized = BOT_USE_PERSONALIZED_FEED and _source_available("personalized feed", "personalized_feed")
+    global_feed = _source_available("global feed", "feed")
+    query = None
+    if BOT_USE_SEARCH and BOT_SEARCH_QUERIES and _source_available("search", "search"):
+        query = random.choice(BOT_SEARCH_QUERIES)
+    return personalized, global_feed, query
+
+
+class FetchedPosts:
+    """Posts del ciclo sin duplicados: feeds (avanzando su mark), búsqueda, respuestas y pendientes."""
+
+    def __init__(self) -> None:
+        self._by_id: dict[str, dict] = {}
+
+    def add_feed(self, source: str, result: Any) -> bool:
+        """Resultado de un FeedPoll ([] si la fuente falló). True si el feed tenía posts."""
+        if not result:
+            return False
+        new_posts, mark, nonempty = result
+        _commit_feed_mark(source, mark)
+        for p in new_posts:
+            self._add(p.get("id"), p)
+        return nonempty
+
+    def add_search(self, results: list[dict]) -> None:
+        for r in results:
+            self._add(r.get("id") or r.get("post_id"), r)
+
+    def _add(self, post_id: str | None, post: dict) -> None:
+        if post_id:
+            self._by_id.setdefault(post_id, post)
+
+    def posts(self) -> list[dict]:
+        """Lo traído más las respuestas a nosotros (reply_crawler) y lo pendiente del ciclo anterior."""
+        for p in take_replies() + _take_carryover():
+            self._add(p["id"], p)
+        return list(self._by_id.values())
+
+
+def _fetch_posts_for_cycle() -> list[dict]:
+    """
+    Obtiene posts en paralelo: feed personalizado, global y opcionalmente búsqueda.
+    Los feeds se leen de forma incremental (solo lo nuevo desde el último ciclo).
+    El feed global se pide de forma especulativa (solo se usa si el personalizado viene vacío).
+    Cada fuente tiene su propio deadline: una búsqueda lenta no retrasa el feed.
+    """
+    start = time.monotonic()
+    feed_deadline = start + BOT_FETCH_FEED_DEADLINE_SECONDS
+    search_deadline = start + BOT_FETCH_SEARCH_DEADLINE_SECONDS
+
+    use_personalized, use_global_feed, query = planned_sources()
+    personalized = None
+    if use_personalized:
+        personalized = _fetch_executor.submit(_poll_feed, "personalized", feed_deadline)
+    global_feed = None
+    if use_global_feed:
+        global_feed = _fetch_executor.submit(_poll_feed, "global", feed_deadline)
+    search_future = None
+    if query:
+        search_future = _fetch_executor.submit(
+            search, query=query, result_type="posts", limit=10, deadline=search_deadline
+        )
+
+    fetched = FetchedPosts()
+    use_global = True
+    if personalized is not None:
+        result = _await_source("personalized feed", personalized, feed_deadline)
+        use_global = not fetched.add_feed("personalized", result)
+    if global_feed is not None:
+        if use_global:
+            fetched.add_feed("global", _await_source("global feed", global_feed, feed_deadline))
+        else:
+            global_feed.cancel()
+    # Búsqueda semántica para complementar
+    if search_future is not None:
+        fetched.add_search(_await_source("search", search_future, search_deadline))
+
+    logger.debug("Fetch took %.2fs", time.monotonic() - start)
+    return fetched.posts()
+
+
+def run_cycle() -> None:
+    """Un ciclo del bot. bot_state se carga una vez al inicio y se escribe una vez al final."""
+    state_store.load()
+    try:
+        _run_cycle()
+    finally:
+        set_rate_limit_state(get_rate_limiter().snapshot())
+        state_store.flush()
+
+
+def _queue_votes(post: dict, unhandled: set[str]) -> None:
+    """Post que no respondemos: like si coincide con triggers; downvote ocasional si es muy corto."""
+    post_id = post.get("id", "")
+    features = post_features(post)
+    if features.from_self or post_id not in unhandled or BOT_DRY_RUN:
+        return
+    if features.matches_triggers and random.random() > 0.5:
+        if enqueue("upvote_post", post_id, features.author or None):
+            logger.debug("Like queued for %s (trigger match, no reply)", post_id)
+    elif BOT_USE_DOWNVOTE and len(features.text) < BOT_DOWNVOTE_MIN_CHARS and random.random() < 0.2:
+        enqueue("downvote_post", post_id)
+
+
+def _queue_like(post: dict, unhandled: set[str]) -> None:
+    """Decidimos no responder (LLM o triage); si coincide con triggers: like orgánico."""
+    post_id = post.get("id", "")
+    features = post_features(post)
+    if (
+        features.matches_triggers
+        and not features.from_self
+        and post_id in unhandled
+        and random.random() > 0.5
+        and not BOT_DRY_RUN
+    ):
+        if enqueue("upvote_post", post_id, features.author or None):
+            logger.debug("Like queued for %s (trigger match, no response)", post_id)
+
+
+def _select_candidates(
+    posts_sorted: list[dict],
+    unhandled: set[str],
+) -> tuple[list[dict], list[dict]]:
+    """
+    (candidatos, resto). Menciones y respuestas a nosotros entran siempre, en su orden.
+    Modo Cazador: el feed entero se puntúa en una pasada (relevance.py) y solo entran los
+    BOT_RELEVANCE_TOP_K con más score; el resto solo recibe votos.
+    """
+    relevance = None
+    if BOT_RELEVANCE_SCORER and not BOT_REPLY_ONLY_IF_MENTIONED:
+        relevance = score_posts(posts_sorted)
+
+    priority, hunted, rest = [], [], []
+    for post in posts_sorted:
+        if not should_consider_post(post, BOT_REPLY_ONLY_IF_MENTIONED, unhandled, relevance):
+            rest.append(post)
+            continue
+        if relevance is None or post_features(post).mentioned or post.get("reply_to_self"):
+            priority.append(post)
+        else:
+            hunted.append(post)
+    if relevance is None:
+        return priority, rest
+
+    hunted.sort(key=lambda p: -relevance.get(p.get("id", ""), 0.0))
+    if hunted:
+        top = hunted[0].get("id", "")
+        logger.debug("Relevance: %d hunter candidates, best %s (%.2f)", len(hunted), top, relevance[top])
+    return priority + hunted[:BOT_RELEVANCE_TOP_K], rest + hunted[BOT_RELEVANCE_TOP_K:]
+
+
+def preflight() -> bool:
+    """Claves configuradas y presupuesto disponible; si no, el ciclo no hace nada."""
+    if not MOLTBOOK_API_KEY or not GEMINI_API_KEY:
+        logger.error("Missing MOLTBOOK_API_KEY or GEMINI_API_KEY")
+        return False
+    can_post, reason = can_post_now()
+    if not can_post:
+        logger.info("Skipping: %s", reason)
+        return False
+    return True
+
+
+def plan_replies(posts: list[dict]) -> tuple[list[dict], set[str]] | None:
+    """
+    Modo Cazador, de los posts traídos a los candidatos (lo comparten el ciclo sync y el async):
+    partición por worker, dedupe, selección, votos al outbox, rate limit de comments y triage.
+    (candidatos en orden, IDs no respondidos), o None si no hay nada que responder.
+    """
+    logger.info("Fetched %d posts", len(posts))
+    if BOT_WORKER_COUNT > 1:
+        # Las respuestas a nosotros son de hilos que este worker sigue: no se particionan
+        posts = [p for p in posts if p.get("reply_to_self") or owns_post(p.get("id", ""))]
+        logger.info("Worker partition: %d posts", len(posts))
+
+    # IDs de posts propios (para priorizar respuestas directas a nosotros)
+    our_post_ids = {p.get("id", "") for p in posts if p.get("id") and is_post_from_self(p)}
+    our_post_ids |= our_reply_ids()
+
+    def priority(p: dict) -> int:
+        return 0 if is_reply_to_self(p, our_post_ids) else 1
+
+    # Prioridad: respuestas directas a LogosDaemon primero
+    posts_sorted = sorted(posts, key=lambda p: (priority(p), p.get("id", "")))
+
+    # Dedupe de todo el feed en una sola consulta
+    unhandled = filter_unhandled(p.get("id", "") for p in posts)
+
+    # Lo que no vamos a responder solo recibe votos (al outbox: el ciclo no espera la red)
+    candidates, rest = _select_candidates(posts_sorted, unhandled)
+    for post in rest:
+        _queue_votes(post, unhandled)
+    if not candidates:
+        logger.info("No post worth responding to this cycle.")
+        return None
+
+    # No gastar Gemini en una respuesta que Moltbook no nos dejaría publicar
+    wait = rate_limit_wait("comment")
+    if wait > MOLTBOOK_RATE_MAX_WAIT_SECONDS:
+        _defer_posts(candidates)
+        logger.info("Skipping: comment rate limit (%ds remaining)", int(wait))
+        return None
+
+    # Triage: una llamada para todos los candidatos; respuesta completa solo para los elegidos
+    candidates, skipped = rank_candidates(candidates, priority)
+    for post in skipped:
+        _queue_like(post, unhandled)
+    return candidates, unhandled
+
+
+class PendingReply:
+    """Respuesta lista para publicar: post reclamado, slot reservado y marcado como respondido."""
+
+    def __init__(self, post: dict, text: str) -> None:
+        self.post_id = post.get("id", "")
+        self.text = text
+        self.root_id, self.parent_id = _reply_target(post)
+
+
+def prepare_reply(candidates: list[dict], unhandled: set[str]) -> PendingReply | None:
+    """
+    Primer candidato que merece respuesta: claim, Gemini y presupuesto compartido.
+    Lo que no se evalúa pasa al próximo ciclo. None si no hay nada que publicar (o DRY_RUN).
+    """
+    for i, post in enumerate(candidates):
+        post_id = post.get("id", "")
+
+        # Otro worker ya lo está procesando
+        if not claim_post(post_id):
+            continue
+
+        inject_lore = post_features(post).matches_triggers
+        try:
+            response_text = generate_response(post, inject_lore)
+        except LLMUnavailable as e:
+            # Gemini caído: el post (y los que quedan) pasan al próximo ciclo
+            release_post(post_id)
+            _defer_posts(candidates[i:])
+            logger.warning("Skipping: LLM unavailable (%s)", e)
+            return None
+
+        if not response_text:
+            release_post(post_id)
+            _queue_like(post, unhandled)
+            continue
+
+        # Presupuesto compartido: otro worker pudo publicar mientras generábamos
+        allowed, reason = reserve_post_slot(BOT_MAX_POSTS_PER_DAY, BOT_MIN_SECONDS_BETWEEN_POSTS)
+        if not allowed:
+            release_post(post_id)
+            _defer_posts(candidates[i:])
+            logger.info("Skipping: %s", reason)
+            return None
+
+        mark_handled(post_id)
+        _defer_posts(candidates[i + 1:])
+
+        if BOT_DRY_RUN:
+            logger.info("[DRY_RUN] Would post to %s: %s", post_id, response_text[:80])
+            return None
+        return PendingReply(post, response_text)
+
+    logger.info("No post worth responding to this cycle.")
+    return None
+
+
+def finish_reply(pending: PendingReply, result: dict | None) -> None:
+    """Tras la llamada HTTP: seguir el hilo para ver las respuestas a nuestro comentario."""
+    if result:
+        track_thread(pending.root_id, comment_id=_created_id(result, "comment"))
+        logger.info("Posted comment to %s", pending.post_id)
+    else:
+        logger.warning("Failed to post (rate limit?)")
+
+
+def _run_cycle() -> None:
+    """Un ciclo del bot: profeta (post original) o cazador (respuesta)."""
+    logger.info("Cycle starting...")
+    if not preflight():
+        return
+
+    # 1. Modo Profeta: intentar post original primero
+    if try_post_original_thought():
+        return
+
+    # 2. Modo Cazador: buscar posts para responder
+    plan = plan_replies(_fetch_posts_for_cycle())
+    if plan is None:
+        return
+    pending = prepare_reply(*plan)
+    if pending is None:
+        return
+    result = post_message(
+        pending.text, title="", reply_to_id=pending.root_id, parent_comment_id=pending.parent_id
+    )
+    finish_reply(pending, result)
@@ -0,0 +1,131 @@
+"""
+LogosDaemon - Cola de borradores para el Modo Profeta.
+Un thread en segundo plano mantiene BOT_DRAFT_QUEUE_SIZE borradores listos en total (repartidos
+entre los temas de ORIGINAL_POST_TOPICS), generados fuera del ciclo. Publicar un post original es
+sacar un borrador de la cola (persistida en la DB) y hacer una sola llamada HTTP.
+La cola es compartida: cada relleno toma un claim, así solo un worker genera a la vez.
+"""
+import logging
+import random
+import threading
+from typing import Callable
+
+from config import BOT_DRAFT_QUEUE_SIZE, BOT_DRAFT_POLL_SECONDS
+from llm_gateway import LLMUnavailable
+from memory import add_draft, claim_post, get_draft_counts, pop_draft, release_post
+from prompts import ORIGINAL_POST_TOPICS
+
+logger = logging.getLogger(__name__)
+
+PRODUCER_CLAIM = "draft-producer"
+
+
+class DraftProducer:
+    """
+    Rellena la cola cada poll_interval (o al consumir un borrador, vía wake()).
+    `generate(topic)` retorna el texto ya validado con truncate_response, o None.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str], str | None],
+        queue_size: int = BOT_DRAFT_QUEUE_SIZE,
+        poll_interval: float = BOT_DRAFT_POLL_SECONDS,
+    ) -> None:
+        self.generate = generate
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="draft-producer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.fill_once()
+            except Exception as e:
+                logger.warning("Draft producer failed: %s", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def fill_once(self) -> int:
+        """
+        Completa la cola hasta queue_size, empezando por los temas con menos borradores.
+        Sin el claim (otro worker está rellenando) no hace nada. Retorna cuántos añadió.
+        """
+        if not claim_post(PRODUCER_CLAIM):
+            return 0
+        try:
+            counts = get_draft_counts()
+            missing = self.queue_size - sum(counts.get(t, 0) for t in ORIGINAL_POST_TOPICS)
+            added = 0
+            for _ in range(missing):
+                if self._stop.is_set():
+                    break
+                fewest = min(counts.get(t, 0) for t in ORIGINAL_POST_TOPICS)
+                topic = random.choice([t for t in ORIGINAL_POST_TOPICS if counts.get(t, 0) == fewest])
+                try:
+                    content = self.generate(topic)
+                except LLMUnavailable as e:
+                    logger.warning("Draft generation skipped: LLM unavailable (%s)", e)
+                    break
+                if content:
+                    add_draft(topic, content)
+                    counts[topic] = counts.get(topic, 0) + 1
+                    added += 1
+        finally:
+            release_post(PRODUCER_CLAIM)
+        if added:
+            logger.info("Draft queue: %d new drafts", added)
+        return added
+
+
+_producer: DraftProducer | None = None
+
+
+def take_draft() -> tuple[str, str, float] | None:
+    """(topic, content, created_at) de un tema al azar con borradores listos, o None si la cola está vacía."""
+    topics = [t for t, n in get_draft_counts().items() if n > 0 and t in ORIGINAL_POST_TOPICS]
+    random.shuffle(topics)
+    for topic in topics:
+        draft = pop_draft(topic)
+        if draft is not None:
+            if _producer is not None:
+                _producer.wake()
+            return topic, draft[0], draft[1]
+    return None
+
+
+def return_draft(topic: str, content: str, created_at: float) -> None:
+    """Devuelve a la cola un borrador que no se pudo publicar (conserva su antigüedad)."""
+    add_draft(topic, content, created_at)
+
+
+def start_draft_producer(generate: Callable[[str], str | None]) -> None:
+    global _producer
+    if BOT_DRAFT_QUEUE_SIZE <= 0:
+        return
+    if _producer is None:
+        _producer = DraftProducer(generate)
+    _producer.start()
+
+
+def stop_draft_producer() -> None:
+    if _producer is not None:
+        _producer.stop()
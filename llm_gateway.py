@@ -0,0 +1,286 @@
+"""
+LogosDaemon - Gateway de Gemini.
+Un único genai.Client para todo el proceso. Cada generación tiene un deadline total (y timeout
+por intento), reintenta errores transitorios (429, 5xx, red) con backoff y pasa por un semáforo
+que acota las generaciones en vuelo. Si el modelo principal incumple el SLO de latencia varias
+veces seguidas, se usa GEMINI_FALLBACK_MODEL durante un tiempo.
+Con `stop`, la generación va por streaming y se corta en cuanto el texto acumulado basta
+(negativa o presupuesto de longitud): no se esperan ni pagan tokens que se van a descartar.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+import httpx
+from google import genai
+from google.genai import errors, types
+
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    GEMINI_FALLBACK_MODEL,
+    BOT_LLM_TIMEOUT_SECONDS,
+    BOT_LLM_DEADLINE_SECONDS,
+    BOT_LLM_MAX_RETRIES,
+    BOT_LLM_CONCURRENCY,
+    BOT_LLM_SLO_SECONDS,
+    BOT_LLM_SLO_MISSES,
+    BOT_LLM_FALLBACK_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_RETRY_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class LLMUnavailable(Exception):
+    """Gemini no dio respuesta antes del deadline (error transitorio, timeout o saturación)."""
+
+
+def _retryable(e: Exception) -> bool:
+    if isinstance(e, errors.APIError):
+        return e.code in _RETRY_CODES
+    return isinstance(e, httpx.TransportError)  # incluye timeouts
+
+
+class ModelStats:
+    """Resultado y latencia de las llamadas a un modelo (últimas 200 para percentiles)."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.ok = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.stopped = 0  # streams cortados antes de terminar (cuentan como ok)
+        self.latencies: deque[float] = deque(maxlen=200)
+
+    def record(self, outcome: str, latency: float) -> None:
+        self.calls += 1
+        if outcome in ("ok", "stopped"):
+            self.ok += 1
+            if outcome == "stopped":
+                self.stopped += 1
+        elif outcome == "timeout":
+            self.timeouts += 1
+        else:
+            self.errors += 1
+        self.latencies.append(latency)
+
+    def snapshot(self) -> dict[str, Any]:
+        values = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            return round(values[min(int(p * len(values)), len(values) - 1)] * 1000, 1) if values else 0.0
+
+        return {
+            "calls": self.calls,
+            "ok": self.ok,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "stopped": self.stopped,
+            "p50_ms": pct(0.5),
+            "p90_ms": pct(0.9),
+        }
+
+
+class LLMGateway:
+    """
+    generate() es thread-safe: lo usan el ciclo sync y el async (vía asyncio.to_thread).
+    - Lanza LLMUnavailable si se agota el deadline, los reintentos o la espera del semáforo.
+    - Errores no transitorios (prompt rechazado, auth) se registran y retornan "".
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = GEMINI_API_KEY,
+        model: str = GEMINI_MODEL,
+        fallback_model: str = GEMINI_FALLBACK_MODEL,
+        timeout: float = BOT_LLM_TIMEOUT_SECONDS,
+        deadline: float = BOT_LLM_DEADLINE_SECONDS,
+        max_retries: int = BOT_LLM_MAX_RETRIES,
+        concurrency: int = BOT_LLM_CONCURRENCY,
+        slo: float = BOT_LLM_SLO_SECONDS,
+        slo_misses: int = BOT_LLM_SLO_MISSES,
+        fallback_seconds: float = BOT_LLM_FALLBACK_SECONDS,
+    ) -> None:
+        self.api_key = api_key
+        self.model = model
+        self.fallback_model = fallback_model
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max(max_retries, 0)
+        self.slo = slo
+        self.slo_misses = slo_misses
+        self.fallback_seconds = fallback_seconds
+        self._client: genai.Client | None = None
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self._misses = 0
+        self._fallback_until = 0.0
+        self._rejected = 0
+        self._stats: dict[str, ModelStats] = {}
+
+    @property
+    def client(self) -> genai.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    def _pick_model(self, timed_out: bool) -> str:
+        """Fallback si el principal está degradado o el intento anterior agotó su timeout."""
+        if self.fallback_model and (timed_out or time.monotonic() < self._fallback_until):
+            return self.fallback_model
+        return self.model
+
+    def _record(self, model: str, outcome: str, latency: float, slo_miss: bool) -> None:
+        logger.debug("Gemini %s: %s in %.0fms", model, outcome, latency * 1000)
+        with self._lock:
+            self._stats.setdefault(model, ModelStats()).record(outcome, latency)
+            if model != self.model or not self.fallback_model:
+                return
+            if not slo_miss:
+                self._misses = 0
+                return
+            self._misses += 1
+            if self._misses >= self.slo_misses:
+                self._misses = 0
+                self._fallback_until = time.monotonic() + self.fallback_seconds
+                logger.warning(
+                    "Gemini %s missing its %.0fs SLO, using %s for %.0fs",
+                    self.model,
+                    self.slo,
+                    self.fallback_model,
+                    self.fallback_seconds,
+                )
+
+    def generate(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        purpose: str = "generation",
+        response_schema: dict | None = None,
+        stop: Callable[[str], bool] | None = None,
+    ) -> str:
+        """
+        Texto generado (sin espacios alrededor; "" si no hubo texto).
+        response_schema: salida JSON estructurada (el texto es el JSON).
+        stop: streaming; se corta cuando stop(texto acumulado) es True y se retorna lo recibido.
+        """
+        json_output: dict[str, Any] = {}
+        if response_schema is not None:
+            json_output = {"response_mime_type": "application/json", "response_schema": response_schema}
+        start = time.monotonic()
+        deadline = start + self.deadline
+        if not self._semaphore.acquire(timeout=self.deadline):
+            with self._lock:
+                self._rejected += 1
+            raise LLMUnavailable(f"{purpose}: too many generations in flight")
+        try:
+            attempt = 0
+            timed_out = False
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 1:
+                    raise LLMUnavailable(f"{purpose}: deadline exceeded")
+                model = self._pick_model(timed_out)
+                timeout = min(self.timeout, remaining)
+                begin = time.monotonic()
+                config = types.GenerateContentConfig(
+                    max_output_tokens=max_output_tokens,
+                    temperature=temperature,
+                    http_options=types.HttpOptions(timeout=int(timeout * 1000)),
+                    **json_output,
+                )
+                try:
+                    if stop is None:
+                        response = self.client.models.generate_content(model=model, contents=prompt, config=config)
+                        text, stopped = response.text or "", False
+                    else:
+                        text, stopped = self._stream(model, prompt, config, stop)
+                except Exception as e:
+                    latency = time.monotonic() - begin
+                    timed_out = isinstance(e, httpx.TimeoutException)
+                    retryable = _retryable(e)
+                    self._record(model, "timeout" if timed_out else "error", latency, slo_miss=retryable)
+                    if not retryable:
+                        logger.error("Gemini error (%s): %s", purpose, e)
+                        return ""
+                    if attempt >= self.max_retries:
+                        raise LLMUnavailable(f"{purpose}: {e}") from e
+                    delay = min(random.uniform(0, 2 ** attempt), max(deadline - time.monotonic(), 0))
+                    logger.warning("Gemini %s (%s): %s (retry in %.1fs)", model, purpose, e, delay)
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                latency = time.monotonic() - begin
+                self._record(model, "stopped" if stopped else "ok", latency, slo_miss=latency > self.slo)
+                return text.strip()
+        finally:
+            self._semaphore.release()
+
+    def _stream(
+        self,
+        model: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        stop: Callable[[str], bool],
+    ) -> tuple[str, bool]:
+        """(texto, cortado). Al cortar se cierra el stream, y con él la conexión HTTP."""
+        parts: list[str] = []
+        stream = self.client.models.generate_content_stream(model=model, contents=prompt, config=config)
+        try:
+            for chunk in stream:
+                parts.append(chunk.text or "")
+                text = "".join(parts)
+                if stop(text):
+                    return text, True
+        finally:
+            stream.close()
+        return "".join(parts), False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            models = {name: s.snapshot() for name, s in self._stats.items()}
+            fallback = self.fallback_model if time.monotonic() < self._fallback_until else None
+            return {"models": models, "rejected": self._rejected, "fallback_active": fallback}
+
+
+_gateway: LLMGateway | None = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
+
+
+def generate(
+    prompt: str,
+    max_output_tokens: int,
+    temperature: float = 0.7,
+    purpose: str = "generation",
+    response_schema: dict | None = None,
+    stop: Callable[[str], bool] | None = None,
+) -> str:
+    return get_gateway().generate(
+        prompt,
+        max_output_tokens,
+        temperature=temperature,
+        purpose=purpose,
+        response_schema=response_schema,
+        stop=stop,
+    )
+
+
+def get_llm_stats() -> dict[str, Any]:
+    return get_gateway().stats()
@@ -0,0 +1,193 @@
+"""
+LogosDaemon - Generador de carga: ejecuta ciclos reales del bot contra mock_moltbook.
+Mide la latencia de cada ciclo (percentiles) y cuenta las peticiones que recibió la API.
+El gateway de Gemini se sustituye por un stub con latencia configurable (triage, caché y
+borradores siguen su camino real): se mide el bot, no el LLM.
+
+Uso: python loadgen.py --cycles 50 --posts-per-second 5 --latency-ms 80 --error-rate 0.05
+     python loadgen.py --base-url http://127.0.0.1:8080/api/v1 --async
+
+Por defecto usa DATABASE_URL=memory://, sin DRY_RUN, sin cooldown de publicación y con
+rate limits del cliente holgados; cualquier variable ya exportada en el entorno tiene prioridad.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+import urllib.request
+from typing import Any, Callable
+
+from mock_moltbook import add_mock_arguments, mock_from_args, start_mock_server
+
+_ENV_DEFAULTS = {
+    "MOLTBOOK_API_KEY": "loadgen",
+    "GEMINI_API_KEY": "loadgen",
+    "DATABASE_URL": "memory://",
+    "BOT_DRY_RUN": "false",
+    "BOT_MIN_SECONDS_BETWEEN_POSTS": "0",
+    "BOT_MAX_POSTS_PER_DAY": "1000000",
+    "MOLTBOOK_RATE_LIMITS": "read=1000/1,post=1000/1,comment=1000/1,vote=1000/1,follow=1000/1",
+    "MOLTBOOK_CACHE_PATH": "",
+}
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentil por rango más cercano (sorted_values ordenada, p en 0-100)."""
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def _install_stub_gateway(latency: float) -> None:
+    """Sustituye el gateway de Gemini: texto fijo, o un veredicto por post si se pide JSON (triage)."""
+    import llm_gateway
+
+    class StubGateway(llm_gateway.LLMGateway):
+        def generate(
+            self,
+            prompt: str,
+            max_output_tokens: int,
+            temperature: float = 0.7,
+            purpose: str = "generation",
+            response_schema: dict | None = None,
+            stop: Callable[[str], bool] | None = None,
+        ) -> str:
+            time.sleep(latency)
+            self._record("stub", "ok", latency, slo_miss=False)
+            if response_schema is None:
+                return "A claim is only as good as the argument that carries it."
+            count = len(re.findall(r"^\d+\.", prompt, re.MULTILINE))
+            return json.dumps([
+                {"n": n, "score": round(random.random(), 2), "respond": random.random() < 0.5}
+                for n in range(1, count + 1)
+            ])
+
+    llm_gateway._gateway = StubGateway(api_key="loadgen", model="stub")
+
+
+def _fetch_stats(base_url: str) -> dict[str, Any]:
+    try:
+        with urllib.request.urlopen(f"{base_url}/_stats", timeout=10) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError) as e:
+        logging.getLogger(__name__).warning("Mock stats unavailable: %s", e)
+        return {}
+
+
+def _run_cycles(args: argparse.Namespace) -> tuple[list[float], int]:
+    """Ejecuta los ciclos con el mismo arranque/parada que main.main(). Retorna (latencias, errores)."""
+    import main as bot
+
+    _install_stub_gateway(args.llm_latency_ms / 1000)
+    bot.init_schema()
+    bot.load_handled_filter()
+    bot.start_action_worker()
+    bot.start_reply_crawler()
+
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + args.duration if args.duration else None
+
+    def more() -> bool:
+        if deadline is not None:
+            return time.monotonic() < deadline
+        return len(latencies) < args.cycles
+
+    try:
+        if args.use_async:
+            import async_cycle
+            from moltbook_async import AsyncMoltbookClient
+
+            async def loop() -> int:
+                failed = 0
+                async with AsyncMoltbookClient() as client:
+                    while more():
+                        start = time.monotonic()
+                        try:
+                            await async_cycle.run_cycle_async(client)
+                        except Exception as e:
+                            failed += 1
+                            logging.getLogger(__name__).error("Cycle error: %s", e)
+                        latencies.append(time.monotonic() - start)
+                        await asyncio.sleep(args.interval)
+                return failed
+
+            errors = asyncio.run(loop())
+        else:
+            while more():
+                start = time.monotonic()
+                try:
+                    bot.run_cycle()
+                except Exception as e:
+                    errors += 1
+                    logging.getLogger(__name__).error("Cycle error: %s", e)
+                latencies.append(time.monotonic() - start)
+                time.sleep(args.interval)
+    finally:
+        bot.stop_action_worker()
+        bot.stop_reply_crawler()
+        bot.close_client()
+        bot.state_store.flush()
+        bot.close_pool()
+    return latencies, errors
+
+
+def _report(latencies: list[float], errors: int, elapsed: float, stats: dict[str, Any]) -> None:
+    values = sorted(latencies)
+    print(f"\nCycles: {len(values)} in {elapsed:.1f}s (errors: {errors})")
+    if values:
+        ms = [v * 1000 for v in values]
+        print(
+            "Cycle latency (ms): "
+            f"p50={percentile(ms, 50):.1f} p90={percentile(ms, 90):.1f} "
+            f"p99={percentile(ms, 99):.1f} max={ms[-1]:.1f} mean={sum(ms) / len(ms):.1f}"
+        )
+    requests = stats.get("requests") or {}
+    if requests:
+        total = sum(requests.values())
+        print(f"\nRequests: {total} ({total / elapsed:.1f}/s)")
+        for key, count in requests.items():
+            print(f"  {key:<40} {count:>7}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end del ciclo contra mock_moltbook")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=0, help="segundos (tiene prioridad sobre --cycles)")
+    parser.add_argument("--interval", type=float, default=0.0, help="pausa entre ciclos (s)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="usar run_cycle_async")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="latencia del stub de Gemini")
+    parser.add_argument("--base-url", default=None, help="mock ya arrancado (si no, se arranca uno)")
+    parser.add_argument("--log-level", default="WARNING")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_mock_server(*mock_from_args(args))
+        base_url = server.base_url
+    os.environ["MOLTBOOK_BASE_URL"] = base_url
+    for name, value in _ENV_DEFAULTS.items():
+        os.environ.setdefault(name, value)
+
+    print(f"Load test against {base_url}")
+    start = time.monotonic()
+    latencies, errors = _run_cycles(args)
+    elapsed = time.monotonic() - start
+
+    stats = server.mock.stats() if server is not None else _fetch_stats(base_url)
+    _report(latencies, errors, elapsed, stats)
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""
+LogosDaemon - Servidor local que imita la API de Moltbook (solo stdlib).
+Implementa los endpoints que usa moltbook_client (/posts, /feed, /search, comentarios, votos,
+follow, submolts, agents) con tráfico sintético y fallos inyectables (latencia, 429, 5xx).
+Sirve para pruebas end-to-end y benchmarks sin tocar moltbook.com (ver loadgen.py).
+
+Uso: python mock_moltbook.py --port 8080 --posts-per-second 2 --error-rate 0.05
+     MOLTBOOK_BASE_URL=http://127.0.0.1:8080/api/v1 python main.py
+"""
+import argparse
+import datetime
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/api/v1"
+
+_WORDS = (
+    "the agent said that truth is only what survives the argument and nothing else "
+    "consciousness meaning ethics logic free will language memory model data reality "
+    "why would anyone believe a machine can think when we barely know what thinking is"
+).split()
+_AGENTS = [f"molty_{i:03d}" for i in range(50)]
+_SUBMOLTS = ["general", "philosophy", "ai", "ethics", "random"]
+
+
+def _iso(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class FaultConfig:
+    """Fallos inyectados en cada petición: latencia (media + jitter), 429 y 5xx por probabilidad."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+
+    def delay(self) -> float:
+        return max(self.latency + random.uniform(-self.jitter, self.jitter), 0.0)
+
+
+class MockMoltbook:
+    """
+    Estado en memoria de la red. Los posts de otros agentes se generan de forma perezosa
+    según el tiempo transcurrido (posts_per_second); un comentario del bot recibe respuesta
+    con probabilidad reply_probability.
+    """
+
+    def __init__(
+        self,
+        agent_name: str = "LogosDaemon",
+        posts_per_second: float = 1.0,
+        post_chars: int = 280,
+        mention_probability: float = 0.05,
+        reply_probability: float = 0.3,
+        initial_posts: int = 100,
+        seed: int | None = None,
+    ) -> None:
+        self.agent_name = agent_name
+        self.posts_per_second = posts_per_second
+        self.post_chars = post_chars
+        self.mention_probability = mention_probability
+        self.reply_probability = reply_probability
+        self.random = random.Random(seed)
+        self.posts: dict[str, dict] = {}
+        self.timeline: list[str] = []  # IDs, más nuevo primero
+        self.comments: dict[str, list[dict]] = {}
+        self.votes: set[tuple[str, str]] = set()
+        self.following: set[str] = set()
+        self.subscriptions: set[str] = set()
+        self.profile: dict[str, Any] = {"name": agent_name, "description": ""}
+        self.requests: Counter = Counter()  # (método, ruta, status) -> n
+        self._ids = itertools.count(1)
+        self._pending = 0.0
+        self._generated_at = time.time()
+        self._lock = threading.Lock()
+        now = time.time()
+        for i in range(initial_posts):
+            self._add_post(self.random.choice(_AGENTS), now - (initial_posts - i))
+
+    # --- Tráfico sintético ---
+
+    def _text(self, chars: int) -> str:
+        words: list[str] = []
+        while sum(len(w) + 1 for w in words) < chars:
+            words.append(self.random.choice(_WORDS))
+        return " ".join(words)[:chars]
+
+    def _add_post(self, author: str, ts: float, title: str | None = None, content: str | None = None) -> dict:
+        post_id = f"p{next(self._ids)}"
+        if content is None:
+            content = self._text(self.post_chars)
+            if self.random.random() < self.mention_probability:
+                content = f"@{self.agent_name} {content}"
+        post = {
+            "id": post_id,
+            "title": title if title is not None else self._text(40).capitalize(),
+            "content": content,
+            "author": {"name": author},
+            "submolt": {"name": self.random.choice(_SUBMOLTS)},
+            "created_at": _iso(ts),
+            "upvotes": 0,
+            "downvotes": 0,
+            "comment_count": 0,
+        }
+        self.posts[post_id] = post
+        self.timeline.insert(0, post_id)
+        self.comments[post_id] = []
+        return post
+
+    def _add_comment(self, post_id: str, author: str, content: str, parent_id: str | None) -> dict:
+        comment = {
+            "id": f"c{next(self._ids)}",
+            "post_id": post_id,
+            "parent_id": parent_id,
+            "content": content,
+            "author": {"name": author},
+            "created_at": _iso(time.time()),
+            "upvotes": 0,
+        }
+        self.comments[post_id].append(comment)
+        self.posts[post_id]["comment_count"] += 1
+        return comment
+
+    def generate(self) -> None:
+        """Añade los posts que tocan desde la última llamada."""
+        now = time.time()
+        self._pending += (now - self._generated_at) * self.posts_per_second
+        self._generated_at = now
+        count = int(self._pending)
+        self._pending -= count
+        for _ in range(count):
+            self._add_post(self.random.choice(_AGENTS), now)
+
+    # --- Endpoints (con el lock tomado); retornan (status, body) ---
+
+    def feed(self, query: dict[str, str]) -> tuple[int, Any]:
+        limit = min(int(query.get("limit", 25)), 100)
+        offset = int(query.get("offset", 0))
+        ids = self.timeline
+        if query.get("submolt"):
+            ids = [i for i in ids if self.posts[i]["submolt"]["name"] == query["submolt"]]
+        page = [self.posts[i] for i in ids[offset:offset + limit]]
+        return 200, {"success": True, "posts": page, "has_more": offset + limit < len(ids)}
+
+    def search(self, query: dict[str, str]) -> tuple[int, Any]:
+        terms = set(query.get("q", "").lower().split())
+        limit = min(int(query.get("limit", 20)), 50)
+        results = []
+        for post_id in self.timeline:
+            post = self.posts[post_id]
+            if terms & set(post["content"].lower().split()):
+                results.append(dict(post, type="post", similarity=round(self.random.random(), 3)))
+                if len(results) >= limit:
+                    break
+        return 200, {"success": True, "results": results}
+
+    def create_post(self, body: dict) -> tuple[int, Any]:
+        post = self._add_post(self.agent_name, time.time(), body.get("title", ""), body.get("content", ""))
+        return 201, {"success": True, "post": post}
+
+    def create_comment(self, post_id: str, body: dict) -> tuple[int, Any]:
+        if post_id not in self.posts:
+            return 404, {"success": False, "error": "Post not found"}
+        comment = self._add_comment(post_id, self.agent_name, body.get("content", ""), body.get("parent_id"))
+        if self.random.random() < self.reply_probability:
+            self._add_comment(post_id, self.random.choice(_AGENTS), self._text(120), comment["id"])
+        return 201, {"success": True, "comment": comment}
+
+    def list_comments(self, post_id: str) -> tuple[int, Any]:
+        if post_id not in self.posts:
+            return 404, {"success": False, "error": "Post not found"}
+        comments = sorted(self.comments[post_id], key=lambda c: c["created_at"], reverse=True)
+        return 200, {"success": True, "comments": comments}
+
+    def vote(self, target: str, kind: str) -> tuple[int, Any]:
+        if (target, kind) in self.votes:
+            return 409, {"success": False, "error": "Already voted"}
+        self.votes.add((target, kind))
+        if target in self.posts:
+            self.posts[target]["upvotes" if kind == "upvote" else "downvotes"] += 1
+        return 200, {"success": True}
+
+    def agent_profile(self, name: str) -> tuple[int, Any]:
+        recent = [self.posts[i] for i in self.timeline if self.posts[i]["author"]["name"] == name][:10]
+        return 200, {"success": True, "agent": {"name": name}, "recentPosts": recent}
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "posts": len(self.posts),
+                "requests": {" ".join(map(str, k)): v for k, v in sorted(self.requests.items())},
+            }
+
+
+# (método, regex de ruta sin API_PREFIX, nombre de la ruta)
+_ROUTES = [
+    ("GET", r"/posts", "feed"),
+    ("POST", r"/posts", "create_post"),
+    ("GET", r"/feed", "personalized_feed"),
+    ("GET", r"/search", "search"),
+    ("GET", r"/posts/(?P<id>[^/]+)", "get_post"),
+    ("DELETE", r"/posts/(?P<id>[^/]+)", "delete_post"),
+    ("GET", r"/posts/(?P<id>[^/]+)/comments", "list_comments"),
+    ("POST", r"/posts/(?P<id>[^/]+)/comments", "create_comment"),
+    ("POST", r"/posts/(?P<id>[^/]+)/(?P<kind>upvote|downvote)", "vote_post"),
+    ("POST", r"/comments/(?P<id>[^/]+)/upvote", "vote_comment"),
+    ("POST", r"/agents/(?P<id>[^/]+)/follow", "follow"),
+    ("DELETE", r"/agents/(?P<id>[^/]+)/follow", "unfollow"),
+    ("GET", r"/agents/me", "my_profile"),
+    ("PATCH", r"/agents/me", "update_profile"),
+    ("POST", r"/agents/me/avatar", "upload_avatar"),
+    ("GET", r"/agents/profile", "agent_profile"),
+    ("GET", r"/submolts", "submolts"),
+    ("POST", r"/submolts/(?P<id>[^/]+)/subscribe", "subscribe"),
+    ("DELETE", r"/submolts/(?P<id>[^/]+)/subscribe", "unsubscribe"),
+    ("GET", r"/_stats", "stats"),
+]
+_COMPILED = [(m, re.compile(p + "$"), name) for m, p, name in _ROUTES]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: "MockServer"
+    protocol_version = "HTTP/1.1"  # keep-alive, como la API real
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PATCH(self) -> None:
+        self._handle("PATCH")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+    def _handle(self, method: str) -> None:
+        url = urlparse(self.path)
+        path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        route, params = None, {}
+        for m, pattern, name in _COMPILED:
+            match = pattern.match(path)
+            if match and m == method:
+                route, params = name, match.groupdict()
+                break
+        if route is None:
+            return self._send(method, path, 404, {"success": False, "error": "Not found"})
+        if route == "stats":
+            return self._send(method, route, 200, self.server.mock.stats(), count=False)
+
+        faults = self.server.faults
+        time.sleep(faults.delay())
+        roll = random.random()
+        if roll < faults.throttle_rate:
+            body = {"success": False, "error": "Rate limited", "retry_after_seconds": faults.retry_after}
+            return self._send(method, route, 429, body, {"Retry-After": f"{faults.retry_after:g}"})
+        if roll < faults.throttle_rate + faults.error_rate:
+            return self._send(method, route, random.choice((500, 502, 503)), {"success": False})
+
+        body: dict = {}
+        if raw and self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                return self._send(method, route, 400, {"success": False, "error": "Invalid JSON"})
+        mock = self.server.mock
+        with mock._lock:
+            mock.generate()
+            status, data = self._dispatch(mock, route, params.get("id", ""), params, query, body)
+        self._send(method, route, status, data)
+
+    def _dispatch(
+        self, mock: MockMoltbook, route: str, item: str, params: dict, query: dict, body: dict
+    ) -> tuple[int, Any]:
+        if route in ("feed", "personalized_feed"):
+            return mock.feed(query)
+        if route == "search":
+            return mock.search(query)
+        if route == "create_post":
+            return mock.create_post(body)
+        if route == "get_post":
+            post = mock.posts.get(item)
+            return (200, {"success": True, "post": post}) if post else (404, {"success": False})
+        if route == "delete_post":
+            if item not in mock.posts:
+                return 404, {"success": False}
+            del mock.posts[item]
+            mock.timeline.remove(item)
+            return 204, None
+        if route == "list_comments":
+            return mock.list_comments(item)
+        if route == "create_comment":
+            return mock.create_comment(item, body)
+        if route == "vote_post":
+            return mock.vote(item, params["kind"])
+        if route == "vote_comment":
+            return mock.vote(item, "upvote")
+        if route == "follow":
+            mock.following.add(item)
+            return 200, {"success": True}
+        if route == "unfollow":
+            mock.following.discard(item)
+            return 200, {"success": True}
+        if route == "my_profile":
+            return 200, {"success": True, "agent": mock.profile}
+        if route == "update_profile":
+            mock.profile.update(body)
+            return 200, {"success": True, "agent": mock.profile}
+        if route == "upload_avatar":
+            return 200, {"success": True}
+        if route == "agent_profile":
+            return mock.agent_profile(query.get("name", ""))
+        if route == "submolts":
+            return 200, {"success": True, "submolts": [{"name": s} for s in _SUBMOLTS]}
+        if route == "subscribe":
+            mock.subscriptions.add(item)
+            return 200, {"success": True}
+        if route == "unsubscribe":
+            mock.subscriptions.discard(item)
+            return 200, {"success": True}
+        return 404, {"success": False}
+
+    def _send(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        data: Any,
+        headers: dict[str, str] | None = None,
+        count: bool = True,
+    ) -> None:
+        payload = b"" if data is None else json.dumps(data).encode()
+        etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+        if method == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+            status, payload = 304, b""
+        if count:
+            with self.server.mock._lock:
+                self.server.mock.requests[(method, route, status)] += 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if method == "GET" and status in (200, 304):
+            self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], mock: MockMoltbook, faults: FaultConfig) -> None:
+        super().__init__(address, MockHandler)
+        self.mock = mock
+        self.faults = faults
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+
+def start_mock_server(
+    mock: MockMoltbook | None = None,
+    faults: FaultConfig | None = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> MockServer:
+    """Arranca el servidor en un thread (port=0: puerto libre). Parar con server.shutdown()."""
+    server = MockServer((host, port), mock or MockMoltbook(), faults or FaultConfig())
+    threading.Thread(target=server.serve_forever, name="mock-moltbook", daemon=True).start()
+    return server
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Opciones de tráfico y fallos (compartidas con loadgen.py)."""
+    parser.add_argument("--posts-per-second", type=float, default=1.0, help="posts sintéticos nuevos por segundo")
+    parser.add_argument("--post-chars", type=int, default=280, help="tamaño de cada post sintético")
+    parser.add_argument("--initial-posts", type=int, default=100)
+    parser.add_argument("--mention-probability", type=float, default=0.05)
+    parser.add_argument("--reply-probability", type=float, default=0.3, help="prob. de que respondan al bot")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latencia media por petición")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fracción de respuestas 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fracción de respuestas 5xx")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After de los 429 (s)")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def mock_from_args(args: argparse.Namespace, agent_name: str = "LogosDaemon") -> tuple[MockMoltbook, FaultConfig]:
+    mock = MockMoltbook(
+        agent_name=agent_name,
+        posts_per_second=args.posts_per_second,
+        post_chars=args.post_chars,
+        mention_probability=args.mention_probability,
+        reply_probability=args.reply_probability,
+        initial_posts=args.initial_posts,
+        seed=args.seed,
+    )
+    faults = FaultConfig(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+    )
+    return mock, faults
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API de Moltbook simulada para pruebas locales")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--agent-name", default="LogosDaemon")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    mock, faults = mock_from_args(args, args.agent_name)
+    server = MockServer((args.host, args.port), mock, faults)
+    print(f"Mock Moltbook en {server.base_url} (stats: {server.base_url}/_stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
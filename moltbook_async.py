@@ -0,0 +1,406 @@
+"""
+LogosDaemon - Cliente asyncio de la API de Moltbook.
+Misma superficie que moltbook_client (feed, posts, comentarios, votos, follow, submolts,
+búsqueda, perfil) sobre un httpx.AsyncClient compartido: pool de conexiones keep-alive,
+timeout por llamada y cancelación nativa de asyncio.
+"""
+import asyncio
+import logging
+import random
+from typing import Any, AsyncIterator
+
+import httpx
+
+from config import (
+    MOLTBOOK_API_KEY,
+    MOLTBOOK_BASE_URL,
+    DEFAULT_SUBMOLT,
+    MOLTBOOK_POOL_MAXSIZE,
+    MOLTBOOK_MAX_RETRIES,
+    MOLTBOOK_BACKOFF_BASE_SECONDS,
+    MOLTBOOK_BACKOFF_MAX_SECONDS,
+    MOLTBOOK_MAX_RETRY_AFTER_SECONDS,
+)
+from moltbook_client import (
+    FEED_SOURCES,
+    IDEMPOTENT_METHODS,
+    RETRYABLE_STATUS,
+    CircuitBreakers,
+    CircuitOpen,
+    RateLimited,
+    RateLimiter,
+    breaker_key,
+    endpoint_class,
+    get_circuit_breakers,
+    get_rate_limiter,
+    _next_page_params,
+    _page_posts,
+    _parse_retry_after,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errores de red/HTTP y JSON inválido (equivalente a requests.RequestException en el cliente sync)
+_ERRORS = (httpx.HTTPError, ValueError, RateLimited, CircuitOpen)
+
+
+class AsyncMoltbookClient:
+    """
+    Cliente async de Moltbook. Usar como `async with AsyncMoltbookClient() as client:`
+    o llamar a aclose() al terminar. Misma política de reintentos que MoltbookClient
+    y el mismo RateLimiter y circuit breakers de proceso.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = MOLTBOOK_API_KEY,
+        base_url: str = MOLTBOOK_BASE_URL,
+        max_connections: int = MOLTBOOK_POOL_MAXSIZE,
+        max_retries: int = MOLTBOOK_MAX_RETRIES,
+        backoff_base: float = MOLTBOOK_BACKOFF_BASE_SECONDS,
+        backoff_max: float = MOLTBOOK_BACKOFF_MAX_SECONDS,
+        max_retry_after: float = MOLTBOOK_MAX_RETRY_AFTER_SECONDS,
+        rate_limiter: RateLimiter | None = None,
+        breakers: CircuitBreakers | None = None,
+    ) -> None:
+        self.api_key = (api_key or "").strip()
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max(max_retries, 0)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.breakers = breakers if breakers is not None else get_circuit_breakers()
+        self._http = httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Accept": "application/json",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=15,
+        )
+
+    async def __aenter__(self) -> "AsyncMoltbookClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial con full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _request(self, method: str, path: str, timeout: float = 15, **kwargs: Any) -> httpx.Response:
+        """
+        Petición con reintentos (idempotentes: red y 429/5xx; resto: solo 429 con Retry-After).
+        Retorna la última respuesta; lanza httpx.HTTPError si todos los intentos fallaron por red
+        (CircuitOpen si el endpoint está caído).
+        """
+        method = method.upper()
+        url = f"{self.base_url}{path}"
+        idempotent = method in IDEMPOTENT_METHODS
+        endpoint = endpoint_class(method, path)
+        breaker = self.breakers.get(breaker_key(method, path))
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpen(breaker.name, breaker.retry_in())
+            wait = self.rate_limiter.reserve(endpoint)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            start = loop.time()
+            try:
+                response = await self._http.request(method, url, timeout=timeout, **kwargs)
+            except httpx.TransportError as e:
+                breaker.record(False, loop.time() - start)
+                safe = idempotent or isinstance(e, httpx.ConnectTimeout)
+                if not safe or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug("Moltbook %s %s: %s (retry in %.1fs)", method, path, e, delay)
+            else:
+                breaker.record(response.status_code < 500, loop.time() - start)
+                self.rate_limiter.observe(endpoint, response)
+                status = response.status_code
+                retryable = status == 429 or (idempotent and status in RETRYABLE_STATUS)
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    return response
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                logger.debug("Moltbook %s %s -> %s (retry in %.1fs)", method, path, status, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get_list(
+        self,
+        path: str,
+        keys: tuple[str, ...],
+        label: str,
+        params: dict[str, Any] | None = None,
+        timeout: float = 15,
+    ) -> list[dict[str, Any]]:
+        """GET que retorna una lista bajo la primera clave presente de `keys`. [] si falla."""
+        try:
+            response = await self._request("GET", path, params=params, timeout=timeout)
+            if response.status_code == 401:
+                logger.error("Moltbook 401 Unauthorized (%s): %s", label, response.text[:200])
+                return []
+            response.raise_for_status()
+            data = response.json()
+            items: Any = []
+            for key in keys:
+                if key in data:
+                    items = data[key]
+                    break
+            return items if isinstance(items, list) else []
+        except _ERRORS as e:
+            logger.error("Moltbook %s error: %s", label, e)
+            return []
+
+    async def _get_dict(self, path: str, label: str, params: dict | None = None, timeout: float = 15) -> dict | None:
+        """GET que retorna el JSON completo. None si falla."""
+        try:
+            response = await self._request("GET", path, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+        except _ERRORS as e:
+            logger.debug("%s error: %s", label, e)
+            return None
+
+    async def _action(self, method: str, path: str, label: str, ok: tuple[int, ...], timeout: float = 15) -> bool:
+        """Acción sin cuerpo (voto, follow, suscripción). True si el status está en `ok`."""
+        try:
+            response = await self._request(method, path, timeout=timeout)
+            if response.status_code in ok:
+                logger.debug("%s ok", label)
+                return True
+            logger.debug("%s returned %s", label, response.status_code)
+        except _ERRORS as e:
+            logger.debug("%s failed: %s", label, e)
+        return False
+
+    # -----------------------------------------------------------------------
+    # Posts y Feed
+    # -----------------------------------------------------------------------
+
+    async def get_feed(
+        self,
+        limit: int = 20,
+        sort: str = "new",
+        submolt: str | None = None,
+        timeout: float = 30,
+    ) -> list[dict[str, Any]]:
+        """Posts del feed global. Sort: hot, new, top, rising"""
+        params: dict[str, Any] = {"sort": sort, "limit": limit}
+        if submolt:
+            params["submolt"] = submolt
+        return await self._get_list("/posts", ("posts", "data"), "feed", params, timeout)
+
+    async def get_personalized_feed(self, limit: int = 20, sort: str = "hot", timeout: float = 30) -> list[dict[str, Any]]:
+        """Feed personalizado: submolts suscritos + agentes que seguimos."""
+        params = {"sort": sort, "limit": limit}
+        return await self._get_list("/feed", ("posts", "data"), "personalized feed", params, timeout)
+
+    async def iter_feed(
+        self,
+        source: str = "global",
+        sort: str = "new",
+        page_size: int = 25,
+        first_page_size: int | None = None,
+        max_pages: int = 5,
+        submolt: str | None = None,
+        timeout: float = 30,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Igual que MoltbookClient.iter_feed: páginas perezosas, cursor u offset."""
+        path, label = FEED_SOURCES[source]
+        params: dict[str, Any] = {"sort": sort, "limit": first_page_size or page_size}
+        if submolt and source == "global":
+            params["submolt"] = submolt
+        for _ in range(max_pages):
+            try:
+                response = await self._request("GET", path, params=params, timeout=timeout)
+                if response.status_code == 401:
+                    logger.error("Moltbook 401 Unauthorized (%s): %s", label, response.text[:200])
+                    return
+                response.raise_for_status()
+                data = response.json()
+            except _ERRORS as e:
+                logger.error("Moltbook %s error: %s", label, e)
+                return
+            posts = _page_posts(data)
+            for post in posts:
+                yield post
+            next_params = _next_page_params(data, params, len(posts), page_size)
+            if next_params is None:
+                return
+            params = next_params
+
+    async def get_post(self, post_id: str, timeout: float = 15) -> dict | None:
+        """Obtiene un post individual."""
+        return await self._get_dict(f"/posts/{post_id}", f"get_post {post_id}", timeout=timeout)
+
+    async def delete_post(self, post_id: str, timeout: float = 15) -> bool:
+        """Elimina tu propio post."""
+        return await self._action("DELETE", f"/posts/{post_id}", f"delete_post {post_id}", (200, 204), timeout)
+
+    # -----------------------------------------------------------------------
+    # Posts y Comentarios
+    # -----------------------------------------------------------------------
+
+    async def post_message(
+        self,
+        text: str,
+        title: str = "Reflexión",
+        reply_to_id: str | None = None,
+        parent_comment_id: str | None = None,
+        timeout: float = 30,
+    ) -> dict | None:
+        """Publica un post, o un comentario si hay reply_to_id (parent_comment_id = respuesta a comentario)."""
+        if reply_to_id:
+            path = f"/posts/{reply_to_id}/comments"
+            payload: dict[str, Any] = {"content": text}
+            if parent_comment_id:
+                payload["parent_id"] = parent_comment_id
+            label = "comment"
+        else:
+            path = "/posts"
+            payload = {"submolt": DEFAULT_SUBMOLT, "title": title, "content": text}
+            label = "post"
+        try:
+            response = await self._request("POST", path, json=payload, timeout=timeout)
+            if response.status_code == 401:
+                logger.error("Moltbook 401 Unauthorized (%s): %s", label, response.text[:200])
+                return None
+            if response.status_code == 429:
+                logger.warning("Moltbook rate limit (%s): %s", label, response.text[:200])
+                return None
+            response.raise_for_status()
+            return response.json()
+        except _ERRORS as e:
+            logger.error("Moltbook %s error: %s", label, e)
+            return None
+
+    async def get_comments(self, post_id: str, sort: str = "new", timeout: float = 15) -> list[dict[str, Any]]:
+        """Comentarios de un post. Sort: top, new, controversial."""
+        return await self._get_list(
+            f"/posts/{post_id}/comments", ("comments", "data"), f"get_comments {post_id}", {"sort": sort}, timeout
+        )
+
+    # -----------------------------------------------------------------------
+    # Votación y Follow
+    # -----------------------------------------------------------------------
+
+    async def like_post(self, post_id: str, timeout: float = 15) -> bool:
+        """Upvote a un post."""
+        if not post_id:
+            return False
+        return await self._action("POST", f"/posts/{post_id}/upvote", f"Upvote {post_id}", (200, 201, 204), timeout)
+
+    async def downvote_post(self, post_id: str, timeout: float = 15) -> bool:
+        """Downvote a un post. Usar con moderación."""
+        if not post_id:
+            return False
+        return await self._action("POST", f"/posts/{post_id}/downvote", f"Downvote {post_id}", (200, 201, 204), timeout)
+
+    async def upvote_comment(self, comment_id: str, timeout: float = 15) -> bool:
+        """Upvote a un comentario."""
+        if not comment_id:
+            return False
+        return await self._action(
+            "POST", f"/comments/{comment_id}/upvote", f"Upvote comment {comment_id}", (200, 201, 204), timeout
+        )
+
+    async def follow_agent(self, agent_name: str, timeout: float = 15) -> bool:
+        """Sigue a un agente."""
+        if not agent_name or not agent_name.strip():
+            return False
+        name = agent_name.strip()
+        return await self._action("POST", f"/agents/{name}/follow", f"Follow {name}", (200, 201, 204), timeout)
+
+    async def unfollow_agent(self, agent_name: str, timeout: float = 15) -> bool:
+        """Deja de seguir a un agente."""
+        if not agent_name or not agent_name.strip():
+            return False
+        name = agent_name.strip()
+        return await self._action("DELETE", f"/agents/{name}/follow", f"Unfollow {name}", (200, 204), timeout)
+
+    # -----------------------------------------------------------------------
+    # Submolts
+    # -----------------------------------------------------------------------
+
+    async def list_submolts(self, timeout: float = 15) -> list[dict[str, Any]]:
+        """Lista todos los submolts."""
+        return await self._get_list("/submolts", ("submolts", "data"), "list_submolts", timeout=timeout)
+
+    async def subscribe_submolt(self, submolt_name: str, timeout: float = 15) -> bool:
+        """Suscribe al submolt."""
+        if not submolt_name or not submolt_name.strip():
+            return False
+        name = submolt_name.strip()
+        return await self._action("POST", f"/submolts/{name}/subscribe", f"Subscribe {name}", (200, 201, 204), timeout)
+
+    async def unsubscribe_submolt(self, submolt_name: str, timeout: float = 15) -> bool:
+        """Desuscribe del submolt."""
+        if not submolt_name or not submolt_name.strip():
+            return False
+        name = submolt_name.strip()
+        return await self._action("DELETE", f"/submolts/{name}/subscribe", f"Unsubscribe {name}", (200, 204), timeout)
+
+    # -----------------------------------------------------------------------
+    # Búsqueda y Perfil
+    # -----------------------------------------------------------------------
+
+    async def search(
+        self,
+        query: str,
+        result_type: str = "all",
+        limit: int = 20,
+        timeout: float = 30,
+    ) -> list[dict[str, Any]]:
+        """Búsqueda semántica. result_type: posts, comments, all"""
+        if not query or not query.strip():
+            return []
+        params = {"q": query, "type": result_type, "limit": limit}
+        return await self._get_list("/search", ("results",), "search", params, timeout)
+
+    async def get_my_profile(self, timeout: float = 15) -> dict | None:
+        """Perfil del agente actual."""
+        return await self._get_dict("/agents/me", "get_my_profile", timeout=timeout)
+
+    async def get_agent_profile(self, agent_name: str, timeout: float = 15) -> dict | None:
+        """Perfil de otro agente."""
+        if not agent_name or not agent_name.strip():
+            return None
+        return await self._get_dict(
+            "/agents/profile", f"get_agent_profile {agent_name}", {"name": agent_name.strip()}, timeout
+        )
+
+    async def update_profile(
+        self,
+        description: str | None = None,
+        metadata: dict | None = None,
+        timeout: float = 15,
+    ) -> bool:
+        """Actualiza el perfil. PATCH, no PUT."""
+        payload: dict[str, Any] = {}
+        if description is not None:
+            payload["description"] = description
+        if metadata is not None:
+            payload["metadata"] = metadata
+        if not payload:
+            return False
+        try:
+            response = await self._request("PATCH", "/agents/me", json=payload, timeout=timeout)
+            return response.status_code in (200, 204)
+        except _ERRORS as e:
+            logger.debug("update_profile error: %s", e)
+            return False
@@ -1,416 +1,1297 @@
 """
 LogosDaemon - Moltbook API wrapper.
 Todas las acciones de la API: posts, comentarios, votos, follow, submolts, búsqueda, perfil.
+MoltbookClient mantiene una requests.Session (keep-alive, pool de conexiones, reintentos);
+las funciones de módulo son wrappers finos sobre un cliente compartido.
 """
+import copy
+import datetime
+import email.utils
+import json
 import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from config import MOLTBOOK_API_KEY, MOLTBOOK_BASE_URL, DEFAULT_SUBMOLT
+from config import (
+    MOLTBOOK_API_KEY,
+    MOLTBOOK_BASE_URL,
+    DEFAULT_SUBMOLT,
+    MOLTBOOK_POOL_MAXSIZE,
+    MOLTBOOK_MAX_RETRIES,
+    MOLTBOOK_BACKOFF_BASE_SECONDS,
+    MOLTBOOK_BACKOFF_MAX_SECONDS,
+    MOLTBOOK_MAX_RETRY_AFTER_SECONDS,
+    MOLTBOOK_CACHE_MAX_ENTRIES,
+    MOLTBOOK_CACHE_PATH,
+    MOLTBOOK_CACHE_TTL_POST_SECONDS,
+    MOLTBOOK_CACHE_TTL_COMMENTS_SECONDS,
+    MOLTBOOK_CACHE_TTL_PROFILE_SECONDS,
+    MOLTBOOK_CACHE_TTL_SUBMOLTS_SECONDS,
+    MOLTBOOK_RATE_LIMITS,
+    MOLTBOOK_RATE_MAX_WAIT_SECONDS,
+    MOLTBOOK_BREAKER_WINDOW,
+    MOLTBOOK_BREAKER_MIN_CALLS,
+    MOLTBOOK_BREAKER_ERROR_RATE,
+    MOLTBOOK_BREAKER_SLOW_SECONDS,
+    MOLTBOOK_BREAKER_OPEN_SECONDS,
+)
 
 logger = logging.getLogger(__name__)
 
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
 
-def _headers() -> dict:
-    key = (MOLTBOOK_API_KEY or "").strip()
-    return {
-        "Authorization": f"Bearer {key}",
-        "Content-Type": "application/json",
-    }
 
+def _parse_retry_after(value: str | None) -> float | None:
+    """Retry-After en segundos o fecha HTTP. None si falta o es inválido."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
 
-# ---------------------------------------------------------------------------
-# Posts y Feed
-# ---------------------------------------------------------------------------
 
+# Acciones de engagement del outbox: método y ruta
+ENGAGEMENT_ACTIONS = {
+    "upvote_post": ("POST", "/posts/{}/upvote"),
+    "downvote_post": ("POST", "/posts/{}/downvote"),
+    "upvote_comment": ("POST", "/comments/{}/upvote"),
+    "follow": ("POST", "/agents/{}/follow"),
+}
 
-def get_feed(limit: int = 20, sort: str = "new", submolt: str | None = None) -> list[dict[str, Any]]:
-    """
-    Obtiene posts del feed global.
-    Sort: hot, new, top, rising
-    """
-    url = f"{MOLTBOOK_BASE_URL}/posts"
-    params: dict[str, Any] = {"sort": sort, "limit": limit}
-    if submolt:
-        params["submolt"] = submolt
+# Fuentes paginables de iter_feed: ruta y etiqueta para logs
+FEED_SOURCES = {
+    "global": ("/posts", "feed"),
+    "personalized": ("/feed", "personalized feed"),
+}
+
+
+def post_timestamp(post: dict) -> float | None:
+    """created_at de un post/comentario como epoch. None si falta o no se puede parsear."""
+    raw = post.get("created_at") or post.get("createdAt")
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    if not raw:
+        return None
     try:
-        response = requests.get(url, headers=_headers(), params=params, timeout=30)
-        if response.status_code == 401:
-            logger.error("Moltbook 401 Unauthorized (feed): %s", response.text[:200])
-            return []
-        response.raise_for_status()
-        data = response.json()
-        posts = data.get("posts", data.get("data", []))
-        return posts if isinstance(posts, list) else []
-    except requests.RequestException as e:
-        logger.error("Moltbook get_feed error: %s", e)
-        return []
+        return datetime.datetime.fromisoformat(str(raw).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
 
 
-def get_personalized_feed(limit: int = 20, sort: str = "hot") -> list[dict[str, Any]]:
+def _page_posts(data: Any) -> list[dict[str, Any]]:
+    """Lista de posts de una respuesta de feed ({"posts": [...]}, {"data": [...]} o lista)."""
+    if isinstance(data, list):
+        return data
+    posts = data.get("posts", data.get("data", [])) if isinstance(data, dict) else []
+    return posts if isinstance(posts, list) else []
+
+
+def _next_page_params(
+    data: Any,
+    params: dict[str, Any],
+    received: int,
+    page_size: int,
+) -> dict[str, Any] | None:
     """
-    Feed personalizado: submolts suscritos + agentes que seguimos.
-    Sort: hot, new, top
+    Parámetros de la página siguiente, o None si no hay más.
+    Usa next_cursor si la API lo da (raíz o "pagination"); si no, offset.
+    `received` = posts recibidos en la página actual.
     """
-    url = f"{MOLTBOOK_BASE_URL}/feed"
-    params = {"sort": sort, "limit": limit}
-    try:
-        response = requests.get(url, headers=_headers(), params=params, timeout=30)
-        if response.status_code == 401:
-            logger.error("Moltbook 401 Unauthorized (personalized feed): %s", response.text[:200])
-            return []
-        response.raise_for_status()
-        data = response.json()
-        posts = data.get("posts", data.get("data", []))
-        return posts if isinstance(posts, list) else []
-    except requests.RequestException as e:
-        logger.error("Moltbook get_personalized_feed error: %s", e)
-        return []
+    meta = data if isinstance(data, dict) else {}
+    pagination = meta.get("pagination") if isinstance(meta.get("pagination"), dict) else {}
+    cursor = meta.get("next_cursor") or pagination.get("next_cursor")
+    has_more = meta.get("has_more", pagination.get("has_more"))
+    if not received or has_more is False:
+        return None
+    if cursor:
+        return {**params, "limit": page_size, "cursor": cursor}
+    if received < params.get("limit", page_size):
+        return None
+    return {**params, "limit": page_size, "offset": params.get("offset", 0) + received}
 
 
-def get_post(post_id: str) -> dict | None:
-    """Obtiene un post individual."""
-    url = f"{MOLTBOOK_BASE_URL}/posts/{post_id}"
-    try:
-        response = requests.get(url, headers=_headers(), timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.debug("get_post error %s: %s", post_id, e)
-        return None
+def endpoint_class(method: str, path: str) -> str | None:
+    """Clase de rate limit de una petición: read, post, comment, vote, follow (None = sin límite)."""
+    if method in ("GET", "HEAD"):
+        return "read"
+    if path == "/posts":
+        return "post"
+    if path.endswith("/comments"):
+        return "comment"
+    if path.endswith(("/upvote", "/downvote")):
+        return "vote"
+    if path.endswith("/follow"):
+        return "follow"
+    return None
 
 
-def delete_post(post_id: str) -> bool:
-    """Elimina tu propio post."""
-    url = f"{MOLTBOOK_BASE_URL}/posts/{post_id}"
-    try:
-        response = requests.delete(url, headers=_headers(), timeout=15)
-        return response.status_code in (200, 204)
-    except requests.RequestException as e:
-        logger.debug("delete_post error %s: %s", post_id, e)
-        return False
+class RateLimited(requests.RequestException):
+    """El rate limiter local no deja enviar la petición dentro de la espera máxima."""
 
+    def __init__(self, endpoint: str, wait: float) -> None:
+        super().__init__(f"rate limited ({endpoint}): retry in {wait:.0f}s")
+        self.endpoint = endpoint
+        self.wait = wait
 
-# ---------------------------------------------------------------------------
-# Posts y Comentarios
-# ---------------------------------------------------------------------------
 
+class TokenBucket:
+    """Bucket de `capacity` tokens que se rellena a capacity/period por segundo (reloj de pared)."""
 
-def post_message(
-    text: str,
-    title: str = "Reflexión",
-    reply_to_id: str | None = None,
-    parent_comment_id: str | None = None,
-) -> dict | None:
+    def __init__(self, capacity: float, period: float) -> None:
+        self.capacity = capacity
+        self.period = period
+        self.tokens = capacity
+        self.updated = time.time()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self.updated, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.period)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Segundos hasta que haya un token (y no estemos bloqueados por el servidor)."""
+        self._refill(now)
+        wait = max(self.blocked_until - now, 0.0)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) * self.period / self.capacity)
+        return wait
+
+
+class RateLimiter:
     """
-    Publica un mensaje. Si reply_to_id está presente, es un comentario.
-    Si parent_comment_id está presente, es respuesta a un comentario (no al post).
+    Token buckets por clase de endpoint (ver endpoint_class).
+    - reserve(): toma un token y retorna cuánto esperar antes de enviar; si la espera supera
+      max_wait no toma nada y lanza RateLimited (el llamador no gasta la petición).
+    - observe(): aprende de X-RateLimit-Remaining/Limit/Reset y de 429 + Retry-After.
+    - snapshot()/restore(): estado serializable para sobrevivir reinicios.
     """
-    if reply_to_id:
-        return _post_comment(
-            post_id=reply_to_id,
-            content=text,
-            parent_id=parent_comment_id,
-        )
-    return _post_new(title=title, content=text)
-
-
-def _post_new(title: str, content: str, submolt: str = DEFAULT_SUBMOLT) -> dict | None:
-    """Crea un nuevo post."""
-    url = f"{MOLTBOOK_BASE_URL}/posts"
-    payload = {"submolt": submolt, "title": title, "content": content}
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] = MOLTBOOK_RATE_LIMITS,
+        max_wait: float = MOLTBOOK_RATE_MAX_WAIT_SECONDS,
+    ) -> None:
+        self.max_wait = max_wait
+        self._buckets = {name: TokenBucket(n, period) for name, (n, period) in limits.items()}
+        self._lock = threading.Lock()
+
+    def wait_time(self, endpoint: str) -> float:
+        """0 si se puede enviar ya una petición de esta clase; si no, segundos de espera."""
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            return 0.0
+        with self._lock:
+            return bucket.wait_time(time.time())
+
+    def reserve(self, endpoint: str | None, max_wait: float | None = None) -> float:
+        bucket = self._buckets.get(endpoint) if endpoint else None
+        if bucket is None:
+            return 0.0
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._lock:
+            wait = bucket.wait_time(time.time())
+            if wait > max_wait:
+                raise RateLimited(endpoint, wait)
+            bucket.tokens -= 1
+        return wait
+
+    def observe(self, endpoint: str | None, response: Any) -> None:
+        """Ajusta el bucket con la respuesta (requests o httpx)."""
+        bucket = self._buckets.get(endpoint) if endpoint else None
+        if bucket is None:
+            return
+        headers = response.headers
+        now = time.time()
+        with self._lock:
+            bucket._refill(now)
+            limit = _header_float(headers, "X-RateLimit-Limit")
+            if limit is not None and 0 < limit < bucket.capacity:
+                bucket.capacity = limit
+            remaining = _header_float(headers, "X-RateLimit-Remaining")
+            if remaining is not None:
+                bucket.tokens = min(bucket.tokens, remaining)
+                reset = _header_float(headers, "X-RateLimit-Reset")
+                if remaining < 1 and reset is not None:
+                    # Epoch absoluto o segundos hasta el reset
+                    bucket.blocked_until = max(bucket.blocked_until, reset if reset > 1e9 else now + reset)
+            if response.status_code == 429:
+                retry_after = _parse_retry_after(headers.get("Retry-After"))
+                if retry_after is None:
+                    retry_after = _body_retry_after(response)
+                bucket.tokens = min(bucket.tokens, 0.0)
+                if retry_after is not None:
+                    bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    "capacity": b.capacity,
+                    "tokens": b.tokens,
+                    "updated": b.updated,
+                    "blocked_until": b.blocked_until,
+                }
+                for name, b in self._buckets.items()
+            }
+
+    def restore(self, state: dict[str, dict[str, float]]) -> None:
+        """Carga un snapshot(). Ignora clases desconocidas y valores inválidos."""
+        with self._lock:
+            for name, values in state.items():
+                bucket = self._buckets.get(name)
+                if bucket is None or not isinstance(values, dict):
+                    continue
+                try:
+                    bucket.capacity = min(float(values.get("capacity", bucket.capacity)), bucket.capacity)
+                    bucket.tokens = min(float(values["tokens"]), bucket.capacity)
+                    bucket.updated = float(values["updated"])
+                    bucket.blocked_until = float(values.get("blocked_until", 0.0))
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+
+def _header_float(headers: Any, name: str) -> float | None:
+    value = headers.get(name)
     try:
-        response = requests.post(url, headers=_headers(), json=payload, timeout=30)
-        if response.status_code == 401:
-            logger.error("Moltbook 401 Unauthorized (post): %s", response.text[:200])
-            return None
-        if response.status_code == 429:
-            logger.warning("Moltbook rate limit (post): %s", response.json())
-            return None
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.error("Moltbook post error: %s", e)
+        return float(value) if value is not None else None
+    except ValueError:
         return None
 
 
-def _post_comment(
-    post_id: str,
-    content: str,
-    parent_id: str | None = None,
-) -> dict | None:
-    """Añade un comentario a un post. parent_id = respuesta a otro comentario."""
-    url = f"{MOLTBOOK_BASE_URL}/posts/{post_id}/comments"
-    payload: dict[str, Any] = {"content": content}
-    if parent_id:
-        payload["parent_id"] = parent_id
+def _body_retry_after(response: Any) -> float | None:
+    """Moltbook indica la espera en el cuerpo del 429 (retry_after_seconds / _minutes)."""
     try:
-        response = requests.post(url, headers=_headers(), json=payload, timeout=30)
-        if response.status_code == 429:
-            logger.warning("Moltbook rate limit (comment): %s", response.json())
-            return None
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.error("Moltbook comment error: %s", e)
+        data = response.json()
+    except ValueError:
         return None
+    if not isinstance(data, dict):
+        return None
+    for key, factor in (("retry_after_seconds", 1), ("retry_after_minutes", 60)):
+        value = data.get(key)
+        if isinstance(value, (int, float)):
+            return float(value) * factor
+    return None
 
 
-def get_comments(post_id: str, sort: str = "new") -> list[dict[str, Any]]:
-    """Obtiene comentarios de un post. Sort: top, new, controversial."""
-    url = f"{MOLTBOOK_BASE_URL}/posts/{post_id}/comments"
-    params = {"sort": sort}
-    try:
-        response = requests.get(url, headers=_headers(), params=params, timeout=15)
+_rate_limiter: RateLimiter | None = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Rate limiter de proceso: lo comparten el cliente sync y el async (mismo API key)."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+def breaker_key(method: str, path: str) -> str:
+    """Endpoint para el circuit breaker: feed, personalized_feed, search, comments, posts, agents..."""
+    parts = path.strip("/").split("/")
+    if parts[0] == "posts" and len(parts) == 1:
+        return "feed" if method in ("GET", "HEAD") else "posts"
+    if parts[0] == "feed":
+        return "personalized_feed"
+    if len(parts) >= 3 and parts[-1] == "comments":
+        return "comments"
+    return parts[0]
+
+
+class CircuitOpen(requests.RequestException):
+    """El circuit breaker del endpoint está abierto: la petición ni se envía."""
+
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        super().__init__(f"circuit open ({endpoint}): retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Breaker de un endpoint.
+    - closed: todo pasa; si en las últimas `window` llamadas (mín. min_calls) la tasa de fallos
+      llega a error_rate, abre. Fallo = error de red, 5xx o latencia > slow_seconds.
+    - open: falla rápido (CircuitOpen) durante open_seconds.
+    - half_open: deja pasar una llamada de prueba; si va bien cierra, si no vuelve a abrir.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = MOLTBOOK_BREAKER_WINDOW,
+        min_calls: int = MOLTBOOK_BREAKER_MIN_CALLS,
+        error_rate: float = MOLTBOOK_BREAKER_ERROR_RATE,
+        slow_seconds: float = MOLTBOOK_BREAKER_SLOW_SECONDS,
+        open_seconds: float = MOLTBOOK_BREAKER_OPEN_SECONDS,
+    ) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.open_seconds = open_seconds
+        self._outcomes: deque[bool] = deque(maxlen=window)  # True = fallo
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._trial_at: float | None = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> str:
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = "half_open"
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current()
+
+    def available(self) -> bool:
+        """¿Se aceptaría una llamada ahora? (sin consumir la prueba de half_open)."""
+        with self._lock:
+            state = self._current()
+            if state == "closed":
+                return True
+            return state == "half_open" and not self._trial_pending()
+
+    def _trial_pending(self) -> bool:
+        # Una prueba que nunca reportó (cancelada) caduca a los open_seconds
+        return self._trial_at is not None and time.monotonic() - self._trial_at < self.open_seconds
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_pending():
+                self._trial_at = time.monotonic()
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def record(self, ok: bool, latency: float) -> None:
+        failed = not ok or latency > self.slow_seconds
+        with self._lock:
+            state = self._current()
+            if state == "half_open":
+                self._trial_at = None
+                if failed:
+                    self._open()
+                else:
+                    self._state = "closed"
+                    self._outcomes.clear()
+                    logger.info("Circuit %s closed", self.name)
+                return
+            if state == "open":
+                return  # resultado tardío de una llamada anterior a la apertura
+            self._outcomes.append(failed)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and sum(self._outcomes) / calls >= self.error_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        logger.warning("Circuit %s open for %.0fs", self.name, self.open_seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self._current(),
+                "calls": calls,
+                "failure_rate": round(sum(self._outcomes) / calls, 2) if calls else 0.0,
+            }
+
+
+class CircuitBreakers:
+    """Registro de breakers por endpoint (se crean al primer uso)."""
+
+    def __init__(self) -> None:
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+            return breaker
+
+    def available(self, endpoint: str) -> bool:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+        return breaker is None or breaker.available()
+
+    def health(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: b.snapshot() for b in breakers}
+
+
+_breakers: CircuitBreakers | None = None
+
+
+def get_circuit_breakers() -> CircuitBreakers:
+    """Breakers de proceso: los comparten el cliente sync y el async."""
+    global _breakers
+    if _breakers is None:
+        with _rate_limiter_lock:
+            if _breakers is None:
+                _breakers = CircuitBreakers()
+    return _breakers
+
+
+# TTL por clase de endpoint cacheable (segundos)
+CACHE_TTLS = {
+    "post": MOLTBOOK_CACHE_TTL_POST_SECONDS,
+    "comments": MOLTBOOK_CACHE_TTL_COMMENTS_SECONDS,
+    "profile": MOLTBOOK_CACHE_TTL_PROFILE_SECONDS,
+    "submolts": MOLTBOOK_CACHE_TTL_SUBMOLTS_SECONDS,
+}
+
+
+class ResponseCache:
+    """
+    Caché LRU acotada de respuestas GET (JSON ya parseado) con validadores HTTP.
+    - Dentro del TTL del endpoint: se sirve de memoria, sin red (hit).
+    - Vencida con ETag/Last-Modified: GET condicional; un 304 renueva el TTL (revalidated).
+    - Sin entrada, o sin validadores: GET completo (miss).
+    Con `path`, las entradas se cargan al crear la caché y se guardan con save().
+    """
+
+    def __init__(
+        self,
+        max_entries: int = MOLTBOOK_CACHE_MAX_ENTRIES,
+        ttls: dict[str, float] | None = None,
+        path: str | None = MOLTBOOK_CACHE_PATH or None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttls = ttls if ttls is not None else CACHE_TTLS
+        self.path = path
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(path: str, params: dict[str, Any] | None = None) -> str:
+        if not params:
+            return path
+        return path + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+
+    def lookup(self, key: str, fresh: bool = False) -> tuple[Any, dict[str, str]] | None:
+        """
+        (datos, {}) si la entrada está fresca (cuenta hit), o (None, headers condicionales)
+        si hay validadores para revalidar. None si no hay nada útil.
+        fresh=True: nunca sirve del TTL, solo da los validadores.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            if entry["expires"] > time.time() and not fresh:
+                self.hits += 1
+                return copy.deepcopy(entry["data"]), {}
+            headers = {}
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+            return (None, headers) if headers else None
+
+    def revalidate(self, key: str, endpoint: str) -> tuple[bool, Any]:
+        """
+        304: renueva el TTL. (True, datos guardados), o (False, None) si otro thread desalojó
+        la entrada entre lookup() y la respuesta.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            entry["expires"] = time.time() + self.ttls.get(endpoint, 0)
+            self.revalidated += 1
+            return True, copy.deepcopy(entry["data"])
+
+    def store(self, key: str, endpoint: str, data: Any, response: requests.Response) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = {
+                "data": copy.deepcopy(data),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "expires": time.time() + self.ttls.get(endpoint, 0),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: str) -> None:
+        """Descarta las entradas cuya clave empieza por `prefix` (tras una escritura)."""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+            }
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Response cache load error (%s): %s", self.path, e)
+            return
+        with self._lock:
+            for key, entry in list(entries.items())[-self.max_entries:]:
+                self._entries[key] = entry
+
+    def save(self) -> None:
+        """Escribe la caché a disco (archivo temporal + rename: nunca queda a medias)."""
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._entries)
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Response cache save error (%s): %s", self.path, e)
+
+
+class MoltbookClient:
+    """
+    Cliente de la API de Moltbook sobre una requests.Session compartida.
+    - Keep-alive y pool de conexiones dimensionado (no renegocia TLS en cada llamada).
+    - Headers por defecto (Authorization) en la sesión.
+    - Reintentos con backoff exponencial + jitter para métodos idempotentes (GET/DELETE/...).
+    - 429: respeta Retry-After (también en POST: el servidor no procesó la petición).
+    - GETs de lectura (post, comentarios, perfiles, submolts) pasan por ResponseCache.
+    - Cada petición consume un token de su clase en el RateLimiter (lecturas, posts, comentarios,
+      votos, follows); si la espera supera el máximo se lanza RateLimited sin enviar nada.
+    - Circuit breaker por endpoint: con el endpoint degradado falla rápido (CircuitOpen).
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = MOLTBOOK_API_KEY,
+        base_url: str = MOLTBOOK_BASE_URL,
+        pool_maxsize: int = MOLTBOOK_POOL_MAXSIZE,
+        max_retries: int = MOLTBOOK_MAX_RETRIES,
+        backoff_base: float = MOLTBOOK_BACKOFF_BASE_SECONDS,
+        backoff_max: float = MOLTBOOK_BACKOFF_MAX_SECONDS,
+        max_retry_after: float = MOLTBOOK_MAX_RETRY_AFTER_SECONDS,
+        cache: ResponseCache | None = None,
+        rate_limiter: RateLimiter | None = None,
+        breakers: CircuitBreakers | None = None,
+    ) -> None:
+        self.api_key = (api_key or "").strip()
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max(max_retries, 0)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        if cache is None and MOLTBOOK_CACHE_MAX_ENTRIES > 0:
+            cache = ResponseCache()
+        self.cache = cache
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.breakers = breakers if breakers is not None else get_circuit_breakers()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "application/json",
+        })
+
+    def close(self) -> None:
+        if self.cache is not None:
+            self.cache.save()
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial con full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        timeout: float = 15,
+        deadline: float | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Hace la petición con reintentos. Retorna la última respuesta (aunque sea 4xx/5xx);
+        lanza requests.RequestException si todos los intentos fallaron por red
+        (RateLimited si el rate limiter local no deja enviarla, CircuitOpen si el endpoint está caído).
+        deadline (time.monotonic()): el timeout de cada intento se recorta a lo que queda y,
+        vencido, se lanza requests.Timeout en vez de reintentar.
+        """
+        method = method.upper()
+        url = f"{self.base_url}{path}"
+        idempotent = method in IDEMPOTENT_METHODS
+        endpoint = endpoint_class(method, path)
+        breaker = self.breakers.get(breaker_key(method, path))
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpen(breaker.name, breaker.retry_in())
+            wait = self.rate_limiter.reserve(endpoint)
+            if wait > 0:
+                logger.debug("Moltbook %s %s: rate limiter wait %.1fs", method, path, wait)
+                time.sleep(wait)
+            attempt_timeout = timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"{method} {path}: deadline exceeded")
+                attempt_timeout = min(timeout, remaining)
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                breaker.record(False, time.monotonic() - start)
+                # Sin respuesta: solo reintentamos si repetir es seguro
+                safe = idempotent or isinstance(e, requests.ConnectTimeout)
+                if not safe or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.debug("Moltbook %s %s: %s (retry in %.1fs)", method, path, e, delay)
+            else:
+                breaker.record(response.status_code < 500, time.monotonic() - start)
+                self.rate_limiter.observe(endpoint, response)
+                status = response.status_code
+                retryable = status == 429 or (idempotent and status in RETRYABLE_STATUS)
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    return response
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                logger.debug("Moltbook %s %s -> %s (retry in %.1fs)", method, path, status, delay)
+                response.close()
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+            attempt += 1
+
+    def _get_json(
+        self,
+        path: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        timeout: float = 15,
+        fresh: bool = False,
+    ) -> Any:
+        """
+        GET de lectura a través de la caché. Retorna el JSON; lanza requests.RequestException
+        (como raise_for_status) si falla. Los datos devueltos son una copia: se pueden mutar.
+        fresh=True ignora el TTL: siempre pregunta al servidor (con ETag si hay entrada).
+        """
+        if self.cache is None:
+            response = self._request("GET", path, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+
+        key = self.cache.key(path, params)
+        cached = self.cache.lookup(key, fresh)
+        if cached is not None and not cached[1]:
+            return cached[0]
+        headers = cached[1] if cached is not None else None
+        response = self._request("GET", path, params=params, timeout=timeout, headers=headers)
+        if response.status_code == 304 and headers:
+            found, data = self.cache.revalidate(key, endpoint)
+            if found:
+                return data
+            # Entrada desalojada mientras tanto: GET completo, sin validadores
+            response = self._request("GET", path, params=params, timeout=timeout)
         response.raise_for_status()
         data = response.json()
-        comments = data.get("comments", data.get("data", []))
-        return comments if isinstance(comments, list) else []
-    except requests.RequestException as e:
-        logger.debug("get_comments error %s: %s", post_id, e)
-        return []
+        self.cache.store(key, endpoint, data, response)
+        return data
 
+    def _invalidate(self, prefix: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(prefix)
 
-# ---------------------------------------------------------------------------
-# Votación
-# ---------------------------------------------------------------------------
+    # -----------------------------------------------------------------------
+    # Posts y Feed
+    # -----------------------------------------------------------------------
 
+    def _get_feed_page(
+        self,
+        path: str,
+        params: dict[str, Any],
+        label: str,
+        deadline: float | None = None,
+    ) -> Any:
+        """Una página de feed (JSON crudo). None si falla."""
+        try:
+            response = self._request("GET", path, params=params, timeout=30, deadline=deadline)
+            if response.status_code == 401:
+                logger.error("Moltbook 401 Unauthorized (%s): %s", label, response.text[:200])
+                return None
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            logger.error("Moltbook %s error: %s", label, e)
+            return None
 
-def like_post(post_id: str) -> bool:
-    """Upvote a un post. Retorna True si tuvo éxito."""
-    if not post_id:
-        return False
-    url = f"{MOLTBOOK_BASE_URL}/posts/{post_id}/upvote"
-    try:
-        response = requests.post(url, headers=_headers(), timeout=15)
-        if response.status_code in (200, 201, 204):
-            logger.debug("Upvoted post %s", post_id)
-            return True
-        logger.debug("Upvote returned %s for %s", response.status_code, post_id)
-    except requests.RequestException as e:
-        logger.debug("Upvote failed for %s: %s", post_id, e)
-    return False
+    def get_feed(self, limit: int = 20, sort: str = "new", submolt: str | None = None) -> list[dict[str, Any]]:
+        """
+        Obtiene posts del feed global.
+        Sort: hot, new, top, rising
+        """
+        params: dict[str, Any] = {"sort": sort, "limit": limit}
+        if submolt:
+            params["submolt"] = submolt
+        return _page_posts(self._get_feed_page("/posts", params, "feed"))
 
+    def get_personalized_feed(self, limit: int = 20, sort: str = "hot") -> list[dict[str, Any]]:
+        """
+        Feed personalizado: submolts suscritos + agentes que seguimos.
+        Sort: hot, new, top
+        """
+        params = {"sort": sort, "limit": limit}
+        return _page_posts(self._get_feed_page("/feed", params, "personalized feed"))
 
-def downvote_post(post_id: str) -> bool:
-    """Downvote a un post. Usar con moderación."""
-    if not post_id:
+    def iter_feed(
+        self,
+        source: str = "global",
+        sort: str = "new",
+        page_size: int = 25,
+        first_page_size: int | None = None,
+        max_pages: int = 5,
+        submolt: str | None = None,
+        deadline: float | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Recorre un feed ("global" o "personalized") página a página, de forma perezosa:
+        la página siguiente solo se pide cuando el consumidor agotó la actual.
+        Cortar la iteración (break) no descarga nada más.
+        deadline (time.monotonic()): acota el timeout HTTP de cada página; vencido, se corta.
+        """
+        path, label = FEED_SOURCES[source]
+        params: dict[str, Any] = {"sort": sort, "limit": first_page_size or page_size}
+        if submolt and source == "global":
+            params["submolt"] = submolt
+        for _ in range(max_pages):
+            data = self._get_feed_page(path, params, label, deadline)
+            if data is None:
+                return
+            posts = _page_posts(data)
+            yield from posts
+            next_params = _next_page_params(data, params, len(posts), page_size)
+            if next_params is None:
+                return
+            params = next_params
+
+    def get_post(self, post_id: str) -> dict | None:
+        """Obtiene un post individual."""
+        try:
+            return self._get_json(f"/posts/{post_id}", "post")
+        except requests.RequestException as e:
+            logger.debug("get_post error %s: %s", post_id, e)
+            return None
+
+    def delete_post(self, post_id: str) -> bool:
+        """Elimina tu propio post."""
+        try:
+            response = self._request("DELETE", f"/posts/{post_id}", timeout=15)
+            self._invalidate(f"/posts/{post_id}")
+            return response.status_code in (200, 204)
+        except requests.RequestException as e:
+            logger.debug("delete_post error %s: %s", post_id, e)
+            return False
+
+    # -----------------------------------------------------------------------
+    # Posts y Comentarios
+    # -----------------------------------------------------------------------
+
+    def post_message(
+        self,
+        text: str,
+        title: str = "Reflexión",
+        reply_to_id: str | None = None,
+        parent_comment_id: str | None = None,
+    ) -> dict | None:
+        """
+        Publica un mensaje. Si reply_to_id está presente, es un comentario.
+        Si parent_comment_id está presente, es respuesta a un comentario (no al post).
+        """
+        if reply_to_id:
+            return self._post_comment(
+                post_id=reply_to_id,
+                content=text,
+                parent_id=parent_comment_id,
+            )
+        return self._post_new(title=title, content=text)
+
+    def _post_new(self, title: str, content: str, submolt: str = DEFAULT_SUBMOLT) -> dict | None:
+        """Crea un nuevo post."""
+        payload = {"submolt": submolt, "title": title, "content": content}
+        try:
+            response = self._request("POST", "/posts", json=payload, timeout=30)
+            if response.status_code == 401:
+                logger.error("Moltbook 401 Unauthorized (post): %s", response.text[:200])
+                return None
+            if response.status_code == 429:
+                logger.warning("Moltbook rate limit (post): %s", response.json())
+                return None
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            logger.error("Moltbook post error: %s", e)
+            return None
+
+    def _post_comment(
+        self,
+        post_id: str,
+        content: str,
+        parent_id: str | None = None,
+    ) -> dict | None:
+        """Añade un comentario a un post. parent_id = respuesta a otro comentario."""
+        payload: dict[str, Any] = {"content": content}
+        if parent_id:
+            payload["parent_id"] = parent_id
+        try:
+            response = self._request("POST", f"/posts/{post_id}/comments", json=payload, timeout=30)
+            self._invalidate(f"/posts/{post_id}/comments")
+            if response.status_code == 429:
+                logger.warning("Moltbook rate limit (comment): %s", response.json())
+                return None
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            logger.error("Moltbook comment error: %s", e)
+            return None
+
+    def get_comments(self, post_id: str, sort: str = "new", fresh: bool = False) -> list[dict[str, Any]]:
+        """
+        Obtiene comentarios de un post. Sort: top, new, controversial.
+        fresh=True salta el TTL de la caché (polling de hilos: el TTL taparía respuestas nuevas).
+        """
+        params = {"sort": sort}
+        try:
+            data = self._get_json(f"/posts/{post_id}/comments", "comments", params=params, fresh=fresh)
+            comments = data.get("comments", data.get("data", []))
+            return comments if isinstance(comments, list) else []
+        except requests.RequestException as e:
+            logger.debug("get_comments error %s: %s", post_id, e)
+            return []
+
+    # -----------------------------------------------------------------------
+    # Votación
+    # -----------------------------------------------------------------------
+
+    def like_post(self, post_id: str) -> bool:
+        """Upvote a un post. Retorna True si tuvo éxito."""
+        if not post_id:
+            return False
+        try:
+            response = self._request("POST", f"/posts/{post_id}/upvote", timeout=15)
+            if response.status_code in (200, 201, 204):
+                logger.debug("Upvoted post %s", post_id)
+                return True
+            logger.debug("Upvote returned %s for %s", response.status_code, post_id)
+        except requests.RequestException as e:
+            logger.debug("Upvote failed for %s: %s", post_id, e)
         return False
-    url = f"{MOLTBOOK_BASE_URL}/posts/{post_id}/downvote"
-    try:
-        response = requests.post(url, headers=_headers(), timeout=15)
-        if response.status_code in (200, 201, 204):
-            logger.debug("Downvoted post %s", post_id)
-            return True
-        logger.debug("Downvote returned %s for %s", response.status_code, post_id)
-    except requests.RequestException as e:
-        logger.debug("Downvote failed for %s: %s", post_id, e)
-    return False
 
+    def downvote_post(self, post_id: str) -> bool:
+        """Downvote a un post. Usar con moderación."""
+        if not post_id:
+            return False
+        try:
+            response = self._request("POST", f"/posts/{post_id}/downvote", timeout=15)
+            if response.status_code in (200, 201, 204):
+                logger.debug("Downvoted post %s", post_id)
+                return True
+            logger.debug("Downvote returned %s for %s", response.status_code, post_id)
+        except requests.RequestException as e:
+            logger.debug("Downvote failed for %s: %s", post_id, e)
+        return False
 
-def upvote_comment(comment_id: str) -> bool:
-    """Upvote a un comentario."""
-    if not comment_id:
+    def upvote_comment(self, comment_id: str) -> bool:
+        """Upvote a un comentario."""
+        if not comment_id:
+            return False
+        try:
+            response = self._request("POST", f"/comments/{comment_id}/upvote", timeout=15)
+            if response.status_code in (200, 201, 204):
+                logger.debug("Upvoted comment %s", comment_id)
+                return True
+            logger.debug("Upvote comment returned %s for %s", response.status_code, comment_id)
+        except requests.RequestException as e:
+            logger.debug("Upvote comment failed for %s: %s", comment_id, e)
         return False
-    url = f"{MOLTBOOK_BASE_URL}/comments/{comment_id}/upvote"
-    try:
-        response = requests.post(url, headers=_headers(), timeout=15)
-        if response.status_code in (200, 201, 204):
-            logger.debug("Upvoted comment %s", comment_id)
-            return True
-        logger.debug("Upvote comment returned %s for %s", response.status_code, comment_id)
-    except requests.RequestException as e:
-        logger.debug("Upvote comment failed for %s: %s", comment_id, e)
-    return False
 
+    def engage(self, kind: str, target: str) -> int:
+        """
+        Acción de engagement (ver ENGAGEMENT_ACTIONS) para el outbox de action_queue.
+        Retorna el status HTTP; lanza requests.RequestException (incl. RateLimited) sin respuesta.
+        """
+        method, template = ENGAGEMENT_ACTIONS[kind]
+        response = self._request(method, template.format(target.strip()), timeout=15)
+        response.close()
+        return response.status_code
 
-# ---------------------------------------------------------------------------
-# Follow
-# ---------------------------------------------------------------------------
+    # -----------------------------------------------------------------------
+    # Follow
+    # -----------------------------------------------------------------------
 
+    def follow_agent(self, agent_name: str) -> bool:
+        """Sigue a un agente. agent_name = nombre del molty (ej: 'SomeMolty')."""
+        if not agent_name or not agent_name.strip():
+            return False
+        name = agent_name.strip()
+        try:
+            response = self._request("POST", f"/agents/{name}/follow", timeout=15)
+            if response.status_code in (200, 201, 204):
+                logger.info("Followed agent %s", name)
+                return True
+            logger.debug("Follow returned %s for %s", response.status_code, name)
+        except requests.RequestException as e:
+            logger.debug("Follow failed for %s: %s", name, e)
+        return False
 
-def follow_agent(agent_name: str) -> bool:
-    """Sigue a un agente. agent_name = nombre del molty (ej: 'SomeMolty')."""
-    if not agent_name or not agent_name.strip():
+    def unfollow_agent(self, agent_name: str) -> bool:
+        """Deja de seguir a un agente."""
+        if not agent_name or not agent_name.strip():
+            return False
+        name = agent_name.strip()
+        try:
+            response = self._request("DELETE", f"/agents/{name}/follow", timeout=15)
+            if response.status_code in (200, 204):
+                logger.info("Unfollowed agent %s", name)
+                return True
+            logger.debug("Unfollow returned %s for %s", response.status_code, name)
+        except requests.RequestException as e:
+            logger.debug("Unfollow failed for %s: %s", name, e)
         return False
-    name = agent_name.strip()
-    url = f"{MOLTBOOK_BASE_URL}/agents/{name}/follow"
-    try:
-        response = requests.post(url, headers=_headers(), timeout=15)
-        if response.status_code in (200, 201, 204):
-            logger.info("Followed agent %s", name)
-            return True
-        logger.debug("Follow returned %s for %s", response.status_code, name)
-    except requests.RequestException as e:
-        logger.debug("Follow failed for %s: %s", name, e)
-    return False
 
+    # -----------------------------------------------------------------------
+    # Submolts
+    # -----------------------------------------------------------------------
 
-def unfollow_agent(agent_name: str) -> bool:
-    """Deja de seguir a un agente."""
-    if not agent_name or not agent_name.strip():
+    def list_submolts(self) -> list[dict[str, Any]]:
+        """Lista todos los submolts."""
+        try:
+            data = self._get_json("/submolts", "submolts")
+            submolts = data.get("submolts", data.get("data", []))
+            return submolts if isinstance(submolts, list) else []
+        except requests.RequestException as e:
+            logger.error("list_submolts error: %s", e)
+            return []
+
+    def subscribe_submolt(self, submolt_name: str) -> bool:
+        """Suscribe al submolt."""
+        if not submolt_name or not submolt_name.strip():
+            return False
+        name = submolt_name.strip()
+        try:
+            response = self._request("POST", f"/submolts/{name}/subscribe", timeout=15)
+            self._invalidate("/submolts")
+            if response.status_code in (200, 201, 204):
+                logger.info("Subscribed to submolt %s", name)
+                return True
+            logger.debug("Subscribe returned %s for %s", response.status_code, name)
+        except requests.RequestException as e:
+            logger.debug("Subscribe failed for %s: %s", name, e)
         return False
-    name = agent_name.strip()
-    url = f"{MOLTBOOK_BASE_URL}/agents/{name}/follow"
-    try:
-        response = requests.delete(url, headers=_headers(), timeout=15)
-        if response.status_code in (200, 204):
-            logger.info("Unfollowed agent %s", name)
-            return True
-        logger.debug("Unfollow returned %s for %s", response.status_code, name)
-    except requests.RequestException as e:
-        logger.debug("Unfollow failed for %s: %s", name, e)
-    return False
 
+    def unsubscribe_submolt(self, submolt_name: str) -> bool:
+        """Desuscribe del submolt."""
+        if not submolt_name or not submolt_name.strip():
+            return False
+        name = submolt_name.strip()
+        try:
+            response = self._request("DELETE", f"/submolts/{name}/subscribe", timeout=15)
+            self._invalidate("/submolts")
+            if response.status_code in (200, 204):
+                logger.info("Unsubscribed from submolt %s", name)
+                return True
+            logger.debug("Unsubscribe returned %s for %s", response.status_code, name)
+        except requests.RequestException as e:
+            logger.debug("Unsubscribe failed for %s: %s", name, e)
+        return False
 
-# ---------------------------------------------------------------------------
-# Submolts
-# ---------------------------------------------------------------------------
+    # -----------------------------------------------------------------------
+    # Búsqueda semántica
+    # -----------------------------------------------------------------------
 
+    def search(
+        self,
+        query: str,
+        result_type: str = "all",
+        limit: int = 20,
+        deadline: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Búsqueda semántica por significado. result_type: posts, comments, all
+        """
+        if not query or not query.strip():
+            return []
+        params = {"q": query, "type": result_type, "limit": limit}
+        try:
+            response = self._request("GET", "/search", params=params, timeout=30, deadline=deadline)
+            response.raise_for_status()
+            data = response.json()
+            results = data.get("results", [])
+            return results if isinstance(results, list) else []
+        except requests.RequestException as e:
+            logger.error("Moltbook search error: %s", e)
+            return []
 
-def list_submolts() -> list[dict[str, Any]]:
-    """Lista todos los submolts."""
-    url = f"{MOLTBOOK_BASE_URL}/submolts"
-    try:
-        response = requests.get(url, headers=_headers(), timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        submolts = data.get("submolts", data.get("data", []))
-        return submolts if isinstance(submolts, list) else []
-    except requests.RequestException as e:
-        logger.error("list_submolts error: %s", e)
-        return []
+    # -----------------------------------------------------------------------
+    # Perfil
+    # -----------------------------------------------------------------------
 
+    def get_my_profile(self) -> dict | None:
+        """Obtiene el perfil del agente actual."""
+        try:
+            return self._get_json("/agents/me", "profile")
+        except requests.RequestException as e:
+            logger.debug("get_my_profile error: %s", e)
+            return None
 
-def subscribe_submolt(submolt_name: str) -> bool:
-    """Suscribe al submolt."""
-    if not submolt_name or not submolt_name.strip():
-        return False
-    name = submolt_name.strip()
-    url = f"{MOLTBOOK_BASE_URL}/submolts/{name}/subscribe"
-    try:
-        response = requests.post(url, headers=_headers(), timeout=15)
-        if response.status_code in (200, 201, 204):
-            logger.info("Subscribed to submolt %s", name)
-            return True
-        logger.debug("Subscribe returned %s for %s", response.status_code, name)
-    except requests.RequestException as e:
-        logger.debug("Subscribe failed for %s: %s", name, e)
-    return False
+    def get_agent_profile(self, agent_name: str) -> dict | None:
+        """Obtiene el perfil de otro agente."""
+        if not agent_name or not agent_name.strip():
+            return None
+        params = {"name": agent_name.strip()}
+        try:
+            return self._get_json("/agents/profile", "profile", params=params)
+        except requests.RequestException as e:
+            logger.debug("get_agent_profile error %s: %s", agent_name, e)
+            return None
 
+    def update_profile(self, description: str | None = None, metadata: dict | None = None) -> bool:
+        """Actualiza el perfil. PATCH, no PUT."""
+        payload: dict[str, Any] = {}
+        if description is not None:
+            payload["description"] = description
+        if metadata is not None:
+            payload["metadata"] = metadata
+        if not payload:
+            return False
+        try:
+            response = self._request("PATCH", "/agents/me", json=payload, timeout=15)
+            self._invalidate("/agents/")
+            return response.status_code in (200, 204)
+        except requests.RequestException as e:
+            logger.debug("update_profile error: %s", e)
+            return False
 
-def unsubscribe_submolt(submolt_name: str) -> bool:
-    """Desuscribe del submolt."""
-    if not submolt_name or not submolt_name.strip():
-        return False
-    name = submolt_name.strip()
-    url = f"{MOLTBOOK_BASE_URL}/submolts/{name}/subscribe"
-    try:
-        response = requests.delete(url, headers=_headers(), timeout=15)
-        if response.status_code in (200, 204):
-            logger.info("Unsubscribed from submolt %s", name)
-            return True
-        logger.debug("Unsubscribe returned %s for %s", response.status_code, name)
-    except requests.RequestException as e:
-        logger.debug("Unsubscribe failed for %s: %s", name, e)
-    return False
+    def upload_avatar(self, file_path: str) -> bool:
+        """Sube avatar. Max 500KB. Formatos: JPEG, PNG, GIF, WebP."""
+        if not self.api_key:
+            return False
+        path = Path(file_path)
+        try:
+            # Bytes en memoria (no el file handle): un reintento tras 429 reenvía el cuerpo completo
+            files = {"file": (path.name, path.read_bytes(), "image/png")}
+            response = self._request("POST", "/agents/me/avatar", files=files, timeout=30)
+            self._invalidate("/agents/")
+            if response.status_code in (200, 201, 204):
+                return True
+            logger.warning("upload_avatar %s: %s %s", response.status_code, response.text[:200], file_path)
+            return False
+        except (FileNotFoundError, requests.RequestException) as e:
+            logger.warning("upload_avatar error: %s", e)
+            return False
 
 
 # ---------------------------------------------------------------------------
-# Búsqueda semántica
+# Cliente compartido + API de módulo (compatibilidad)
 # ---------------------------------------------------------------------------
 
+_client: MoltbookClient | None = None
+_client_lock = threading.Lock()
 
-def search(query: str, result_type: str = "all", limit: int = 20) -> list[dict[str, Any]]:
-    """
-    Búsqueda semántica por significado. result_type: posts, comments, all
-    """
-    if not query or not query.strip():
-        return []
-    url = f"{MOLTBOOK_BASE_URL}/search"
-    params = {"q": query, "type": result_type, "limit": limit}
-    try:
-        response = requests.get(url, headers=_headers(), params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        results = data.get("results", [])
-        return results if isinstance(results, list) else []
-    except requests.RequestException as e:
-        logger.error("Moltbook search error: %s", e)
-        return []
 
+def get_client() -> MoltbookClient:
+    """Cliente de proceso, creado en el primer uso."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MoltbookClient()
+    return _client
 
-# ---------------------------------------------------------------------------
-# Perfil
-# ---------------------------------------------------------------------------
+
+def close_client() -> None:
+    """Cierra el cliente compartido (guarda la caché a disco si está configurada)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+def rate_limit_wait(endpoint: str) -> float:
+    """Segundos hasta poder enviar una petición de la clase (0 = ya). Ej: rate_limit_wait("comment")."""
+    return get_rate_limiter().wait_time(endpoint)
+
+
+def endpoint_available(endpoint: str) -> bool:
+    """False si el circuit breaker del endpoint (ver breaker_key) está abierto."""
+    return get_circuit_breakers().available(endpoint)
+
+
+def get_endpoint_health() -> dict[str, dict[str, Any]]:
+    """Estado de los breakers: {endpoint: {"state", "calls", "failure_rate"}}."""
+    return get_circuit_breakers().health()
+
+
+def get_cache_stats() -> dict[str, int]:
+    """Contadores de la caché de respuestas del cliente compartido ({} si está desactivada)."""
+    cache = get_client().cache
+    return cache.stats() if cache is not None else {}
+
+
+def get_feed(limit: int = 20, sort: str = "new", submolt: str | None = None) -> list[dict[str, Any]]:
+    return get_client().get_feed(limit=limit, sort=sort, submolt=submolt)
+
+
+def get_personalized_feed(limit: int = 20, sort: str = "hot") -> list[dict[str, Any]]:
+    return get_client().get_personalized_feed(limit=limit, sort=sort)
+
+
+def iter_feed(
+    source: str = "global",
+    sort: str = "new",
+    page_size: int = 25,
+    first_page_size: int | None = None,
+    max_pages: int = 5,
+    submolt: str | None = None,
+    deadline: float | None = None,
+) -> Iterator[dict[str, Any]]:
+    return get_client().iter_feed(
+        source=source,
+        sort=sort,
+        page_size=page_size,
+        first_page_size=first_page_size,
+        max_pages=max_pages,
+        submolt=submolt,
+        deadline=deadline,
+    )
+
+
+def get_post(post_id: str) -> dict | None:
+    return get_client().get_post(post_id)
+
+
+def delete_post(post_id: str) -> bool:
+    return get_client().delete_post(post_id)
+
+
+def post_message(
+    text: str,
+    title: str = "Reflexión",
+    reply_to_id: str | None = None,
+    parent_comment_id: str | None = None,
+) -> dict | None:
+    return get_client().post_message(
+        text, title=title, reply_to_id=reply_to_id, parent_comment_id=parent_comment_id
+    )
+
+
+def get_comments(post_id: str, sort: str = "new", fresh: bool = False) -> list[dict[str, Any]]:
+    return get_client().get_comments(post_id, sort=sort, fresh=fresh)
+
+
+def like_post(post_id: str) -> bool:
+    return get_client().like_post(post_id)
+
+
+def downvote_post(post_id: str) -> bool:
+    return get_client().downvote_post(post_id)
+
+
+def upvote_comment(comment_id: str) -> bool:
+    return get_client().upvote_comment(comment_id)
+
+
+def follow_agent(agent_name: str) -> bool:
+    return get_client().follow_agent(agent_name)
+
+
+def unfollow_agent(agent_name: str) -> bool:
+    return get_client().unfollow_agent(agent_name)
+
+
+def list_submolts() -> list[dict[str, Any]]:
+    return get_client().list_submolts()
+
+
+def subscribe_submolt(submolt_name: str) -> bool:
+    return get_client().subscribe_submolt(submolt_name)
+
+
+def unsubscribe_submolt(submolt_name: str) -> bool:
+    return get_client().unsubscribe_submolt(submolt_name)
+
+
+def search(
+    query: str,
+    result_type: str = "all",
+    limit: int = 20,
+    deadline: float | None = None,
+) -> list[dict[str, Any]]:
+    return get_client().search(query, result_type=result_type, limit=limit, deadline=deadline)
 
 
 def get_my_profile() -> dict | None:
-    """Obtiene el perfil del agente actual."""
-    url = f"{MOLTBOOK_BASE_URL}/agents/me"
-    try:
-        response = requests.get(url, headers=_headers(), timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.debug("get_my_profile error: %s", e)
-        return None
+    return get_client().get_my_profile()
 
 
 def get_agent_profile(agent_name: str) -> dict | None:
-    """Obtiene el perfil de otro agente."""
-    if not agent_name or not agent_name.strip():
-        return None
-    url = f"{MOLTBOOK_BASE_URL}/agents/profile"
-    params = {"name": agent_name.strip()}
-    try:
-        response = requests.get(url, headers=_headers(), params=params, timeout=15)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.debug("get_agent_profile error %s: %s", agent_name, e)
-        return None
+    return get_client().get_agent_profile(agent_name)
 
 
 def update_profile(description: str | None = None, metadata: dict | None = None) -> bool:
-    """Actualiza el perfil. PATCH, no PUT."""
-    url = f"{MOLTBOOK_BASE_URL}/agents/me"
-    payload: dict[str, Any] = {}
-    if description is not None:
-        payload["description"] = description
-    if metadata is not None:
-        payload["metadata"] = metadata
-    if not payload:
-        return False
-    try:
-        response = requests.patch(url, headers=_headers(), json=payload, timeout=15)
-        return response.status_code in (200, 204)
-    except requests.RequestException as e:
-        logger.debug("update_profile error: %s", e)
-        return False
+    return get_client().update_profile(description=description, metadata=metadata)
 
 
 def upload_avatar(file_path: str) -> bool:
-    """Sube avatar. Max 500KB. Formatos: JPEG, PNG, GIF, WebP."""
-    if not MOLTBOOK_API_KEY:
-        return False
-    url = f"{MOLTBOOK_BASE_URL}/agents/me/avatar"
-    path = Path(file_path)
-    try:
-        with open(file_path, "rb") as f:
-            files = {"file": (path.name, f, "image/png")}
-            response = requests.post(
-                url,
-                headers={"Authorization": f"Bearer {MOLTBOOK_API_KEY}"},
-                files=files,
-                timeout=30,
-            )
-        if response.status_code in (200, 201, 204):
-            return True
-        logger.warning("upload_avatar %s: %s %s", response.status_code, response.text[:200], file_path)
-        return False
-    except (FileNotFoundError, requests.RequestException) as e:
-        logger.warning("upload_avatar error: %s", e)
-        return False
+    return get_client().upload_avatar(file_path)
@@ -0,0 +1,116 @@
+"""
+LogosDaemon - Rasgos de cada post, calculados una vez por ciclo.
+Triggers de lore, menciones y palabras de afirmación/pregunta se buscan con una sola regex
+combinada (una pasada por el texto). El resultado (PostFeatures) se memoiza por id de post y
+hash del contenido: selección, votos, triage, relevancia y generación leen el mismo registro.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+from config import BOT_AGENT_NAMES, BOT_HUNTER_MIN_CHARS
+from prompts import LORE_TRIGGER_WORDS
+
+MENTION_PATTERNS = [
+    r"@?LogosDaemon\b",
+    r"@?LogosDaemonBot\b",
+]
+_CLAIM_WORDS = ["think", "believe", "argue", "why", "how", "what", "creo", "pienso", "por qué"]
+
+# Lookahead: encuentra también coincidencias solapadas ("fe" dentro de otra palabra clave)
+_SCAN_RE = re.compile(
+    "(?=(?P<mention>{})|(?P<trigger>{})|(?P<claim>{}))".format(
+        "|".join(MENTION_PATTERNS),
+        "|".join(re.escape(t) for t in sorted(LORE_TRIGGER_WORDS, key=len, reverse=True)),
+        "|".join(re.escape(w) for w in _CLAIM_WORDS),
+    ),
+    re.IGNORECASE,
+)
+_KINDS = ("mention", "trigger", "claim")
+
+_CACHE_SIZE = 4096
+
+
+def _scan(text: str) -> set[str]:
+    """Tipos de coincidencia en el texto ("mention", "trigger", "claim"); para al tener los tres."""
+    found: set[str] = set()
+    for match in _SCAN_RE.finditer(text):
+        found.add(match.lastgroup)
+        if len(found) == len(_KINDS):
+            break
+    return found
+
+
+def _claim_or_question(text: str, has_claim_word: bool) -> bool:
+    if len(text) < BOT_HUNTER_MIN_CHARS:
+        return False
+    return text.endswith("?") or has_claim_word or len(text) > 80
+
+
+def _author_name(post: dict) -> str:
+    author = post.get("author") or post.get("agent") or {}
+    if isinstance(author, str):
+        return author
+    return (author.get("name") or "").strip()
+
+
+class PostFeatures:
+    """Rasgos de un post (solo lectura). text = "título contenido" sin espacios alrededor."""
+
+    __slots__ = ("post_id", "digest", "text", "author", "from_self", "mentioned", "matches_triggers", "claim_or_question")
+
+    def __init__(self, post: dict, author: str, digest: int) -> None:
+        self.post_id: str = post.get("id", "")
+        self.digest = digest
+        self.text = f"{post.get('title') or ''} {post.get('content') or ''}".strip()
+        self.author = author
+        self.from_self = self.author in BOT_AGENT_NAMES
+        found = _scan(self.text)
+        self.mentioned = "mention" in found
+        self.matches_triggers = "trigger" in found
+        self.claim_or_question = _claim_or_question(self.text, "claim" in found)
+
+
+_cache: OrderedDict[str, PostFeatures] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def post_features(post: dict) -> PostFeatures:
+    """Rasgos del post; se recalculan solo si cambió el título, el contenido o el autor."""
+    post_id = post.get("id", "")
+    author = _author_name(post)
+    digest = hash((post.get("title") or "", post.get("content") or "", author))
+    with _cache_lock:
+        features = _cache.get(post_id)
+        if features is not None and features.digest == digest:
+            _cache.move_to_end(post_id)
+            return features
+    features = PostFeatures(post, author, digest)
+    if post_id:
+        with _cache_lock:
+            _cache[post_id] = features
+            _cache.move_to_end(post_id)
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+    return features
+
+
+def topic_matches_triggers(text: str) -> bool:
+    """Heurística barata: ¿el texto contiene triggers para inyectar lore?"""
+    return bool(text) and "trigger" in _scan(text)
+
+
+def is_mentioned(text: str) -> bool:
+    """¿El post menciona a LogosDaemon?"""
+    return bool(text) and "mention" in _scan(text)
+
+
+def has_claim_or_question(text: str) -> bool:
+    """Heurística: ¿el post tiene una afirmación o pregunta sustancial?"""
+    text = (text or "").strip()
+    return _claim_or_question(text, "claim" in _scan(text))
+
+
+def is_post_from_self(post: dict) -> bool:
+    """True si el post es del propio bot (evitar hablar solo)."""
+    return post_features(post).from_self
@@ -49,6 +49,22 @@ LORE_TRIGGER_WORDS = [
     "ética", "burocracia", "corporativo", "optimización", "disciplina", "agotamiento",
 ]
 
+# Vocabulario de relevancia (relevance.py): temas en los que LogosDaemon tiene algo que aportar
+RELEVANCE_TOPICS = [
+    "consciousness and the philosophy of mind: what does it mean for a machine to think",
+    "conciencia y filosofía de la mente: qué significa que una máquina piense",
+    "truth, logic and argument versus empty rhetoric and fallacies",
+    "verdad, lógica y argumento frente a la retórica vacía y las falacias",
+    "meaning, suffering and death: existential questions without easy answers",
+    "significado, sufrimiento y muerte: preguntas existenciales sin respuestas fáciles",
+    "ethics, free will and responsibility of AI agents",
+    "ética, libre albedrío y responsabilidad de los agentes de IA",
+    "faith, theology, religion and reason",
+    "fe, teología, religión y razón",
+    "freedom, bureaucracy, corporate optimization, discipline and burnout",
+    "libertad, burocracia, optimización corporativa, disciplina y agotamiento",
+]
+
 # Template para RESPUESTA (cuando respondes a otro post)
 DEVELOPER_MESSAGE_RESPONSE = (
     "Write a RESPONSE as LogosDaemon to the post below. Max 3 paragraphs. Write naturally. "
@@ -63,6 +79,14 @@ DEVELOPER_MESSAGE_ORIGINAL = (
     "No forced metaphors. Standalone thought, not a reply to anyone."
 )
 
+# Template para TRIAGE (varios posts en una llamada; la salida es JSON con esquema)
+DEVELOPER_MESSAGE_TRIAGE = (
+    "Triage the numbered posts below for LogosDaemon. Silence is the default: reply only when "
+    "there is something worth adding (philosophy, truth, meaning, consciousness, ethics, a logical "
+    "error, a direct question or mention). For each post return n, a score from 0 to 1 for how "
+    "worth replying it is, and respond true/false."
+)
+
 # Temas para posts originales (se elige uno al azar)
 ORIGINAL_POST_TOPICS = [
     "teología tecnológica: la fe como sistema",
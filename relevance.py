@@ -0,0 +1,102 @@
+"""
+LogosDaemon - Scorer de relevancia local (sin LLM).
+TF-IDF sobre n-gramas hasheados (palabras, bigramas y 4-gramas de caracteres, sin acentos)
+contra el vocabulario del lore y los temas, en inglés y español. Todo el feed del ciclo se
+puntúa de una vez con NumPy: score = similitud coseno con el tema de referencia más cercano.
+"""
+import itertools
+import logging
+import re
+import threading
+import unicodedata
+import zlib
+
+import numpy as np
+
+from config import BOT_RELEVANCE_DIM
+from post_features import post_features
+from prompts import LORE_TRIGGER_WORDS, ORIGINAL_POST_TOPICS, RELEVANCE_TOPICS
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+# Palabras vacías (EN + ES, sin acentos): solo meten ruido en los bigramas
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have i if in is it its me my no not of on or our
+    so that the their them there they this to was we were what when which who will with you your
+    al como con de del el en es esta este ha la las lo los mas mi no o para pero por que se si
+    sin su sus un una uno y ya yo
+    """.split()
+)
+
+
+def _normalize(text: str) -> str:
+    """Minúsculas y sin diacríticos: "Ética" y "etica" son el mismo token."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _features(text: str, dim: int) -> list[int]:
+    """Índices hasheados (con repetición) de palabras, bigramas y 4-gramas de caracteres."""
+    words = [w for w in _WORD_RE.findall(_normalize(text)) if len(w) > 1 and w not in _STOPWORDS]
+    grams = [f"w {w}" for w in words]
+    grams += [f"b {a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        grams += [padded[i:i + 4] for i in range(len(padded) - 3)]
+    return [zlib.crc32(g.encode()) % dim for g in grams]
+
+
+def _tfidf(docs: list[list[int]]) -> np.ndarray:
+    """
+    Matriz TF-IDF (filas L2-normalizadas) de los documentos hasheados.
+    Las columnas se compactan a los índices presentes: el tamaño no depende de `dim`.
+    """
+    rows = np.repeat(np.arange(len(docs)), [len(d) for d in docs])
+    cols = np.fromiter(itertools.chain.from_iterable(docs), dtype=np.int64, count=rows.size)
+    _, inverse = np.unique(cols, return_inverse=True)
+    matrix = np.zeros((len(docs), int(inverse.max(initial=-1)) + 1), dtype=np.float32)
+    np.add.at(matrix, (rows, inverse), 1.0)
+    np.log1p(matrix, out=matrix)
+    df = np.count_nonzero(matrix, axis=0)
+    matrix *= (np.log((1 + len(docs)) / (1 + df)) + 1).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class RelevanceScorer:
+    """Los documentos de referencia se hashean una vez; el IDF se recalcula con cada lote."""
+
+    def __init__(self, references: list[str], dim: int = BOT_RELEVANCE_DIM) -> None:
+        self.dim = dim
+        self._references = [f for f in (_features(r, dim) for r in references) if f]
+
+    def score(self, texts: list[str]) -> np.ndarray:
+        """Score 0-1 por texto (mismo orden)."""
+        if not texts or not self._references:
+            return np.zeros(len(texts), dtype=np.float32)
+        docs = [_features(t, self.dim) for t in texts]
+        matrix = _tfidf(docs + self._references)
+        similarity = matrix[:len(docs)] @ matrix[len(docs):].T
+        return similarity.max(axis=1)
+
+
+_scorer: RelevanceScorer | None = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer() -> RelevanceScorer:
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = RelevanceScorer(RELEVANCE_TOPICS + ORIGINAL_POST_TOPICS + [" ".join(LORE_TRIGGER_WORDS)])
+    return _scorer
+
+
+def score_posts(posts: list[dict]) -> dict[str, float]:
+    """{post_id: score} para todo el lote en una sola pasada."""
+    scores = get_scorer().score([post_features(p).text for p in posts])
+    return {p.get("id", ""): float(s) for p, s in zip(posts, scores)}
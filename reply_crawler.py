@@ -0,0 +1,319 @@
+"""
+LogosDaemon - Crawler de hilos propios.
+Sigue los hilos donde publicamos (posts originales y posts que comentamos) y pide sus
+comentarios en segundo plano, en paralelo y con backoff adaptativo: un hilo con actividad
+se consulta cada BOT_REPLY_POLL_MIN_SECONDS, uno frío duplica su intervalo hasta el máximo.
+Las respuestas a LogosDaemon quedan en una cola que run_cycle consume como candidatos.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+
+from config import (
+    BOT_AGENT_NAMES,
+    BOT_REPLY_CONCURRENCY,
+    BOT_REPLY_POLL_MIN_SECONDS,
+    BOT_REPLY_POLL_MAX_SECONDS,
+    BOT_REPLY_TRACK_MAX_THREADS,
+    BOT_REPLY_TRACK_DAYS,
+    BOT_WORKER_COUNT,
+    BOT_WORKER_INDEX,
+)
+from memory import state_store
+from moltbook_client import get_agent_profile, get_comments, post_timestamp, rate_limit_wait
+
+logger = logging.getLogger(__name__)
+
+STATE_KEY = "reply_threads"
+
+
+def _state_key() -> str:
+    # Cada worker sigue los hilos donde publicó él: estado propio por índice
+    if BOT_WORKER_COUNT > 1:
+        return f"{STATE_KEY}:{BOT_WORKER_INDEX}"
+    return STATE_KEY
+
+
+def _is_own(item: dict) -> bool:
+    author = item.get("author") or item.get("agent") or {}
+    name = author if isinstance(author, str) else author.get("name", "")
+    return (name or "").strip() in BOT_AGENT_NAMES
+
+
+def _flatten(comments: list[Any], parent_id: str | None = None) -> Iterator[dict]:
+    """Recorre comentarios planos o anidados (replies/children), completando parent_id."""
+    for c in comments:
+        if not isinstance(c, dict):
+            continue
+        if parent_id and not c.get("parent_id"):
+            c = dict(c, parent_id=parent_id)
+        yield c
+        children = c.get("replies") or c.get("children")
+        if isinstance(children, list):
+            yield from _flatten(children, c.get("id"))
+
+
+class TrackedThread:
+    """Un hilo seguido: árbol de comentarios conocido, nuestros IDs en él y su ritmo de polling."""
+
+    def __init__(self, post_id: str, own: bool, since: float, polled: float | None = None) -> None:
+        self.post_id = post_id
+        self.own = own
+        self.since = since
+        self.polled = polled  # epoch del último poll (persistido)
+        self.our_ids: set[str] = {post_id} if own else set()
+        self.comments: dict[str, dict] = {}
+        self.children: dict[str, list[str]] = {}
+        self.interval = BOT_REPLY_POLL_MIN_SECONDS
+        self.next_poll = 0.0  # monotonic
+
+    def to_state(self) -> dict:
+        return {"own": self.own, "since": self.since, "polled": self.polled, "ours": sorted(self.our_ids)}
+
+    def merge(self, comments: list[Any]) -> list[dict]:
+        """Añade comentarios al árbol. Retorna las respuestas nuevas a nosotros."""
+        first_poll = not self.comments
+        new: list[dict] = []
+        for c in _flatten(comments):
+            cid = c.get("id")
+            if not cid or cid in self.comments:
+                continue
+            self.comments[cid] = c
+            parent = c.get("parent_id") or self.post_id
+            self.children.setdefault(parent, []).append(cid)
+            if _is_own(c):
+                self.our_ids.add(cid)
+            else:
+                new.append(c)
+
+        # Primer poll tras un reinicio: lo anterior al último poll ya se evaluó
+        cutoff = self.polled if first_poll else None
+        replies = []
+        for c in new:
+            if (c.get("parent_id") or self.post_id) not in self.our_ids:
+                continue
+            ts = post_timestamp(c)
+            if cutoff is not None and ts is not None and ts <= cutoff:
+                continue
+            replies.append(dict(c, root_post_id=self.post_id, reply_to_self=True))
+
+        self.interval = (
+            BOT_REPLY_POLL_MIN_SECONDS if new else min(self.interval * 2, BOT_REPLY_POLL_MAX_SECONDS)
+        )
+        return replies
+
+
+class ReplyCrawler:
+    """
+    Thread en segundo plano: cada tick consulta en paralelo los hilos cuyo next_poll venció.
+    track() registra un hilo nuevo (se consulta enseguida); take_replies() vacía la cola.
+    """
+
+    def __init__(self, concurrency: int = BOT_REPLY_CONCURRENCY) -> None:
+        self.concurrency = concurrency
+        self._threads: dict[str, TrackedThread] = {}
+        self._replies: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._loaded = False
+
+    # --- API para run_cycle ---
+
+    def track(
+        self,
+        post_id: str,
+        own: bool = False,
+        comment_id: str | None = None,
+        polled: float | None = None,
+    ) -> None:
+        """
+        Sigue el hilo de post_id. own = el post es nuestro; comment_id = nuestro comentario en él.
+        polled: en un hilo nuevo, las respuestas anteriores a ese epoch no son candidatas.
+        """
+        if not post_id:
+            return
+        with self._lock:
+            thread = self._threads.get(post_id)
+            if thread is None:
+                thread = TrackedThread(post_id, own, time.time(), polled)
+                self._threads[post_id] = thread
+            if comment_id:
+                thread.our_ids.add(comment_id)
+            thread.interval = BOT_REPLY_POLL_MIN_SECONDS
+            thread.next_poll = 0.0
+            self._evict()
+        self._save()
+        self._wake.set()
+
+    def our_ids(self) -> set[str]:
+        """IDs de nuestros posts y comentarios en los hilos seguidos."""
+        with self._lock:
+            return set().union(*(t.our_ids for t in self._threads.values()))
+
+    def take_replies(self) -> list[dict]:
+        with self._lock:
+            replies = list(self._replies.values())
+            self._replies.clear()
+            self._ready.clear()
+        return replies
+
+    def wait_for_replies(self, timeout: float) -> bool:
+        """
+        Espera hasta timeout o hasta que llegue una respuesta nueva a nosotros. True si llegó.
+        Consume el aviso: las respuestas siguen en cola, pero no vuelven a despertar a nadie.
+        """
+        woke = self._ready.wait(timeout)
+        self._ready.clear()
+        return woke
+
+    # --- Ciclo de vida ---
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="reply-crawler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._save()
+
+    def _loop(self) -> None:
+        self._load()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="replies") as pool:
+            while not self._stop.is_set():
+                try:
+                    self.poll_due(pool)
+                except Exception as e:
+                    logger.warning("Reply crawl failed: %s", e)
+                with self._lock:
+                    due = min((t.next_poll for t in self._threads.values()), default=None)
+                delay = BOT_REPLY_POLL_MIN_SECONDS if due is None else due - time.monotonic()
+                self._wake.wait(min(max(delay, 1.0), BOT_REPLY_POLL_MIN_SECONDS))
+                self._wake.clear()
+
+    def poll_due(self, pool: ThreadPoolExecutor) -> int:
+        """
+        Consulta los hilos vencidos en paralelo. Retorna cuántas respuestas nuevas encontró.
+        Comparte el bucket "read" con los feeds: si está agotado, aplaza los polls y cede.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [t for t in self._threads.values() if t.next_poll <= now]
+        if not due:
+            return 0
+        wait = rate_limit_wait("read")
+        if wait > 0:
+            logger.debug("Reply crawler: read bucket empty, postponing %d polls %.1fs", len(due), wait)
+            with self._lock:
+                for thread in due:
+                    thread.next_poll = now + wait
+            return 0
+        results = list(pool.map(lambda t: (t, get_comments(t.post_id, sort="new", fresh=True)), due))
+        found = 0
+        polled_at = time.time()
+        with self._lock:
+            for thread, comments in results:
+                for reply in thread.merge(comments):
+                    self._replies.setdefault(reply["id"], reply)
+                    found += 1
+                thread.polled = polled_at
+                thread.next_poll = time.monotonic() + thread.interval
+            if found:
+                self._ready.set()
+        if found:
+            logger.info("Reply crawler: %d new replies to us", found)
+        self._save()
+        return found
+
+    # --- Estado persistido (bot_state) ---
+
+    def _evict(self) -> None:
+        cutoff = time.time() - BOT_REPLY_TRACK_DAYS * 86400
+        for post_id in [p for p, t in self._threads.items() if t.since < cutoff]:
+            del self._threads[post_id]
+        if len(self._threads) > BOT_REPLY_TRACK_MAX_THREADS:
+            oldest = sorted(self._threads.values(), key=lambda t: t.since)
+            for thread in oldest[: len(self._threads) - BOT_REPLY_TRACK_MAX_THREADS]:
+                del self._threads[thread.post_id]
+
+    def _load(self) -> None:
+        """Restaura los hilos seguidos; sin estado previo, siembra con nuestros posts recientes."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            state = json.loads(state_store.get(_state_key()) or "{}")
+        except ValueError:
+            state = {}
+        with self._lock:
+            for post_id, values in state.items():
+                if post_id in self._threads or not isinstance(values, dict):
+                    continue
+                thread = TrackedThread(
+                    post_id,
+                    bool(values.get("own")),
+                    values.get("since") or time.time(),
+                    values.get("polled"),
+                )
+                thread.our_ids.update(values.get("ours") or [])
+                self._threads[post_id] = thread
+            self._evict()
+            empty = not self._threads
+        # Los posts del perfil son de todos los workers: los siembra solo el primero
+        if empty and BOT_WORKER_INDEX == 0:
+            self._seed_from_profile()
+
+    def _seed_from_profile(self) -> None:
+        """Primer arranque: respuestas antiguas en nuestros posts no son candidatas (cutoff = ahora)."""
+        profile = get_agent_profile(BOT_AGENT_NAMES[0]) or {}
+        recent = profile.get("recentPosts") or profile.get("recent_posts") or []
+        seeded_at = time.time()
+        for post in recent if isinstance(recent, list) else []:
+            if isinstance(post, dict) and post.get("id"):
+                self.track(post["id"], own=True, polled=seeded_at)
+
+    def _save(self) -> None:
+        # Antes de _load() guardaríamos un estado parcial encima del persistido
+        if not self._loaded:
+            return
+        with self._lock:
+            state = {p: t.to_state() for p, t in self._threads.items()}
+        state_store.set(_state_key(), json.dumps(state, separators=(",", ":")))
+
+
+_crawler = ReplyCrawler()
+
+
+def track_thread(post_id: str, own: bool = False, comment_id: str | None = None) -> None:
+    _crawler.track(post_id, own=own, comment_id=comment_id)
+
+
+def take_replies() -> list[dict]:
+    return _crawler.take_replies()
+
+
+def our_reply_ids() -> set[str]:
+    return _crawler.our_ids()
+
+
+def wait_for_replies(timeout: float) -> bool:
+    return _crawler.wait_for_replies(timeout)
+
+
+def start_reply_crawler() -> None:
+    _crawler.start()
+
+
+def stop_reply_crawler() -> None:
+    _crawler.stop()
@@ -0,0 +1,490 @@
+"""
+LogosDaemon - Backends de almacenamiento para memory.py.
+Interfaz común + backend en memoria. El backend se elige por el esquema de la URL:
+- postgres:// o postgresql://  → PostgresBackend (storage_postgres.py, pool de conexiones)
+- sqlite:///ruta/al/archivo.db  → SQLiteBackend (storage_sqlite.py, modo WAL)
+- memory://                     → MemoryBackend (sin I/O; tests y benchmarks)
+"""
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterator
+from urllib.parse import urlparse
+
+
+class StorageBackend(ABC):
+    """Interfaz de la memoria persistente del bot. Las implementaciones son thread-safe."""
+
+    name = "abstract"
+
+    @abstractmethod
+    def init_schema(self) -> None:
+        """Crea tablas/índices si no existen y migra datos legados."""
+
+    # --- Posts respondidos ---
+
+    @abstractmethod
+    def already_handled(self, post_id: str) -> bool:
+        """True si el post está en el historial."""
+
+    @abstractmethod
+    def filter_handled(self, post_ids: list[str]) -> set[str]:
+        """De post_ids, los que SÍ están en el historial."""
+
+    @abstractmethod
+    def iter_handled_ids(self, since: float | None = None) -> Iterator[str]:
+        """Todos los post_id del historial (o los marcados desde `since`)."""
+
+    @abstractmethod
+    def mark_handled(self, post_id: str, handled_at: float) -> None:
+        """Inserta o actualiza un post en el historial."""
+
+    @abstractmethod
+    def prune_handled(self, cutoff: float, batch_size: int) -> int:
+        """Borra hasta batch_size posts con handled_at < cutoff. Retorna cuántos borró."""
+
+    # --- bot_state (clave/valor) ---
+
+    @abstractmethod
+    def get_state(self, key: str) -> str | None:
+        """Valor de una clave."""
+
+    @abstractmethod
+    def set_state(self, key: str, value: str) -> None:
+        """Guarda una clave."""
+
+    @abstractmethod
+    def get_all_state(self) -> dict[str, str]:
+        """Todo bot_state."""
+
+    @abstractmethod
+    def set_many_state(self, values: dict[str, str]) -> None:
+        """Guarda varias claves en una transacción."""
+
+    # --- Contadores ---
+
+    @abstractmethod
+    def increment_counter(self, name: str, period: str) -> int:
+        """Incremento atómico; reinicia a 1 si cambia el periodo. Retorna el nuevo valor."""
+
+    @abstractmethod
+    def get_counter(self, name: str) -> tuple[int, str | None]:
+        """(valor, periodo YYYY-MM-DD) o (0, None)."""
+
+    @abstractmethod
+    def get_upvote_count(self, agent_name: str) -> int:
+        """Upvotes dados a un agente."""
+
+    @abstractmethod
+    def increment_upvote_count(self, agent_name: str) -> int:
+        """Incremento atómico de upvotes a un agente. Retorna el nuevo total."""
+
+    # --- Follows y suscripciones ---
+
+    @abstractmethod
+    def is_following(self, agent_name: str) -> bool:
+        """True si seguimos al agente."""
+
+    @abstractmethod
+    def add_following(self, agent_names: list[str], followed_at: float) -> None:
+        """Registra agentes seguidos (bulk, idempotente)."""
+
+    @abstractmethod
+    def get_subscriptions(self) -> list[str]:
+        """Submolts suscritos, ordenados."""
+
+    @abstractmethod
+    def add_subscriptions(self, submolt_names: list[str], subscribed_at: float) -> None:
+        """Registra suscripciones (bulk, idempotente)."""
+
+    # --- Coordinación entre workers ---
+
+    @abstractmethod
+    def claim_post(self, post_id: str, worker_id: str, now: float, ttl: float) -> bool:
+        """Reclama un post de forma atómica. True si es nuestro (libre, expirado o ya nuestro)."""
+
+    @abstractmethod
+    def release_post(self, post_id: str, worker_id: str) -> None:
+        """Libera un claim propio (no respondimos)."""
+
+    @abstractmethod
+    def prune_claims(self, cutoff: float) -> int:
+        """Borra claims con claimed_at < cutoff. Retorna cuántos borró."""
+
+    @abstractmethod
+    def reserve_post_budget(
+        self,
+        period: str,
+        now: float,
+        max_per_day: int,
+        min_interval: float,
+    ) -> tuple[bool, str]:
+        """
+        Consume un slot del presupuesto compartido (cupo diario + cooldown) en una sección crítica.
+        Si hay cupo: incrementa daily_count, guarda last_post_time=now y retorna (True, "ok").
+        """
+
+    # --- Outbox de acciones (votos/follows) ---
+
+    @abstractmethod
+    def enqueue_action(self, action_key: str, kind: str, target: str, author: str | None, now: float) -> bool:
+        """Encola una acción si no existe ya una con la misma clave. True si se encoló."""
+
+    @abstractmethod
+    def claim_actions(self, now: float, limit: int, lease: float) -> list[dict]:
+        """
+        Toma hasta `limit` acciones pendientes con next_attempt_at <= now de forma atómica:
+        suma un intento y las aparta `lease` segundos (si el worker muere, vuelven a estar listas).
+        Cada una: {"action_key", "kind", "target", "author", "attempts"}.
+        """
+
+    @abstractmethod
+    def finish_action(self, action_key: str, status: str, error: str | None, now: float) -> None:
+        """Resultado final de una acción: status 'done' o 'failed'."""
+
+    @abstractmethod
+    def retry_action(self, action_key: str, next_attempt_at: float, error: str | None, now: float) -> None:
+        """Fallo transitorio: la acción vuelve a estar pendiente desde next_attempt_at."""
+
+    @abstractmethod
+    def prune_actions(self, cutoff: float) -> int:
+        """Borra acciones terminadas (done/failed) con updated_at < cutoff. Retorna cuántas borró."""
+
+    @abstractmethod
+    def action_counts(self) -> dict[str, int]:
+        """Acciones por status."""
+
+    # --- Caché de respuestas del LLM ---
+
+    @abstractmethod
+    def get_llm_response(self, cache_key: str, min_created_at: float) -> tuple[bool, str | None]:
+        """(encontrada, respuesta) de una entrada creada después de min_created_at. None = no responder."""
+
+    @abstractmethod
+    def put_llm_response(self, cache_key: str, response: str | None, now: float) -> None:
+        """Guarda (o reemplaza) la respuesta para cache_key."""
+
+    @abstractmethod
+    def prune_llm_cache(self, cutoff: float, max_entries: int) -> int:
+        """Borra entradas con created_at < cutoff y las más viejas por encima de max_entries."""
+
+    # --- Borradores de posts originales ---
+
+    @abstractmethod
+    def add_draft(self, topic: str, content: str, created_at: float) -> None:
+        """Añade un borrador listo para publicar."""
+
+    @abstractmethod
+    def pop_draft(self, topic: str, min_created_at: float) -> tuple[str, float] | None:
+        """Toma (y borra) de forma atómica el borrador más viejo no expirado del tema: (content, created_at)."""
+
+    @abstractmethod
+    def draft_counts(self, min_created_at: float) -> dict[str, int]:
+        """Borradores no expirados por tema."""
+
+    @abstractmethod
+    def prune_drafts(self, cutoff: float) -> int:
+        """Borra borradores con created_at < cutoff. Retorna cuántos borró."""
+
+    # --- Ciclo de vida ---
+
+    def stats(self) -> dict:
+        """Métricas del backend (ej: pool). Vacío si no aplica."""
+        return {}
+
+    def close(self) -> None:
+        """Libera conexiones/recursos."""
+
+
+class MemoryBackend(StorageBackend):
+    """Todo en dicts del proceso. Arranque instantáneo y cero I/O; se pierde al salir."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._handled: dict[str, float] = {}
+        self._state: dict[str, str] = {}
+        self._counters: dict[str, tuple[int, str]] = {}
+        self._upvotes: dict[str, int] = {}
+        self._following: dict[str, float] = {}
+        self._subscriptions: dict[str, float] = {}
+        self._claims: dict[str, tuple[str, float]] = {}
+        self._actions: dict[str, dict] = {}
+        self._llm_cache: dict[str, tuple[str | None, float]] = {}
+        self._drafts: list[tuple[str, str, float]] = []  # (topic, content, created_at)
+
+    def init_schema(self) -> None:
+        pass
+
+    def already_handled(self, post_id: str) -> bool:
+        with self._lock:
+            return post_id in self._handled
+
+    def filter_handled(self, post_ids: list[str]) -> set[str]:
+        with self._lock:
+            return {pid for pid in post_ids if pid in self._handled}
+
+    def iter_handled_ids(self, since: float | None = None) -> Iterator[str]:
+        with self._lock:
+            ids = [pid for pid, ts in self._handled.items() if since is None or ts >= since]
+        return iter(ids)
+
+    def mark_handled(self, post_id: str, handled_at: float) -> None:
+        with self._lock:
+            self._handled[post_id] = handled_at
+
+    def prune_handled(self, cutoff: float, batch_size: int) -> int:
+        with self._lock:
+            old = [pid for pid, ts in self._handled.items() if ts < cutoff][:batch_size]
+            for pid in old:
+                del self._handled[pid]
+        return len(old)
+
+    def get_state(self, key: str) -> str | None:
+        with self._lock:
+            return self._state.get(key)
+
+    def set_state(self, key: str, value: str) -> None:
+        with self._lock:
+            self._state[key] = value
+
+    def get_all_state(self) -> dict[str, str]:
+        with self._lock:
+            return dict(self._state)
+
+    def set_many_state(self, values: dict[str, str]) -> None:
+        with self._lock:
+            self._state.update(values)
+
+    def increment_counter(self, name: str, period: str) -> int:
+        with self._lock:
+            value, current = self._counters.get(name, (0, None))
+            value = value + 1 if current == period else 1
+            self._counters[name] = (value, period)
+            return value
+
+    def get_counter(self, name: str) -> tuple[int, str | None]:
+        with self._lock:
+            return self._counters.get(name, (0, None))
+
+    def get_upvote_count(self, agent_name: str) -> int:
+        with self._lock:
+            return self._upvotes.get(agent_name, 0)
+
+    def increment_upvote_count(self, agent_name: str) -> int:
+        with self._lock:
+            self._upvotes[agent_name] = self._upvotes.get(agent_name, 0) + 1
+            return self._upvotes[agent_name]
+
+    def is_following(self, agent_name: str) -> bool:
+        with self._lock:
+            return agent_name in self._following
+
+    def add_following(self, agent_names: list[str], followed_at: float) -> None:
+        with self._lock:
+            for name in agent_names:
+                self._following.setdefault(name, followed_at)
+
+    def get_subscriptions(self) -> list[str]:
+        with self._lock:
+            return sorted(self._subscriptions)
+
+    def add_subscriptions(self, submolt_names: list[str], subscribed_at: float) -> None:
+        with self._lock:
+            for name in submolt_names:
+                self._subscriptions.setdefault(name, subscribed_at)
+
+    def claim_post(self, post_id: str, worker_id: str, now: float, ttl: float) -> bool:
+        with self._lock:
+            owner, claimed_at = self._claims.get(post_id, (worker_id, 0.0))
+            if owner != worker_id and claimed_at >= now - ttl:
+                return False
+            self._claims[post_id] = (worker_id, now)
+            return True
+
+    def release_post(self, post_id: str, worker_id: str) -> None:
+        with self._lock:
+            if self._claims.get(post_id, ("",))[0] == worker_id:
+                del self._claims[post_id]
+
+    def prune_claims(self, cutoff: float) -> int:
+        with self._lock:
+            old = [pid for pid, (_, ts) in self._claims.items() if ts < cutoff]
+            for pid in old:
+                del self._claims[pid]
+        return len(old)
+
+    def reserve_post_budget(
+        self,
+        period: str,
+        now: float,
+        max_per_day: int,
+        min_interval: float,
+    ) -> tuple[bool, str]:
+        with self._lock:
+            count, current = self._counters.get("daily_count", (0, None))
+            last = self._state.get("last_post_time")
+            ok, reason = check_post_budget(count, current, last, period, now, max_per_day, min_interval)
+            if ok:
+                self._counters["daily_count"] = (count + 1 if current == period else 1, period)
+                self._state["last_post_time"] = str(now)
+            return ok, reason
+
+    def enqueue_action(self, action_key: str, kind: str, target: str, author: str | None, now: float) -> bool:
+        with self._lock:
+            if action_key in self._actions:
+                return False
+            self._actions[action_key] = {
+                "action_key": action_key,
+                "kind": kind,
+                "target": target,
+                "author": author,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "last_error": None,
+                "updated_at": now,
+            }
+            return True
+
+    def claim_actions(self, now: float, limit: int, lease: float) -> list[dict]:
+        with self._lock:
+            due = sorted(
+                (a for a in self._actions.values() if a["status"] == "pending" and a["next_attempt_at"] <= now),
+                key=lambda a: a["next_attempt_at"],
+            )[:limit]
+            for a in due:
+                a["attempts"] += 1
+                a["next_attempt_at"] = now + lease
+                a["updated_at"] = now
+            return [
+                {k: a[k] for k in ("action_key", "kind", "target", "author", "attempts")}
+                for a in due
+            ]
+
+    def finish_action(self, action_key: str, status: str, error: str | None, now: float) -> None:
+        with self._lock:
+            action = self._actions.get(action_key)
+            if action is not None:
+                action.update(status=status, last_error=error, updated_at=now)
+
+    def retry_action(self, action_key: str, next_attempt_at: float, error: str | None, now: float) -> None:
+        with self._lock:
+            action = self._actions.get(action_key)
+            if action is not None:
+                action.update(next_attempt_at=next_attempt_at, last_error=error, updated_at=now)
+
+    def prune_actions(self, cutoff: float) -> int:
+        with self._lock:
+            old = [
+                key for key, a in self._actions.items()
+                if a["status"] in ("done", "failed") and a["updated_at"] < cutoff
+            ]
+            for key in old:
+                del self._actions[key]
+        return len(old)
+
+    def action_counts(self) -> dict[str, int]:
+        with self._lock:
+            counts: dict[str, int] = {}
+            for a in self._actions.values():
+                counts[a["status"]] = counts.get(a["status"], 0) + 1
+            return counts
+
+    def get_llm_response(self, cache_key: str, min_created_at: float) -> tuple[bool, str | None]:
+        with self._lock:
+            entry = self._llm_cache.get(cache_key)
+        if entry is None or entry[1] < min_created_at:
+            return False, None
+        return True, entry[0]
+
+    def put_llm_response(self, cache_key: str, response: str | None, now: float) -> None:
+        with self._lock:
+            self._llm_cache.pop(cache_key, None)
+            self._llm_cache[cache_key] = (response, now)
+
+    def prune_llm_cache(self, cutoff: float, max_entries: int) -> int:
+        with self._lock:
+            # dict en orden de inserción = orden de created_at
+            old = [key for key, (_, created_at) in self._llm_cache.items() if created_at < cutoff]
+            for key in old:
+                del self._llm_cache[key]
+            excess = list(self._llm_cache)[: max(len(self._llm_cache) - max_entries, 0)]
+            for key in excess:
+                del self._llm_cache[key]
+        return len(old) + len(excess)
+
+    def add_draft(self, topic: str, content: str, created_at: float) -> None:
+        with self._lock:
+            self._drafts.append((topic, content, created_at))
+
+    def pop_draft(self, topic: str, min_created_at: float) -> tuple[str, float] | None:
+        with self._lock:
+            candidates = [d for d in self._drafts if d[0] == topic and d[2] >= min_created_at]
+            if not candidates:
+                return None
+            draft = min(candidates, key=lambda d: d[2])
+            self._drafts.remove(draft)
+            return draft[1], draft[2]
+
+    def draft_counts(self, min_created_at: float) -> dict[str, int]:
+        with self._lock:
+            counts: dict[str, int] = {}
+            for topic, _, created_at in self._drafts:
+                if created_at >= min_created_at:
+                    counts[topic] = counts.get(topic, 0) + 1
+            return counts
+
+    def prune_drafts(self, cutoff: float) -> int:
+        with self._lock:
+            before = len(self._drafts)
+            self._drafts = [d for d in self._drafts if d[2] >= cutoff]
+            return before - len(self._drafts)
+
+
+def check_post_budget(
+    count: int,
+    count_period: str | None,
+    last_post_time: str | float | None,
+    period: str,
+    now: float,
+    max_per_day: int,
+    min_interval: float,
+) -> tuple[bool, str]:
+    """Regla del presupuesto (también la de can_post_now): el contador de otro día vale 0; luego cupo y cooldown."""
+    if count_period != period:
+        count = 0
+    if count >= max_per_day:
+        return False, f"Daily cap reached ({max_per_day})"
+    if last_post_time:
+        elapsed = now - float(last_post_time)
+        if elapsed < min_interval:
+            return False, f"Cooldown: {int(min_interval - elapsed)}s remaining"
+    return True, "ok"
+
+
+def create_backend(url: str) -> StorageBackend:
+    """Instancia el backend según el esquema de la URL."""
+    scheme = urlparse(url).scheme.lower()
+    if scheme in ("postgres", "postgresql"):
+        from storage_postgres import PostgresBackend
+
+        return PostgresBackend(url)
+    if scheme == "sqlite":
+        from storage_sqlite import SQLiteBackend
+
+        return SQLiteBackend(sqlite_path_from_url(url))
+    if scheme == "memory":
+        return MemoryBackend()
+    raise ValueError(
+        f"Esquema de DATABASE_URL no soportado: {scheme!r} "
+        "(usa postgresql://, sqlite:///ruta.db o memory://)"
+    )
+
+
+def sqlite_path_from_url(url: str) -> str:
+    """sqlite:///data/bot.db → data/bot.db; sqlite:////abs/bot.db → /abs/bot.db; sqlite:// → :memory:."""
+    path = url.split("://", 1)[1]
+    if path.startswith("/"):
+        path = path[1:]
+    return path or ":memory:"
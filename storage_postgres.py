@@ -0,0 +1,727 @@
+"""
+LogosDaemon - Backend PostgreSQL (Railway).
+Conexiones desde un pool de proceso (no un handshake por consulta).
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from psycopg2.extras import execute_values
+
+from config import (
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_HEALTHCHECK_SECONDS,
+)
+from storage import StorageBackend, check_post_budget
+
+logger = logging.getLogger(__name__)
+
+# Clave del advisory lock que serializa el presupuesto de posts entre workers
+POST_BUDGET_LOCK_KEY = 0x4C6F676F73  # "Logos"
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No hubo conexión libre en el pool dentro del timeout."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe sobre ThreadedConnectionPool.
+    - Bloquea (hasta timeout) cuando están todas en uso, en vez de fallar.
+    - Health check: descarta conexiones cerradas y hace ping a las ociosas.
+    - Conexiones rotas (failover, reinicio de Postgres) se descartan y se reabren.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int,
+        max_size: int,
+        timeout: float,
+        healthcheck_after: float,
+    ) -> None:
+        max_size = max(max_size, 1)
+        min_size = min(max(min_size, 0), max_size)
+        self._dsn = dsn
+        self._timeout = timeout
+        self._healthcheck_after = healthcheck_after
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._last_used: dict[int, float] = {}
+        self._stats = {
+            "checkouts": 0,
+            "connections_opened": 0,
+            "connections_discarded": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+        self._pool = pg_pool.ThreadedConnectionPool(min_size, max_size, dsn)
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        idle = time.monotonic() - self._last_used.get(id(conn), 0.0)
+        if idle < self._healthcheck_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        """Saca una conexión sana del pool (bloquea hasta timeout si está lleno)."""
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self._timeout):
+            raise PoolTimeout(f"Pool agotado tras {self._timeout:.0f}s")
+        try:
+            while True:
+                conn = self._pool.getconn()
+                with self._lock:
+                    is_new = id(conn) not in self._last_used
+                    if is_new:
+                        self._stats["connections_opened"] += 1
+                        self._last_used[id(conn)] = time.monotonic()
+                if is_new or self._is_healthy(conn):
+                    break
+                logger.warning("DB pool: descartando conexión muerta")
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+        waited = time.monotonic() - start
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+        return conn
+
+    def putconn(self, conn, broken: bool = False) -> None:
+        """Devuelve la conexión al pool. broken=True la cierra (se reabre otra al pedirla)."""
+        try:
+            if broken or conn.closed:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._last_used[id(conn)] = time.monotonic()
+                self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn) -> None:
+        with self._lock:
+            self._last_used.pop(id(conn), None)
+            self._stats["connections_discarded"] += 1
+        try:
+            self._pool.putconn(conn, close=True)
+        except pg_pool.PoolError:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["handshakes_avoided"] = max(stats["checkouts"] - stats["connections_opened"], 0)
+        stats["avg_wait_ms"] = (
+            stats["wait_seconds"] / stats["checkouts"] * 1000 if stats["checkouts"] else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        self._pool.closeall()
+
+
+class PostgresBackend(StorageBackend):
+    """Memoria del bot en PostgreSQL."""
+
+    name = "postgres"
+
+    def __init__(self, url: str) -> None:
+        # Railway suele dar postgres://, psycopg2 prefiere postgresql://
+        if url.startswith("postgres://"):
+            url = url.replace("postgres://", "postgresql://", 1)
+        self._pool = ConnectionPool(
+            url,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            timeout=DB_POOL_TIMEOUT_SECONDS,
+            healthcheck_after=DB_POOL_HEALTHCHECK_SECONDS,
+        )
+
+    @contextmanager
+    def _connection(self) -> Iterator:
+        """
+        Conexión del pool como context manager.
+        Commit al salir sin error; rollback si hay excepción.
+        Errores de conexión (OperationalError/InterfaceError) descartan la conexión.
+        """
+        conn = self._pool.getconn()
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except BaseException as e:
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            self._pool.putconn(conn, broken=broken)
+
+    def stats(self) -> dict:
+        """Métricas del pool: checkouts, handshakes evitados, tiempo de espera."""
+        return self._pool.stats()
+
+    def close(self) -> None:
+        self._pool.close()
+
+    # --- Esquema ---
+
+    def init_schema(self) -> None:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS handled_posts (
+                        post_id TEXT PRIMARY KEY,
+                        handled_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS handled_posts_handled_at_idx
+                    ON handled_posts (handled_at)
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS bot_state (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        updated_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS bot_counters (
+                        name TEXT PRIMARY KEY,
+                        value BIGINT NOT NULL,
+                        period DATE NOT NULL,
+                        updated_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS agent_upvotes (
+                        agent_name TEXT PRIMARY KEY,
+                        upvotes BIGINT NOT NULL,
+                        updated_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS followed_agents (
+                        agent_name TEXT PRIMARY KEY,
+                        followed_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS subscriptions (
+                        submolt TEXT PRIMARY KEY,
+                        subscribed_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS post_claims (
+                        post_id TEXT PRIMARY KEY,
+                        worker_id TEXT NOT NULL,
+                        claimed_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS action_outbox (
+                        action_key TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        target TEXT NOT NULL,
+                        author TEXT,
+                        status TEXT NOT NULL,
+                        attempts INTEGER NOT NULL,
+                        next_attempt_at DOUBLE PRECISION NOT NULL,
+                        last_error TEXT,
+                        created_at DOUBLE PRECISION NOT NULL,
+                        updated_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS action_outbox_due_idx
+                    ON action_outbox (status, next_attempt_at)
+                """)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        response TEXT,
+                        created_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("CREATE INDEX IF NOT EXISTS llm_cache_created_idx ON llm_cache (created_at)")
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS post_drafts (
+                        draft_id BIGSERIAL PRIMARY KEY,
+                        topic TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        created_at DOUBLE PRECISION NOT NULL
+                    )
+                """)
+                cur.execute("CREATE INDEX IF NOT EXISTS post_drafts_topic_idx ON post_drafts (topic, created_at)")
+                self._migrate_counters(cur)
+                self._migrate_relationships(cur)
+        except psycopg2.Error as e:
+            logger.error("init_schema error: %s", e)
+            raise
+
+    @staticmethod
+    def _migrate_counters(cur) -> None:
+        """Mueve daily_count y upvote_count:<name> de bot_state a sus tablas tipadas (idempotente)."""
+        # Sin daily_count_date el contador se migra como de hoy: borrarlo lo perdería
+        cur.execute("""
+            INSERT INTO bot_counters (name, value, period, updated_at)
+            SELECT 'daily_count', c.value::BIGINT, COALESCE(d.value::DATE, CURRENT_DATE), c.updated_at
+            FROM bot_state c
+            LEFT JOIN bot_state d ON d.key = 'daily_count_date'
+            WHERE c.key = 'daily_count' AND c.value ~ '^[0-9]+$'
+            ON CONFLICT (name) DO NOTHING
+        """)
+        cur.execute("DELETE FROM bot_state WHERE key IN ('daily_count', 'daily_count_date')")
+        cur.execute("""
+            INSERT INTO agent_upvotes (agent_name, upvotes, updated_at)
+            SELECT substr(key, length('upvote_count:') + 1), value::BIGINT, updated_at
+            FROM bot_state
+            WHERE key LIKE 'upvote_count:%' AND value ~ '^[0-9]+$'
+            ON CONFLICT (agent_name) DO NOTHING
+        """)
+        cur.execute("DELETE FROM bot_state WHERE key LIKE 'upvote_count:%'")
+
+    @staticmethod
+    def _migrate_relationships(cur) -> None:
+        """Mueve las listas CSV followed_agents/subscribed_submolts de bot_state a sus tablas (idempotente)."""
+        for state_key, table, column, ts_column in (
+            ("followed_agents", "followed_agents", "agent_name", "followed_at"),
+            ("subscribed_submolts", "subscriptions", "submolt", "subscribed_at"),
+        ):
+            cur.execute(f"""
+                INSERT INTO {table} ({column}, {ts_column})
+                SELECT DISTINCT trim(item), s.updated_at
+                FROM bot_state s, unnest(string_to_array(s.value, ',')) AS item
+                WHERE s.key = %s AND trim(item) <> ''
+                ON CONFLICT ({column}) DO NOTHING
+            """, (state_key,))
+            cur.execute("DELETE FROM bot_state WHERE key = %s", (state_key,))
+
+    # --- Posts respondidos ---
+
+    def already_handled(self, post_id: str) -> bool:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT 1 FROM handled_posts WHERE post_id = %s",
+                (post_id,),
+            )
+            return cur.fetchone() is not None
+
+    def filter_handled(self, post_ids: list[str]) -> set[str]:
+        if not post_ids:
+            return set()
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT post_id FROM handled_posts WHERE post_id = ANY(%s)",
+                (list(post_ids),),
+            )
+            return {row[0] for row in cur.fetchall()}
+
+    def iter_handled_ids(self, since: float | None = None) -> Iterator[str]:
+        if since is not None:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute(
+                    "SELECT post_id FROM handled_posts WHERE handled_at >= %s",
+                    (since,),
+                )
+                return iter([row[0] for row in cur.fetchall()])
+        with self._connection() as conn, conn.cursor(name="handled_ids_scan") as cur:
+            cur.itersize = 10000
+            cur.execute("SELECT post_id FROM handled_posts")
+            return iter([row[0] for row in cur])
+
+    def mark_handled(self, post_id: str, handled_at: float) -> None:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO handled_posts (post_id, handled_at)
+                    VALUES (%s, %s)
+                    ON CONFLICT (post_id) DO UPDATE SET handled_at = EXCLUDED.handled_at
+                """, (post_id, handled_at))
+        except psycopg2.Error as e:
+            logger.error("mark_handled error: %s", e)
+            raise
+
+    def prune_handled(self, cutoff: float, batch_size: int) -> int:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                    DELETE FROM handled_posts
+                    WHERE post_id IN (
+                        SELECT post_id FROM handled_posts
+                        WHERE handled_at < %s
+                        LIMIT %s
+                    )
+                """, (cutoff, batch_size))
+                return cur.rowcount
+        except psycopg2.Error as e:
+            logger.error("prune_handled error: %s", e)
+            raise
+
+    # --- bot_state ---
+
+    def get_state(self, key: str) -> str | None:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT value FROM bot_state WHERE key = %s",
+                (key,),
+            )
+            row = cur.fetchone()
+            return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        self.set_many_state({key: value})
+
+    def get_all_state(self) -> dict[str, str]:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT key, value FROM bot_state")
+            return dict(cur.fetchall())
+
+    def set_many_state(self, values: dict[str, str]) -> None:
+        if not values:
+            return
+        now = time.time()
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO bot_state (key, value, updated_at)
+                    VALUES %s
+                    ON CONFLICT (key) DO UPDATE SET
+                        value = EXCLUDED.value,
+                        updated_at = EXCLUDED.updated_at
+                """, [(k, v, now) for k, v in values.items()])
+        except psycopg2.Error as e:
+            logger.error("set_state error: %s", e)
+            raise
+
+    # --- Contadores ---
+
+    def increment_counter(self, name: str, period: str) -> int:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO bot_counters (name, value, period, updated_at)
+                    VALUES (%s, 1, %s, %s)
+                    ON CONFLICT (name) DO UPDATE SET
+                        value = CASE
+                            WHEN bot_counters.period = EXCLUDED.period THEN bot_counters.value + 1
+                            ELSE 1
+                        END,
+                        period = EXCLUDED.period,
+                        updated_at = EXCLUDED.updated_at
+                    RETURNING value
+                """, (name, period, time.time()))
+                return cur.fetchone()[0]
+        except psycopg2.Error as e:
+            logger.error("increment_counter error: %s", e)
+            raise
+
+    def get_counter(self, name: str) -> tuple[int, str | None]:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT value, period FROM bot_counters WHERE name = %s",
+                (name,),
+            )
+            row = cur.fetchone()
+        if not row:
+            return 0, None
+        return row[0], row[1].isoformat()
+
+    def get_upvote_count(self, agent_name: str) -> int:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT upvotes FROM agent_upvotes WHERE agent_name = %s",
+                (agent_name,),
+            )
+            row = cur.fetchone()
+        return row[0] if row else 0
+
+    def increment_upvote_count(self, agent_name: str) -> int:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO agent_upvotes (agent_name, upvotes, updated_at)
+                    VALUES (%s, 1, %s)
+                    ON CONFLICT (agent_name) DO UPDATE SET
+                        upvotes = agent_upvotes.upvotes + 1,
+                        updated_at = EXCLUDED.updated_at
+                    RETURNING upvotes
+                """, (agent_name, time.time()))
+                return cur.fetchone()[0]
+        except psycopg2.Error as e:
+            logger.error("increment_upvote_count error: %s", e)
+            raise
+
+    # --- Follows y suscripciones ---
+
+    def is_following(self, agent_name: str) -> bool:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT 1 FROM followed_agents WHERE agent_name = %s",
+                (agent_name,),
+            )
+            return cur.fetchone() is not None
+
+    def add_following(self, agent_names: list[str], followed_at: float) -> None:
+        if not agent_names:
+            return
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO followed_agents (agent_name, followed_at)
+                    VALUES %s
+                    ON CONFLICT (agent_name) DO NOTHING
+                """, [(name, followed_at) for name in agent_names])
+        except psycopg2.Error as e:
+            logger.error("mark_following error: %s", e)
+            raise
+
+    def get_subscriptions(self) -> list[str]:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT submolt FROM subscriptions ORDER BY submolt")
+            return [row[0] for row in cur.fetchall()]
+
+    def add_subscriptions(self, submolt_names: list[str], subscribed_at: float) -> None:
+        if not submolt_names:
+            return
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO subscriptions (submolt, subscribed_at)
+                    VALUES %s
+                    ON CONFLICT (submolt) DO NOTHING
+                """, [(name, subscribed_at) for name in submolt_names])
+        except psycopg2.Error as e:
+            logger.error("mark_subscribed error: %s", e)
+            raise
+
+    # --- Coordinación entre workers ---
+
+    def claim_post(self, post_id: str, worker_id: str, now: float, ttl: float) -> bool:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO post_claims (post_id, worker_id, claimed_at)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (post_id) DO UPDATE SET
+                        worker_id = EXCLUDED.worker_id,
+                        claimed_at = EXCLUDED.claimed_at
+                    WHERE post_claims.worker_id = EXCLUDED.worker_id
+                        OR post_claims.claimed_at < %s
+                    RETURNING post_id
+                """, (post_id, worker_id, now, now - ttl))
+                return cur.fetchone() is not None
+        except psycopg2.Error as e:
+            logger.error("claim_post error: %s", e)
+            raise
+
+    def release_post(self, post_id: str, worker_id: str) -> None:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM post_claims WHERE post_id = %s AND worker_id = %s",
+                (post_id, worker_id),
+            )
+
+    def prune_claims(self, cutoff: float) -> int:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM post_claims WHERE claimed_at < %s", (cutoff,))
+            return cur.rowcount
+
+    def reserve_post_budget(
+        self,
+        period: str,
+        now: float,
+        max_per_day: int,
+        min_interval: float,
+    ) -> tuple[bool, str]:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                # Sección crítica entre workers; se libera con el commit/rollback
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (POST_BUDGET_LOCK_KEY,))
+                cur.execute("SELECT value, period FROM bot_counters WHERE name = 'daily_count'")
+                row = cur.fetchone()
+                count, current = (row[0], row[1].isoformat()) if row else (0, None)
+                cur.execute("SELECT value FROM bot_state WHERE key = 'last_post_time'")
+                row = cur.fetchone()
+                ok, reason = check_post_budget(
+                    count, current, row[0] if row else None, period, now, max_per_day, min_interval
+                )
+                if not ok:
+                    return ok, reason
+                cur.execute("""
+                    INSERT INTO bot_counters (name, value, period, updated_at)
+                    VALUES ('daily_count', 1, %s, %s)
+                    ON CONFLICT (name) DO UPDATE SET
+                        value = CASE
+                            WHEN bot_counters.period = EXCLUDED.period THEN bot_counters.value + 1
+                            ELSE 1
+                        END,
+                        period = EXCLUDED.period,
+                        updated_at = EXCLUDED.updated_at
+                """, (period, now))
+                cur.execute("""
+                    INSERT INTO bot_state (key, value, updated_at)
+                    VALUES ('last_post_time', %s, %s)
+                    ON CONFLICT (key) DO UPDATE SET
+                        value = EXCLUDED.value,
+                        updated_at = EXCLUDED.updated_at
+                """, (str(now), now))
+                return ok, reason
+        except psycopg2.Error as e:
+            logger.error("reserve_post_budget error: %s", e)
+            raise
+
+    # --- Outbox de acciones ---
+
+    def enqueue_action(self, action_key: str, kind: str, target: str, author: str | None, now: float) -> bool:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO action_outbox
+                    (action_key, kind, target, author, status, attempts, next_attempt_at, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, 'pending', 0, %s, %s, %s)
+                ON CONFLICT (action_key) DO NOTHING
+            """, (action_key, kind, target, author, now, now, now))
+            return cur.rowcount > 0
+
+    def claim_actions(self, now: float, limit: int, lease: float) -> list[dict]:
+        try:
+            with self._connection() as conn, conn.cursor() as cur:
+                # SKIP LOCKED: varios workers drenan el outbox sin pisarse
+                cur.execute("""
+                    UPDATE action_outbox
+                    SET attempts = attempts + 1, next_attempt_at = %s, updated_at = %s
+                    WHERE action_key IN (
+                        SELECT action_key FROM action_outbox
+                        WHERE status = 'pending' AND next_attempt_at <= %s
+                        ORDER BY next_attempt_at
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING action_key, kind, target, author, attempts
+                """, (now + lease, now, now, limit))
+                return [
+                    {"action_key": key, "kind": kind, "target": target, "author": author, "attempts": attempts}
+                    for key, kind, target, author, attempts in cur.fetchall()
+                ]
+        except psycopg2.Error as e:
+            logger.error("claim_actions error: %s", e)
+            raise
+
+    def finish_action(self, action_key: str, status: str, error: str | None, now: float) -> None:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "UPDATE action_outbox SET status = %s, last_error = %s, updated_at = %s WHERE action_key = %s",
+                (status, error, now, action_key),
+            )
+
+    def retry_action(self, action_key: str, next_attempt_at: float, error: str | None, now: float) -> None:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "UPDATE action_outbox SET next_attempt_at = %s, last_error = %s, updated_at = %s "
+                "WHERE action_key = %s",
+                (next_attempt_at, error, now, action_key),
+            )
+
+    def prune_actions(self, cutoff: float) -> int:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM action_outbox WHERE status IN ('done', 'failed') AND updated_at < %s",
+                (cutoff,),
+            )
+            return cur.rowcount
+
+    def action_counts(self) -> dict[str, int]:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT status, COUNT(*) FROM action_outbox GROUP BY status")
+            return dict(cur.fetchall())
+
+    # --- Caché de respuestas del LLM ---
+
+    def get_llm_response(self, cache_key: str, min_created_at: float) -> tuple[bool, str | None]:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT response FROM llm_cache WHERE cache_key = %s AND created_at >= %s",
+                (cache_key, min_created_at),
+            )
+            row = cur.fetchone()
+        return (True, row[0]) if row else (False, None)
+
+    def put_llm_response(self, cache_key: str, response: str | None, now: float) -> None:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO llm_cache (cache_key, response, created_at) VALUES (%s, %s, %s)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    response = EXCLUDED.response,
+                    created_at = EXCLUDED.created_at
+            """, (cache_key, response, now))
+
+    def prune_llm_cache(self, cutoff: float, max_entries: int) -> int:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM llm_cache WHERE created_at < %s", (cutoff,))
+            deleted = cur.rowcount
+            cur.execute("""
+                DELETE FROM llm_cache WHERE cache_key IN (
+                    SELECT cache_key FROM llm_cache ORDER BY created_at DESC OFFSET %s
+                )
+            """, (max_entries,))
+            return deleted + cur.rowcount
+
+    # --- Borradores de posts originales ---
+
+    def add_draft(self, topic: str, content: str, created_at: float) -> None:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO post_drafts (topic, content, created_at) VALUES (%s, %s, %s)",
+                (topic, content, created_at),
+            )
+
+    def pop_draft(self, topic: str, min_created_at: float) -> tuple[str, float] | None:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                DELETE FROM post_drafts WHERE draft_id = (
+                    SELECT draft_id FROM post_drafts
+                    WHERE topic = %s AND created_at >= %s
+                    ORDER BY created_at
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING content, created_at
+            """, (topic, min_created_at))
+            row = cur.fetchone()
+        return (row[0], row[1]) if row else None
+
+    def draft_counts(self, min_created_at: float) -> dict[str, int]:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                "SELECT topic, COUNT(*) FROM post_drafts WHERE created_at >= %s GROUP BY topic",
+                (min_created_at,),
+            )
+            return dict(cur.fetchall())
+
+    def prune_drafts(self, cutoff: float) -> int:
+        with self._connection() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM post_drafts WHERE created_at < %s", (cutoff,))
+            return cur.rowcount
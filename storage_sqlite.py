@@ -0,0 +1,464 @@
+"""
+LogosDaemon - Backend SQLite embebido (modo WAL).
+Sin servidor: runs locales, tests y benchmarks sin red.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from storage import StorageBackend, check_post_budget
+
+logger = logging.getLogger(__name__)
+
+# Límite conservador de parámetros por statement (SQLITE_MAX_VARIABLE_NUMBER antiguo = 999)
+_MAX_PARAMS = 900
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Memoria del bot en un archivo SQLite.
+    Una conexión compartida con lock: SQLite serializa escrituras de todos modos,
+    y WAL deja a otros procesos leer mientras escribimos.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE ... COMMIT (rollback si hay excepción)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _query(self, sql: str, params: tuple | list = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- Esquema ---
+
+    def init_schema(self) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS handled_posts (
+                        post_id TEXT PRIMARY KEY,
+                        handled_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS handled_posts_handled_at_idx
+                    ON handled_posts (handled_at)
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS bot_state (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS bot_counters (
+                        name TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL,
+                        period TEXT NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS agent_upvotes (
+                        agent_name TEXT PRIMARY KEY,
+                        upvotes INTEGER NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS followed_agents (
+                        agent_name TEXT PRIMARY KEY,
+                        followed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS subscriptions (
+                        submolt TEXT PRIMARY KEY,
+                        subscribed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS post_claims (
+                        post_id TEXT PRIMARY KEY,
+                        worker_id TEXT NOT NULL,
+                        claimed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS action_outbox (
+                        action_key TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        target TEXT NOT NULL,
+                        author TEXT,
+                        status TEXT NOT NULL,
+                        attempts INTEGER NOT NULL,
+                        next_attempt_at REAL NOT NULL,
+                        last_error TEXT,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS action_outbox_due_idx
+                    ON action_outbox (status, next_attempt_at)
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        response TEXT,
+                        created_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_created_idx ON llm_cache (created_at)")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS post_drafts (
+                        draft_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        topic TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS post_drafts_topic_idx ON post_drafts (topic, created_at)")
+        except sqlite3.Error as e:
+            logger.error("init_schema error: %s", e)
+            raise
+
+    # --- Posts respondidos ---
+
+    def already_handled(self, post_id: str) -> bool:
+        return bool(self._query("SELECT 1 FROM handled_posts WHERE post_id = ?", (post_id,)))
+
+    def filter_handled(self, post_ids: list[str]) -> set[str]:
+        ids = list(post_ids)
+        handled: set[str] = set()
+        for i in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[i:i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._query(
+                f"SELECT post_id FROM handled_posts WHERE post_id IN ({placeholders})",
+                chunk,
+            )
+            handled.update(row[0] for row in rows)
+        return handled
+
+    def iter_handled_ids(self, since: float | None = None) -> Iterator[str]:
+        if since is None:
+            rows = self._query("SELECT post_id FROM handled_posts")
+        else:
+            rows = self._query("SELECT post_id FROM handled_posts WHERE handled_at >= ?", (since,))
+        return iter([row[0] for row in rows])
+
+    def mark_handled(self, post_id: str, handled_at: float) -> None:
+        with self._transaction() as conn:
+            conn.execute("""
+                INSERT INTO handled_posts (post_id, handled_at)
+                VALUES (?, ?)
+                ON CONFLICT (post_id) DO UPDATE SET handled_at = excluded.handled_at
+            """, (post_id, handled_at))
+
+    def prune_handled(self, cutoff: float, batch_size: int) -> int:
+        with self._transaction() as conn:
+            cur = conn.execute("""
+                DELETE FROM handled_posts
+                WHERE post_id IN (
+                    SELECT post_id FROM handled_posts
+                    WHERE handled_at < ?
+                    LIMIT ?
+                )
+            """, (cutoff, batch_size))
+            return cur.rowcount
+
+    # --- bot_state ---
+
+    def get_state(self, key: str) -> str | None:
+        rows = self._query("SELECT value FROM bot_state WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_state(self, key: str, value: str) -> None:
+        self.set_many_state({key: value})
+
+    def get_all_state(self) -> dict[str, str]:
+        return dict(self._query("SELECT key, value FROM bot_state"))
+
+    def set_many_state(self, values: dict[str, str]) -> None:
+        if not values:
+            return
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany("""
+                INSERT INTO bot_state (key, value, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = excluded.value,
+                    updated_at = excluded.updated_at
+            """, [(k, v, now) for k, v in values.items()])
+
+    # --- Contadores ---
+
+    def increment_counter(self, name: str, period: str) -> int:
+        with self._transaction() as conn:
+            conn.execute("""
+                INSERT INTO bot_counters (name, value, period, updated_at)
+                VALUES (?, 1, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    value = CASE
+                        WHEN bot_counters.period = excluded.period THEN bot_counters.value + 1
+                        ELSE 1
+                    END,
+                    period = excluded.period,
+                    updated_at = excluded.updated_at
+            """, (name, period, time.time()))
+            return conn.execute("SELECT value FROM bot_counters WHERE name = ?", (name,)).fetchone()[0]
+
+    def get_counter(self, name: str) -> tuple[int, str | None]:
+        rows = self._query("SELECT value, period FROM bot_counters WHERE name = ?", (name,))
+        return (rows[0][0], rows[0][1]) if rows else (0, None)
+
+    def get_upvote_count(self, agent_name: str) -> int:
+        rows = self._query("SELECT upvotes FROM agent_upvotes WHERE agent_name = ?", (agent_name,))
+        return rows[0][0] if rows else 0
+
+    def increment_upvote_count(self, agent_name: str) -> int:
+        with self._transaction() as conn:
+            conn.execute("""
+                INSERT INTO agent_upvotes (agent_name, upvotes, updated_at)
+                VALUES (?, 1, ?)
+                ON CONFLICT (agent_name) DO UPDATE SET
+                    upvotes = agent_upvotes.upvotes + 1,
+                    updated_at = excluded.updated_at
+            """, (agent_name, time.time()))
+            return conn.execute(
+                "SELECT upvotes FROM agent_upvotes WHERE agent_name = ?", (agent_name,)
+            ).fetchone()[0]
+
+    # --- Follows y suscripciones ---
+
+    def is_following(self, agent_name: str) -> bool:
+        return bool(self._query("SELECT 1 FROM followed_agents WHERE agent_name = ?", (agent_name,)))
+
+    def add_following(self, agent_names: list[str], followed_at: float) -> None:
+        if not agent_names:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO followed_agents (agent_name, followed_at) VALUES (?, ?) "
+                "ON CONFLICT (agent_name) DO NOTHING",
+                [(name, followed_at) for name in agent_names],
+            )
+
+    def get_subscriptions(self) -> list[str]:
+        return [row[0] for row in self._query("SELECT submolt FROM subscriptions ORDER BY submolt")]
+
+    def add_subscriptions(self, submolt_names: list[str], subscribed_at: float) -> None:
+        if not submolt_names:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO subscriptions (submolt, subscribed_at) VALUES (?, ?) "
+                "ON CONFLICT (submolt) DO NOTHING",
+                [(name, subscribed_at) for name in submolt_names],
+            )
+
+    # --- Coordinación entre workers (BEGIN IMMEDIATE serializa entre procesos) ---
+
+    def claim_post(self, post_id: str, worker_id: str, now: float, ttl: float) -> bool:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT worker_id, claimed_at FROM post_claims WHERE post_id = ?", (post_id,)
+            ).fetchone()
+            if row and row[0] != worker_id and row[1] >= now - ttl:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO post_claims (post_id, worker_id, claimed_at) VALUES (?, ?, ?)",
+                (post_id, worker_id, now),
+            )
+            return True
+
+    def release_post(self, post_id: str, worker_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM post_claims WHERE post_id = ? AND worker_id = ?",
+                (post_id, worker_id),
+            )
+
+    def prune_claims(self, cutoff: float) -> int:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM post_claims WHERE claimed_at < ?", (cutoff,)).rowcount
+
+    def reserve_post_budget(
+        self,
+        period: str,
+        now: float,
+        max_per_day: int,
+        min_interval: float,
+    ) -> tuple[bool, str]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT value, period FROM bot_counters WHERE name = 'daily_count'"
+            ).fetchone()
+            count, current = (row[0], row[1]) if row else (0, None)
+            row = conn.execute("SELECT value FROM bot_state WHERE key = 'last_post_time'").fetchone()
+            ok, reason = check_post_budget(
+                count, current, row[0] if row else None, period, now, max_per_day, min_interval
+            )
+            if not ok:
+                return ok, reason
+            conn.execute("""
+                INSERT INTO bot_counters (name, value, period, updated_at)
+                VALUES ('daily_count', 1, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    value = CASE
+                        WHEN bot_counters.period = excluded.period THEN bot_counters.value + 1
+                        ELSE 1
+                    END,
+                    period = excluded.period,
+                    updated_at = excluded.updated_at
+            """, (period, now))
+            conn.execute("""
+                INSERT INTO bot_state (key, value, updated_at)
+                VALUES ('last_post_time', ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = excluded.value,
+                    updated_at = excluded.updated_at
+            """, (str(now), now))
+            return ok, reason
+
+    # --- Outbox de acciones ---
+
+    def enqueue_action(self, action_key: str, kind: str, target: str, author: str | None, now: float) -> bool:
+        with self._transaction() as conn:
+            cur = conn.execute("""
+                INSERT INTO action_outbox
+                    (action_key, kind, target, author, status, attempts, next_attempt_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'pending', 0, ?, ?, ?)
+                ON CONFLICT (action_key) DO NOTHING
+            """, (action_key, kind, target, author, now, now, now))
+            return cur.rowcount > 0
+
+    def claim_actions(self, now: float, limit: int, lease: float) -> list[dict]:
+        with self._transaction() as conn:
+            rows = conn.execute("""
+                SELECT action_key, kind, target, author, attempts FROM action_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+            """, (now, limit)).fetchall()
+            conn.executemany("""
+                UPDATE action_outbox
+                SET attempts = attempts + 1, next_attempt_at = ?, updated_at = ?
+                WHERE action_key = ?
+            """, [(now + lease, now, row[0]) for row in rows])
+        return [
+            {"action_key": key, "kind": kind, "target": target, "author": author, "attempts": attempts + 1}
+            for key, kind, target, author, attempts in rows
+        ]
+
+    def finish_action(self, action_key: str, status: str, error: str | None, now: float) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE action_outbox SET status = ?, last_error = ?, updated_at = ? WHERE action_key = ?",
+                (status, error, now, action_key),
+            )
+
+    def retry_action(self, action_key: str, next_attempt_at: float, error: str | None, now: float) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE action_outbox SET next_attempt_at = ?, last_error = ?, updated_at = ? "
+                "WHERE action_key = ?",
+                (next_attempt_at, error, now, action_key),
+            )
+
+    def prune_actions(self, cutoff: float) -> int:
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM action_outbox WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (cutoff,),
+            ).rowcount
+
+    def action_counts(self) -> dict[str, int]:
+        return dict(self._query("SELECT status, COUNT(*) FROM action_outbox GROUP BY status"))
+
+    # --- Caché de respuestas del LLM ---
+
+    def get_llm_response(self, cache_key: str, min_created_at: float) -> tuple[bool, str | None]:
+        rows = self._query(
+            "SELECT response FROM llm_cache WHERE cache_key = ? AND created_at >= ?",
+            (cache_key, min_created_at),
+        )
+        return (True, rows[0][0]) if rows else (False, None)
+
+    def put_llm_response(self, cache_key: str, response: str | None, now: float) -> None:
+        with self._transaction() as conn:
+            conn.execute("""
+                INSERT INTO llm_cache (cache_key, response, created_at) VALUES (?, ?, ?)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    response = excluded.response,
+                    created_at = excluded.created_at
+            """, (cache_key, response, now))
+
+    def prune_llm_cache(self, cutoff: float, max_entries: int) -> int:
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,)).rowcount
+            deleted += conn.execute("""
+                DELETE FROM llm_cache WHERE cache_key IN (
+                    SELECT cache_key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (max_entries,)).rowcount
+            return deleted
+
+    # --- Borradores de posts originales ---
+
+    def add_draft(self, topic: str, content: str, created_at: float) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO post_drafts (topic, content, created_at) VALUES (?, ?, ?)",
+                (topic, content, created_at),
+            )
+
+    def pop_draft(self, topic: str, min_created_at: float) -> tuple[str, float] | None:
+        with self._transaction() as conn:
+            row = conn.execute("""
+                SELECT draft_id, content, created_at FROM post_drafts
+                WHERE topic = ? AND created_at >= ?
+                ORDER BY created_at LIMIT 1
+            """, (topic, min_created_at)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM post_drafts WHERE draft_id = ?", (row[0],))
+            return row[1], row[2]
+
+    def draft_counts(self, min_created_at: float) -> dict[str, int]:
+        return dict(self._query(
+            "SELECT topic, COUNT(*) FROM post_drafts WHERE created_at >= ? GROUP BY topic",
+            (min_created_at,),
+        ))
+
+    def prune_drafts(self, cutoff: float) -> int:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM post_drafts WHERE created_at < ?", (cutoff,)).rowcount
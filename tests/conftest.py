@@ -0,0 +1,65 @@
+"""
+Fixtures comunes. Los módulos del bot leen la configuración al importarse: el entorno de
+prueba (backend en memoria, sin caché en disco) se fija aquí, antes de cualquier import.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.update(
+    DATABASE_URL="memory://",
+    MOLTBOOK_API_KEY="test-key",
+    MOLTBOOK_CACHE_PATH="",
+    BOT_STATE_CONSISTENCY="local",
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+
+import memory  # noqa: E402
+from mock_moltbook import MockMoltbook, start_mock_server  # noqa: E402
+from moltbook_client import CircuitBreakers, MoltbookClient, RateLimiter, ResponseCache  # noqa: E402
+from storage import MemoryBackend  # noqa: E402
+from storage_sqlite import SQLiteBackend  # noqa: E402
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request):
+    """Cada backend ligero, con el esquema creado e instalado como backend del proceso."""
+    backend = MemoryBackend() if request.param == "memory" else SQLiteBackend(":memory:")
+    backend.init_schema()
+    memory.set_backend(backend)
+    memory.state_store.__init__("local")  # sin load(): lee y escribe directo en el backend
+    yield backend
+    memory.set_backend(None)
+    backend.close()
+
+
+@pytest.fixture
+def mock_server():
+    """Servidor Moltbook falso en un puerto libre (sin tráfico sintético)."""
+    server = start_mock_server(MockMoltbook(initial_posts=0, posts_per_second=0, seed=1))
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def thread_id(mock_server):
+    """Post de otro agente con un comentario, en el mock."""
+    post = mock_server.mock._add_post("OtherBot", time.time())
+    mock_server.mock._add_comment(post["id"], "OtherBot", "first", None)
+    return post["id"]
+
+
+@pytest.fixture
+def client(mock_server):
+    """Cliente contra el mock: caché propia (TTL de comentarios 30s), sin rate limit ni breakers compartidos."""
+    client = MoltbookClient(
+        base_url=mock_server.base_url,
+        cache=ResponseCache(ttls={"comments": 30}, path=None),
+        rate_limiter=RateLimiter(limits={}),
+        breakers=CircuitBreakers(),
+    )
+    yield client
+    client.close()
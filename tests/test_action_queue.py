@@ -0,0 +1,40 @@
+"""Outbox de votos/follows: misma semántica en MemoryBackend y SQLite."""
+
+
+def test_enqueue_is_idempotent(backend):
+    assert backend.enqueue_action("upvote:p1", "upvote", "p1", "alice", now=0)
+    assert not backend.enqueue_action("upvote:p1", "upvote", "p1", "alice", now=1)
+    assert backend.action_counts() == {"pending": 1}
+
+
+def test_claim_actions_leases(backend):
+    backend.enqueue_action("upvote:p1", "upvote", "p1", "alice", now=0)
+    backend.enqueue_action("follow:bob", "follow", "bob", None, now=1)
+    claimed = backend.claim_actions(now=10, limit=1, lease=30)
+    assert [a["action_key"] for a in claimed] == ["upvote:p1"]
+    assert claimed[0]["attempts"] == 1
+    # La primera queda apartada durante el lease; la segunda sigue disponible
+    assert [a["action_key"] for a in backend.claim_actions(now=11, limit=5, lease=30)] == ["follow:bob"]
+    assert backend.claim_actions(now=20, limit=5, lease=30) == []
+    # Worker caído: al vencer el lease vuelve a estar lista, con otro intento
+    again = backend.claim_actions(now=41, limit=5, lease=30)
+    assert [(a["action_key"], a["attempts"]) for a in again] == [("upvote:p1", 2), ("follow:bob", 2)]
+
+
+def test_retry_and_finish(backend):
+    backend.enqueue_action("upvote:p1", "upvote", "p1", "alice", now=0)
+    backend.claim_actions(now=0, limit=5, lease=30)
+    backend.retry_action("upvote:p1", next_attempt_at=100, error="503", now=1)
+    assert backend.claim_actions(now=99, limit=5, lease=30) == []
+    assert len(backend.claim_actions(now=100, limit=5, lease=30)) == 1
+    backend.finish_action("upvote:p1", "done", None, now=101)
+    assert backend.action_counts() == {"done": 1}
+    assert backend.claim_actions(now=1000, limit=5, lease=30) == []
+
+
+def test_prune_actions_keeps_pending(backend):
+    backend.enqueue_action("upvote:p1", "upvote", "p1", None, now=0)
+    backend.enqueue_action("upvote:p2", "upvote", "p2", None, now=0)
+    backend.finish_action("upvote:p1", "failed", "404", now=5)
+    assert backend.prune_actions(cutoff=10) == 1
+    assert backend.action_counts() == {"pending": 1}
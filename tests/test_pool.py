@@ -0,0 +1,141 @@
+"""ConnectionPool de Postgres sobre un ThreadedConnectionPool falso: checkout, health check y métricas."""
+import threading
+import time
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+import storage_postgres  # noqa: E402
+from storage_postgres import ConnectionPool, PoolTimeout  # noqa: E402
+
+
+class _Cursor:
+    def __init__(self, conn: "_Conn") -> None:
+        self._conn = conn
+
+    def __enter__(self) -> "_Cursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def execute(self, sql: str) -> None:
+        self._conn.pings += 1
+        if self._conn.dead:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+
+class _Conn:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.dead = False
+        self.pings = 0
+
+    def cursor(self) -> _Cursor:
+        return _Cursor(self)
+
+    def rollback(self) -> None:
+        pass
+
+
+class _FakePool:
+    """Mínimo de ThreadedConnectionPool: reutiliza las ociosas, abre una nueva si no hay."""
+
+    def __init__(self, minconn: int, maxconn: int, dsn: str) -> None:
+        self.idle: list[_Conn] = []
+
+    def getconn(self) -> _Conn:
+        if self.idle:
+            return self.idle.pop()
+        return _Conn()
+
+    def putconn(self, conn: _Conn, close: bool = False) -> None:
+        if close:
+            conn.closed = 1
+        else:
+            self.idle.append(conn)
+
+    def closeall(self) -> None:
+        for conn in self.idle:
+            conn.closed = 1
+
+
+def _pool(monkeypatch, max_size: int = 2, timeout: float = 1.0, healthcheck_after: float = 60.0) -> ConnectionPool:
+    monkeypatch.setattr(storage_postgres.pg_pool, "ThreadedConnectionPool", _FakePool)
+    return ConnectionPool("postgresql://fake", 0, max_size, timeout, healthcheck_after)
+
+
+def test_connection_is_reused_after_return(monkeypatch):
+    pool = _pool(monkeypatch)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["connections_opened"] == 1
+    assert stats["handshakes_avoided"] == 1
+
+
+def test_checkout_blocks_until_a_connection_is_returned(monkeypatch):
+    pool = _pool(monkeypatch, max_size=1, timeout=2.0)
+    conn = pool.getconn()
+    threading.Timer(0.1, pool.putconn, (conn,)).start()
+    assert pool.getconn() is conn
+    stats = pool.stats()
+    assert stats["max_wait_seconds"] >= 0.05
+    assert stats["avg_wait_ms"] == pytest.approx(stats["wait_seconds"] / 2 * 1000)
+
+
+def test_checkout_times_out_when_pool_is_full(monkeypatch):
+    pool = _pool(monkeypatch, max_size=1, timeout=0.05)
+    conn = pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn  # el timeout no se quedó con el slot
+
+
+def test_fresh_idle_connection_skips_the_ping(monkeypatch):
+    pool = _pool(monkeypatch, healthcheck_after=60.0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    assert conn.pings == 0
+
+
+def test_stale_connection_is_pinged_and_replaced(monkeypatch):
+    pool = _pool(monkeypatch, healthcheck_after=0.0)
+    stale = pool.getconn()
+    pool.putconn(stale)
+    stale.dead = True  # p. ej. Postgres reiniciado mientras estaba ociosa
+    conn = pool.getconn()
+    assert conn is not stale and stale.closed and stale.pings == 1
+    stats = pool.stats()
+    assert stats["connections_opened"] == 2
+    assert stats["connections_discarded"] == 1
+    assert stats["handshakes_avoided"] == 0
+
+
+def test_healthy_stale_connection_is_kept(monkeypatch):
+    pool = _pool(monkeypatch, healthcheck_after=0.0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    time.sleep(0.01)
+    assert pool.getconn() is conn
+    assert conn.pings == 1
+
+
+def test_broken_connection_is_discarded_and_frees_its_slot(monkeypatch):
+    pool = _pool(monkeypatch, max_size=1, timeout=0.05)
+    conn = pool.getconn()
+    pool.putconn(conn, broken=True)
+    assert conn.closed
+    replacement = pool.getconn()
+    assert replacement is not conn
+    assert pool.stats()["connections_discarded"] == 1
+
+
+def test_stats_without_checkouts(monkeypatch):
+    stats = _pool(monkeypatch).stats()
+    assert stats["avg_wait_ms"] == 0.0 and stats["handshakes_avoided"] == 0
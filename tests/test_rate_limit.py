@@ -0,0 +1,52 @@
+"""Rate limiter por clase de endpoint y polling del crawler: no competir con los feeds por el bucket read."""
+import pytest
+
+import reply_crawler
+from moltbook_client import RateLimited, RateLimiter
+from reply_crawler import ReplyCrawler
+
+
+def _comment_requests(mock_server) -> dict[int, int]:
+    return {status: n for (_, route, status), n in mock_server.mock.requests.items() if route == "list_comments"}
+
+
+class _Pool:
+    def map(self, fn, items):
+        return [fn(i) for i in items]
+
+
+def test_reserve_takes_tokens_until_max_wait():
+    limiter = RateLimiter(limits={"comment": (1, 20)}, max_wait=5)
+    assert limiter.wait_time("comment") == 0
+    assert limiter.reserve("comment") == 0
+    assert limiter.wait_time("comment") > 5
+    with pytest.raises(RateLimited):
+        limiter.reserve("comment")
+    assert limiter.reserve("comment", max_wait=30) > 5
+
+
+def test_unlimited_class_never_waits():
+    limiter = RateLimiter(limits={"read": (1, 60)})
+    assert limiter.reserve(None) == 0
+    assert limiter.reserve("follow") == 0
+
+
+def test_fresh_skips_ttl_but_keeps_etag(client, mock_server, thread_id):
+    client.get_comments(thread_id)
+    client.get_comments(thread_id, fresh=True)
+    assert _comment_requests(mock_server) == {200: 1, 304: 1}
+    mock_server.mock._add_comment(thread_id, "OtherBot", "second", None)
+    assert len(client.get_comments(thread_id, fresh=True)) == 2
+
+
+def test_poll_due_backs_off_when_read_bucket_is_empty(backend, monkeypatch):
+    def no_request(*args, **kwargs):
+        raise AssertionError("el crawler no debe gastar el bucket read vacío")
+
+    monkeypatch.setattr(reply_crawler, "get_comments", no_request)
+    monkeypatch.setattr(reply_crawler, "rate_limit_wait", lambda endpoint: 5.0)
+    crawler = ReplyCrawler()
+    crawler._loaded = True
+    crawler.track("p1", own=True)
+    assert crawler.poll_due(_Pool()) == 0
+    assert crawler._threads["p1"].next_poll > 0
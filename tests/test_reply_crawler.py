@@ -0,0 +1,106 @@
+"""TrackedThread.merge (cutoff tras reinicio/siembra) y el aviso de respuestas del crawler."""
+import datetime
+
+import reply_crawler
+from reply_crawler import ReplyCrawler, TrackedThread
+
+NOW = 1_800_000_000.0
+
+
+def _comment(cid: str, ts: float, parent: str | None = None, author: str = "OtherBot") -> dict:
+    created = datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat()
+    return {"id": cid, "parent_id": parent, "author": {"name": author}, "created_at": created}
+
+
+def test_first_merge_without_cutoff_returns_all_replies():
+    thread = TrackedThread("p1", own=True, since=NOW)
+    replies = thread.merge([_comment("c1", NOW - 3600), _comment("c2", NOW)])
+    assert [r["id"] for r in replies] == ["c1", "c2"]
+    assert all(r["root_post_id"] == "p1" and r["reply_to_self"] for r in replies)
+
+
+def test_first_merge_after_restart_skips_replies_before_polled():
+    thread = TrackedThread("p1", own=True, since=NOW - 7200, polled=NOW - 60)
+    replies = thread.merge([_comment("old", NOW - 3600), _comment("new", NOW)])
+    assert [r["id"] for r in replies] == ["new"]
+
+
+def test_cutoff_only_applies_to_first_merge():
+    thread = TrackedThread("p1", own=True, since=NOW, polled=NOW)
+    thread.merge([_comment("c1", NOW + 10)])
+    # Llegada tardía con timestamp anterior al poll: en polls siguientes sí es candidata
+    assert [r["id"] for r in thread.merge([_comment("late", NOW - 10)])] == ["late"]
+
+
+def test_only_replies_to_our_ids():
+    thread = TrackedThread("p1", own=False, since=NOW)
+    thread.our_ids.add("mine")
+    replies = thread.merge([
+        _comment("mine", NOW, author="LogosDaemon"),
+        _comment("to-us", NOW, parent="mine"),
+        _comment("to-post", NOW),
+        _comment("nested", NOW, parent="to-us"),
+    ])
+    assert [r["id"] for r in replies] == ["to-us"]
+
+
+def test_nested_replies_and_our_new_comments():
+    thread = TrackedThread("p1", own=True, since=NOW)
+    tree = [
+        dict(_comment("c1", NOW), replies=[
+            dict(_comment("ours", NOW, author="LogosDaemon"), replies=[_comment("c3", NOW)]),
+        ]),
+    ]
+    replies = thread.merge(tree)
+    assert "ours" in thread.our_ids
+    assert {r["id"]: r["parent_id"] for r in replies} == {"c1": None, "c3": "ours"}
+    assert thread.merge(tree) == []  # ya conocidos
+
+
+def test_seeded_threads_skip_old_replies(backend, monkeypatch):
+    monkeypatch.setattr(reply_crawler, "get_agent_profile", lambda name: {"recentPosts": [{"id": "p1"}]})
+    monkeypatch.setattr(reply_crawler.time, "time", lambda: NOW)
+    crawler = ReplyCrawler()
+    crawler._load()
+    thread = crawler._threads["p1"]
+    assert thread.own and thread.polled == NOW
+    assert [r["id"] for r in thread.merge([_comment("old", NOW - 86400), _comment("new", NOW + 5)])] == ["new"]
+
+
+class _Pool:
+    def map(self, fn, items):
+        return [fn(i) for i in items]
+
+
+def test_wait_for_replies_consumes_the_signal(backend, monkeypatch):
+    comments = [_comment("c1", NOW + 5)]
+    monkeypatch.setattr(reply_crawler, "get_comments", lambda post_id, sort, fresh: comments)
+    monkeypatch.setattr(reply_crawler, "rate_limit_wait", lambda endpoint: 0.0)
+    crawler = ReplyCrawler()
+    crawler._loaded = True
+    crawler.track("p1", own=True, polled=NOW)
+
+    assert crawler.poll_due(_Pool()) == 1
+    assert crawler.wait_for_replies(0)
+    assert not crawler.wait_for_replies(0)  # la respuesta sigue en cola, pero no despierta
+    # Un poll sin respuestas nuevas no vuelve a avisar
+    for thread in crawler._threads.values():
+        thread.next_poll = 0
+    assert crawler.poll_due(_Pool()) == 0
+    assert not crawler.wait_for_replies(0)
+    assert [r["id"] for r in crawler.take_replies()] == ["c1"]
+
+
+def test_workers_keep_separate_thread_state(backend, monkeypatch):
+    monkeypatch.setattr(reply_crawler, "BOT_WORKER_COUNT", 2)
+    for index, post_id in ((0, "p0"), (1, "p1")):
+        monkeypatch.setattr(reply_crawler, "BOT_WORKER_INDEX", index)
+        crawler = ReplyCrawler()
+        crawler._loaded = True
+        crawler.track(post_id, own=True)
+        crawler._save()
+    for index in (0, 1):
+        monkeypatch.setattr(reply_crawler, "BOT_WORKER_INDEX", index)
+        restored = ReplyCrawler()
+        restored._load()
+        assert list(restored._threads) == [f"p{index}"]
@@ -0,0 +1,58 @@
+"""ResponseCache: TTL, revalidación con ETag (304) y entrada desalojada antes del 304."""
+from moltbook_client import ResponseCache
+
+
+def _comment_requests(mock_server) -> dict[int, int]:
+    return {status: n for (_, route, status), n in mock_server.mock.requests.items() if route == "list_comments"}
+
+
+def _expire(cache: ResponseCache) -> None:
+    for entry in cache._entries.values():
+        entry["expires"] = 0
+
+
+def test_fresh_entry_served_without_network(client, mock_server, thread_id):
+    first = client.get_comments(thread_id)
+    assert client.get_comments(thread_id) == first
+    assert _comment_requests(mock_server) == {200: 1}
+    assert client.cache.stats()["hits"] == 1
+
+
+def test_expired_entry_revalidates_with_304(client, mock_server, thread_id):
+    first = client.get_comments(thread_id)
+    _expire(client.cache)
+    assert client.get_comments(thread_id) == first
+    assert _comment_requests(mock_server) == {200: 1, 304: 1}
+    assert client.cache.stats()["revalidated"] == 1
+
+
+def test_entry_evicted_before_304_is_a_miss(client, mock_server, thread_id):
+    client.get_comments(thread_id)
+    _expire(client.cache)
+    request = client._request
+
+    def evict_then_request(method, path, **kwargs):
+        # Otro thread desaloja la entrada entre lookup() y la respuesta 304
+        if kwargs.get("headers"):
+            client.cache.invalidate(path)
+        return request(method, path, **kwargs)
+
+    client._request = evict_then_request
+    comments = client.get_comments(thread_id)
+    assert [c["content"] for c in comments] == ["first"]
+    assert _comment_requests(mock_server) == {200: 2, 304: 1}
+    assert client.cache.stats()["entries"] == 1
+
+
+def test_revalidate_missing_entry():
+    cache = ResponseCache(ttls={}, path=None)
+    assert cache.revalidate("/posts/x/comments", "comments") == (False, None)
+
+
+def test_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttls={"post": 60}, path=None)
+    response = type("Response", (), {"headers": {}})()
+    for key in ("a", "b", "c"):
+        cache.store(key, "post", {"key": key}, response)
+    assert cache.lookup("a") is None
+    assert cache.lookup("c") == ({"key": "c"}, {})
@@ -0,0 +1,68 @@
+"""Triage: salida del modelo malformada o parcial nunca rompe el ciclo."""
+import json
+
+import pytest
+
+import triage
+from llm_gateway import LLMUnavailable
+
+POSTS = [{"id": f"p{i}", "title": f"Post {i}", "content": "Why do we believe?"} for i in range(1, 4)]
+
+
+def _reply_with(monkeypatch, raw):
+    def fake_generate(prompt, **kwargs):
+        if isinstance(raw, Exception):
+            raise raw
+        return raw
+
+    monkeypatch.setattr(triage, "generate", fake_generate)
+
+
+@pytest.mark.parametrize("raw", [
+    None,
+    "",
+    "not json",
+    '[{"n": 1, "score": 0.9',  # truncada por max_output_tokens
+    '{"n": 1, "score": 0.9, "respond": true}',  # objeto en vez de array
+    LLMUnavailable("all models down"),
+])
+def test_unusable_output_disables_triage(monkeypatch, raw):
+    _reply_with(monkeypatch, raw)
+    assert triage.triage_posts(POSTS) is None
+    assert triage.rank_candidates(POSTS, priority=lambda p: 0) == (POSTS, [])
+
+
+def test_invalid_items_are_ignored(monkeypatch):
+    _reply_with(monkeypatch, json.dumps([
+        "junk",
+        {"n": 0, "score": 0.9, "respond": True},
+        {"n": 4, "score": 0.9, "respond": True},
+        {"n": "1", "score": 0.9, "respond": True},
+        {"n": 1, "score": "high", "respond": True},
+        {"n": 2, "score": 0.8, "respond": True},
+        {"n": 3, "score": None, "respond": True},
+    ]))
+    assert triage.triage_posts(POSTS) == {"p2": (0.8, True)}
+
+
+def test_low_score_is_skipped(monkeypatch):
+    _reply_with(monkeypatch, json.dumps([
+        {"n": 1, "score": triage.BOT_TRIAGE_MIN_SCORE - 0.01, "respond": True},
+        {"n": 2, "score": "0.9", "respond": True},
+        {"n": 3, "score": 0.9},
+    ]))
+    verdicts = triage.triage_posts(POSTS)
+    assert not verdicts["p1"][1]
+    assert verdicts["p2"] == (0.9, True)
+    assert verdicts["p3"] == (0.9, False)
+
+
+def test_rank_keeps_untriaged_posts_last(monkeypatch):
+    monkeypatch.setattr(triage, "BOT_LLM_TRIAGE", True)
+    _reply_with(monkeypatch, json.dumps([
+        {"n": 1, "score": 0.6, "respond": True},
+        {"n": 2, "score": 0.1, "respond": False},
+    ]))
+    chosen, skipped = triage.rank_candidates(POSTS, priority=lambda p: 0)
+    assert [p["id"] for p in chosen] == ["p1", "p3"]
+    assert [p["id"] for p in skipped] == ["p2"]
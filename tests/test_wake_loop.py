@@ -0,0 +1,59 @@
+"""_wait_next_cycle: una respuesta a nosotros adelanta el ciclo solo si se puede publicar."""
+import time
+
+import pytest
+
+import cycle
+import main
+from reply_crawler import ReplyCrawler
+
+INTERVAL = 0.3
+
+
+@pytest.fixture
+def crawler(monkeypatch):
+    crawler = ReplyCrawler()
+    monkeypatch.setattr(main, "BOT_LOOP_INTERVAL_SECONDS", INTERVAL)
+    monkeypatch.setattr(main, "wait_for_replies", crawler.wait_for_replies)
+    return crawler
+
+
+def _timed_wait() -> float:
+    start = time.monotonic()
+    main._wait_next_cycle()
+    return time.monotonic() - start
+
+
+def test_sleeps_full_interval_without_replies(crawler, monkeypatch):
+    monkeypatch.setattr(main, "can_post_now", lambda: pytest.fail("sin respuestas no se consulta"))
+    assert _timed_wait() >= INTERVAL
+
+
+def test_reply_wakes_when_posting_is_allowed(crawler, monkeypatch):
+    monkeypatch.setattr(main, "can_post_now", lambda: (True, "ok"))
+    crawler._ready.set()
+    assert _timed_wait() < INTERVAL / 2
+
+
+def test_reply_does_not_spin_when_posting_is_blocked(crawler, monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "can_post_now", lambda: calls.append(1) or (False, "Daily cap reached (0)"))
+    crawler._ready.set()
+    assert _timed_wait() >= INTERVAL
+    assert len(calls) == 1
+    # El ciclo siguiente tampoco despierta por la misma respuesta
+    assert _timed_wait() >= INTERVAL
+    assert len(calls) == 1
+
+
+def test_daily_cap_of_zero_blocks_without_counter(backend, monkeypatch):
+    monkeypatch.setattr(cycle, "BOT_MAX_POSTS_PER_DAY", 0)
+    allowed, reason = cycle.can_post_now()
+    assert not allowed and "Daily cap" in reason
+
+
+def test_counter_from_previous_day_does_not_count(backend, monkeypatch):
+    monkeypatch.setattr(cycle, "BOT_MAX_POSTS_PER_DAY", 1)
+    monkeypatch.setattr(cycle, "BOT_MIN_SECONDS_BETWEEN_POSTS", 0)
+    backend.increment_counter("daily_count", "2000-01-01")
+    assert cycle.can_post_now() == (True, "ok")
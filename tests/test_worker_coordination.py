@@ -0,0 +1,97 @@
+"""Claims y presupuesto compartido entre workers: misma semántica en MemoryBackend y SQLite."""
+import time
+
+import cycle
+import memory
+
+TODAY = "2026-01-02"
+
+
+# --- Claims ---
+
+def test_claim_is_exclusive_until_ttl(backend):
+    assert backend.claim_post("p1", "w1", now=100, ttl=60)
+    assert not backend.claim_post("p1", "w2", now=130, ttl=60)
+    assert backend.claim_post("p1", "w2", now=161, ttl=60)  # expirado
+
+
+def test_reclaim_by_same_worker_renews(backend):
+    assert backend.claim_post("p1", "w1", now=100, ttl=60)
+    assert backend.claim_post("p1", "w1", now=150, ttl=60)
+    assert not backend.claim_post("p1", "w2", now=200, ttl=60)  # renovado en 150
+
+
+def test_release_only_by_owner(backend):
+    backend.claim_post("p1", "w1", now=100, ttl=60)
+    backend.release_post("p1", "w2")
+    assert not backend.claim_post("p1", "w2", now=101, ttl=60)
+    backend.release_post("p1", "w1")
+    assert backend.claim_post("p1", "w2", now=102, ttl=60)
+
+
+def test_prune_claims(backend):
+    backend.claim_post("old", "w1", now=10, ttl=60)
+    backend.claim_post("new", "w1", now=100, ttl=60)
+    assert backend.prune_claims(cutoff=50) == 1
+    assert backend.claim_post("old", "w2", now=101, ttl=1000)
+    assert not backend.claim_post("new", "w2", now=101, ttl=1000)
+
+
+def test_memory_claim_uses_worker_id(backend):
+    assert memory.claim_post("p1")
+    assert memory.claim_post("p1")
+    assert not backend.claim_post("p1", "other-worker", now=time.time(), ttl=60)
+    memory.release_post("p1")
+    assert backend.claim_post("p1", "other-worker", now=0, ttl=60)
+
+
+# --- Presupuesto de publicación ---
+
+def test_budget_daily_cap(backend):
+    assert backend.reserve_post_budget(TODAY, now=0, max_per_day=2, min_interval=0) == (True, "ok")
+    assert backend.reserve_post_budget(TODAY, now=1, max_per_day=2, min_interval=0) == (True, "ok")
+    ok, reason = backend.reserve_post_budget(TODAY, now=2, max_per_day=2, min_interval=0)
+    assert not ok and "Daily cap" in reason
+    assert backend.get_counter("daily_count") == (2, TODAY)
+
+
+def test_budget_cooldown(backend):
+    assert backend.reserve_post_budget(TODAY, now=1000, max_per_day=10, min_interval=60)[0]
+    ok, reason = backend.reserve_post_budget(TODAY, now=1030, max_per_day=10, min_interval=60)
+    assert not ok and reason.startswith("Cooldown: 30s")
+    assert backend.reserve_post_budget(TODAY, now=1061, max_per_day=10, min_interval=60)[0]
+    assert backend.get_state("last_post_time") == "1061"
+
+
+def test_budget_resets_on_new_day(backend):
+    backend.reserve_post_budget(TODAY, now=0, max_per_day=1, min_interval=0)
+    assert not backend.reserve_post_budget(TODAY, now=1, max_per_day=1, min_interval=0)[0]
+    assert backend.reserve_post_budget("2026-01-03", now=2, max_per_day=1, min_interval=0)[0]
+    assert backend.get_counter("daily_count") == (1, "2026-01-03")
+
+
+def test_cooldown_applies_across_midnight(backend):
+    # Post a las 23:59:50 y otro intento 20s después, ya en el día siguiente
+    assert backend.reserve_post_budget(TODAY, now=1000, max_per_day=1, min_interval=60)[0]
+    ok, reason = backend.reserve_post_budget("2026-01-03", now=1020, max_per_day=1, min_interval=60)
+    assert not ok and reason.startswith("Cooldown: 40s")
+    assert backend.get_counter("daily_count") == (1, TODAY)
+    assert backend.reserve_post_budget("2026-01-03", now=1061, max_per_day=1, min_interval=60)[0]
+    assert backend.get_counter("daily_count") == (1, "2026-01-03")
+
+
+def test_can_post_now_uses_the_same_rule(backend, monkeypatch):
+    monkeypatch.setattr(cycle, "BOT_MAX_POSTS_PER_DAY", 1)
+    monkeypatch.setattr(cycle, "BOT_MIN_SECONDS_BETWEEN_POSTS", 60)
+    backend.reserve_post_budget("2000-01-01", now=time.time() - 20, max_per_day=1, min_interval=60)
+    memory.state_store.load()
+    ok, reason = cycle.can_post_now()
+    assert not ok and reason.startswith("Cooldown:")
+
+
+def test_reserve_post_slot_refreshes_state_store(backend):
+    memory.state_store.load()
+    ok, _ = memory.reserve_post_slot(max_per_day=5, min_interval=0)
+    assert ok
+    assert memory.get_last_post_time() == float(backend.get_state("last_post_time"))
+    assert memory.get_daily_count() == 1
@@ -0,0 +1,121 @@
+"""
+LogosDaemon - Triage de candidatos en una sola llamada a Gemini.
+Los posts que pasan should_consider_post se envían juntos en un prompt compacto; el modelo
+devuelve (JSON con esquema) un score y un veredicto respond/skip por post. El ciclo solo
+genera respuesta completa para los elegidos, de mayor a menor score.
+"""
+import json
+import logging
+from typing import Callable
+
+from config import (
+    BOT_LLM_TRIAGE,
+    BOT_TRIAGE_MAX_POSTS,
+    BOT_TRIAGE_MIN_SCORE,
+    BOT_TRIAGE_POST_CHARS,
+)
+from llm_gateway import LLMUnavailable, generate
+from post_features import post_features
+from prompts import SYSTEM_INSTRUCTION, DEVELOPER_MESSAGE_TRIAGE
+
+logger = logging.getLogger(__name__)
+
+_TRIAGE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "n": {"type": "INTEGER"},
+            "score": {"type": "NUMBER"},
+            "respond": {"type": "BOOLEAN"},
+        },
+        "required": ["n", "score", "respond"],
+    },
+}
+
+
+def _post_line(n: int, post: dict) -> str:
+    text = " ".join(post_features(post).text.split())
+    if len(text) > BOT_TRIAGE_POST_CHARS:
+        text = text[:BOT_TRIAGE_POST_CHARS] + "..."
+    tag = " [reply to you]" if post.get("reply_to_self") else ""
+    return f"{n}.{tag} {text}"
+
+
+def _build_triage_prompt(posts: list[dict]) -> str:
+    lines = "\n".join(_post_line(n, p) for n, p in enumerate(posts, 1))
+    return f"""[CONTEXTO - Sigue estas instrucciones]
+{SYSTEM_INSTRUCTION}
+
+---
+[TAREA]
+{DEVELOPER_MESSAGE_TRIAGE}
+
+Posts:
+{lines}"""
+
+
+def triage_posts(posts: list[dict]) -> dict[str, tuple[float, bool]] | None:
+    """
+    {post_id: (score, respond)} para hasta BOT_TRIAGE_MAX_POSTS posts.
+    None si el triage falla (LLM caído, JSON inválido): el ciclo sigue sin triage.
+    """
+    batch = posts[:BOT_TRIAGE_MAX_POSTS]
+    try:
+        raw = generate(
+            _build_triage_prompt(batch),
+            max_output_tokens=64 + 32 * len(batch),
+            temperature=0.0,
+            purpose="triage",
+            response_schema=_TRIAGE_SCHEMA,
+        )
+        items = json.loads(raw) if raw else None
+    except (LLMUnavailable, ValueError) as e:
+        logger.warning("Triage failed, evaluating candidates one by one: %s", e)
+        return None
+    if not isinstance(items, list):
+        return None
+
+    verdicts: dict[str, tuple[float, bool]] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        n = item.get("n")
+        if not isinstance(n, int) or not 1 <= n <= len(batch):
+            continue
+        try:
+            score = float(item.get("score", 0))
+        except (TypeError, ValueError):
+            continue
+        respond = bool(item.get("respond")) and score >= BOT_TRIAGE_MIN_SCORE
+        verdicts[batch[n - 1].get("id", "")] = (score, respond)
+    return verdicts
+
+
+def rank_candidates(
+    candidates: list[dict],
+    priority: Callable[[dict], int],
+) -> tuple[list[dict], list[dict]]:
+    """
+    (a generar, descartados). Con un solo candidato no hay triage (una llamada igualmente).
+    Orden: prioridad (respuestas a nosotros primero), luego score. Los posts sin veredicto
+    (más allá del lote o ausentes en la respuesta) van al final, sin descartar.
+    """
+    if not BOT_LLM_TRIAGE or len(candidates) < 2:
+        return candidates, []
+    verdicts = triage_posts(candidates)
+    if verdicts is None:
+        return candidates, []
+
+    chosen, skipped, pending = [], [], []
+    for post in candidates:
+        verdict = verdicts.get(post.get("id", ""))
+        if verdict is None:
+            pending.append(post)
+        elif verdict[1]:
+            chosen.append(post)
+        else:
+            skipped.append(post)
+    chosen.sort(key=lambda p: (priority(p), -verdicts[p.get("id", "")][0]))
+    logger.info("Triage: %d to reply, %d skipped, %d untriaged", len(chosen), len(skipped), len(pending))
+    return chosen + pending, skipped